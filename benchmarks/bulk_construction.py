@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Author: Arne Neumann <discoursegraphs.programming@arne.cl>
+
+"""
+Measures how long it takes to build a ``DiscourseDocumentGraph`` with a
+Tiger-like structure (sentence root nodes, syntax nodes and tokens) of
+increasing size using ``add_nodes_bulk`` / ``add_edges_bulk``.
+
+If the construction time scales linearly, the time per token should stay
+(roughly) the same for all document sizes.
+
+Usage: python benchmarks/bulk_construction.py [max_num_of_tokens]
+"""
+
+import gc
+import sys
+import time
+
+from discoursegraphs import DiscourseDocumentGraph, EdgeTypes
+
+TOKENS_PER_SENTENCE = 20
+TOKENS_PER_PHRASE = 4
+
+
+def make_elements(num_of_tokens, ns='bench'):
+    """
+    returns a list of (node ID, attribs) tuples and a list of
+    (source ID, target ID, attribs) tuples, which represent a document with
+    the given number of tokens.
+    """
+    nodes = []
+    edges = []
+    for tok_index in xrange(num_of_tokens):
+        sent_index = tok_index // TOKENS_PER_SENTENCE
+        phrase_id = 's{0}_p{1}'.format(sent_index,
+                                       tok_index // TOKENS_PER_PHRASE)
+        if tok_index % TOKENS_PER_SENTENCE == 0:
+            nodes.append(('s{}'.format(sent_index),
+                          {'layers': {ns, ns+':sentence'}}))
+        if tok_index % TOKENS_PER_PHRASE == 0:
+            nodes.append((phrase_id, {'layers': {ns, ns+':syntax'}}))
+            edges.append(('s{}'.format(sent_index), phrase_id,
+                          {'layers': {ns, ns+':syntax'},
+                           'edge_type': EdgeTypes.dominance_relation}))
+        token_id = 's{0}_t{1}'.format(sent_index, tok_index)
+        nodes.append((token_id, {'layers': {ns, ns+':token'},
+                                 ns+':token': 'token{}'.format(tok_index)}))
+        edges.append((phrase_id, token_id,
+                      {'layers': {ns, ns+':syntax'},
+                       'edge_type': EdgeTypes.spanning_relation}))
+    return nodes, edges
+
+
+def build_document(nodes, edges):
+    """build a document graph from the given nodes and edges"""
+    docgraph = DiscourseDocumentGraph(namespace='bench')
+    docgraph.add_nodes_bulk(nodes)
+    docgraph.add_edges_bulk(edges)
+    return docgraph
+
+
+def main(max_num_of_tokens=10**6):
+    num_of_tokens = 1000
+    print("{0:>10} {1:>10} {2:>14}".format('tokens', 'seconds',
+                                           'usec/token'))
+    while num_of_tokens <= max_num_of_tokens:
+        nodes, edges = make_elements(num_of_tokens)
+        # like timeit, we don't measure the cyclic garbage collector
+        gc.disable()
+        start = time.time()
+        build_document(nodes, edges)
+        duration = time.time() - start
+        gc.enable()
+        print("{0:>10} {1:>10.3f} {2:>14.2f}".format(
+            num_of_tokens, duration, duration / num_of_tokens * 10**6))
+        num_of_tokens *= 10
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        main(int(sys.argv[1]))
+    else:
+        main()
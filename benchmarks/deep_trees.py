@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Author: Arne Neumann <discoursegraphs.programming@arne.cl>
+
+"""
+Measures how long it takes to parse right-branching (i.e. maximally deep)
+RST trees of increasing size from *.dis files and to extract the spans of
+their topmost span nodes.
+
+The traversals don't use recursion, so the time per EDU should stay
+(roughly) the same for all tree depths, even for trees that are much
+deeper than Python's recursion limit.
+
+Usage: python benchmarks/deep_trees.py [max_num_of_edus]
+"""
+
+import gc
+import os
+import sys
+import tempfile
+import time
+
+from discoursegraphs import get_span
+from discoursegraphs.readwrite.rst.dis import RSTLispDocumentGraph
+
+
+def make_dis_str(num_of_edus):
+    """
+    returns a *.dis string representing a right-branching RST tree, where
+    each span consists of an EDU and a span made up of all the following
+    EDUs (both are nuclei of a multinuclear relation).
+    """
+    edu_str = (u"( Nucleus (leaf {0}) (rel2par List) "
+               u"(text _!edu {0} is here_!) )")
+    subtree_str = edu_str.format(num_of_edus)
+    for edu in xrange(num_of_edus-1, 0, -1):
+        subtree_str = (u"( Nucleus (span {0} {1}) (rel2par List)\n"
+                       u"{2}\n{3} )").format(
+            edu, num_of_edus, edu_str.format(edu), subtree_str)
+    return u"( Root (span 1 {0})\n{1} )".format(num_of_edus, subtree_str)
+
+
+def main(max_num_of_edus=10**4):
+    print("{0:>10} {1:>10} {2:>10} {3:>14}".format(
+        'EDUs', 'parse', 'get_span', 'us per EDU'))
+    num_of_edus = 10
+    while num_of_edus <= max_num_of_edus:
+        fd, dis_filepath = tempfile.mkstemp(suffix='.dis')
+        with os.fdopen(fd, 'w') as dis_file:
+            dis_file.write(make_dis_str(num_of_edus).encode('utf-8'))
+
+        gc.disable()
+        start = time.time()
+        docgraph = RSTLispDocumentGraph(dis_filepath)
+        parse_duration = time.time() - start
+        start = time.time()
+        get_span(docgraph, 'rst:span:1-{}'.format(num_of_edus))
+        span_duration = time.time() - start
+        gc.enable()
+        os.remove(dis_filepath)
+
+        print("{0:>10} {1:>10.3f} {2:>10.3f} {3:>14.1f}".format(
+            num_of_edus, parse_duration, span_duration,
+            (parse_duration + span_duration) / num_of_edus * 10**6))
+        num_of_edus *= 10
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        main(int(sys.argv[1]))
+    else:
+        main()
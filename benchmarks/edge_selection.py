@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Author: Arne Neumann <discoursegraphs.programming@arne.cl>
+
+"""
+Compares the time it takes to select edges from a Tiger-like document
+graph using eval string conditions vs. compiled conditions (functions)
+vs. the edge type index.
+
+Usage: python benchmarks/edge_selection.py [num_of_tokens]
+"""
+
+import gc
+import sys
+import time
+
+from discoursegraphs import (EdgeTypes, edge_attribute_condition,
+                             select_edges, select_edges_by_attribute)
+
+from bulk_construction import build_document, make_elements
+
+
+def timed(function, *args, **kwargs):
+    """returns the number of seconds it took to exhaust function's result"""
+    gc.disable()
+    start = time.time()
+    for _ in function(*args, **kwargs):
+        pass
+    duration = time.time() - start
+    gc.enable()
+    return duration
+
+
+def main(num_of_tokens=10**5):
+    docgraph = build_document(*make_elements(num_of_tokens))
+    edge_types = [EdgeTypes.dominance_relation, EdgeTypes.spanning_relation]
+
+    eval_conditions = ["edge_attribs['edge_type'] == '{}'".format(edge_type)
+                       for edge_type in edge_types]
+    print("{0:>10} {1:>10} {2:>10}".format('eval', 'function', 'index'))
+    print("{0:>10.3f} {1:>10.3f} {2:>10.3f}".format(
+        sum(timed(select_edges, docgraph, [cond]) for cond in eval_conditions),
+        timed(select_edges, docgraph,
+              [edge_attribute_condition('edge_type', edge_types)]),
+        timed(select_edges_by_attribute, docgraph, 'edge_type', edge_types)))
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        main(int(sys.argv[1]))
+    else:
+        main()
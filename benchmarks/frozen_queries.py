@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Author: Arne Neumann <discoursegraphs.programming@arne.cl>
+
+"""
+Compares the size of a Tiger-like document graph and of its frozen
+snapshot (``DiscourseDocumentGraph.freeze``) as well as the time it takes
+to query them.
+
+Usage: python benchmarks/frozen_queries.py [num_of_tokens]
+"""
+
+from array import array
+import gc
+import sys
+import time
+
+from discoursegraphs import (EdgeTypes, get_span, select_edges_by,
+                             select_nodes_by_layer)
+
+from bulk_construction import build_document, make_elements
+
+
+def timed(function, *args, **kwargs):
+    """returns the number of seconds it took to exhaust function's result"""
+    gc.disable()
+    start = time.time()
+    for _ in function(*args, **kwargs):
+        pass
+    duration = time.time() - start
+    gc.enable()
+    return duration
+
+
+def approximate_size(obj):
+    """
+    returns the approximate number of bytes used by the given object and
+    all the containers / objects it references (but not by classes).
+    """
+    seen = set()
+    size = 0
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, type):
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.iterkeys())
+            stack.extend(obj.itervalues())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        elif hasattr(obj, '__dict__') and not isinstance(obj, array):
+            stack.append(vars(obj))
+    return size
+
+
+def get_all_spans(docgraph, node_ids):
+    """yields the span of each of the given nodes"""
+    for node_id in node_ids:
+        yield get_span(docgraph, node_id)
+
+
+def main(num_of_tokens=10**5):
+    docgraph = build_document(*make_elements(num_of_tokens))
+    frozen = docgraph.freeze()
+    node_ids = list(docgraph.nodes_iter())
+
+    print("{0:>20} {1:>10} {2:>10}".format('', 'graph', 'frozen'))
+    print("{0:>20} {1:>10.1f} {2:>10.1f}".format(
+        'size (MB)', approximate_size(docgraph) / 2.0**20,
+        approximate_size(frozen) / 2.0**20))
+    queries = [
+        ('nodes by layer', select_nodes_by_layer, ['bench:syntax']),
+        ('edges by type', select_edges_by,
+         [None, EdgeTypes.dominance_relation]),
+        ('edges by both', select_edges_by,
+         ['bench:syntax', EdgeTypes.spanning_relation])]
+    for name, function, args in queries:
+        print("{0:>20} {1:>10.3f} {2:>10.3f}".format(
+            name, timed(function, docgraph, *args),
+            timed(function, frozen, *args)))
+    print("{0:>20} {1:>10.3f} {2:>10.3f}".format(
+        'spans (uncached)', timed(get_all_spans, docgraph, node_ids),
+        timed(get_all_spans, frozen, node_ids)))
+    print("{0:>20} {1:>10.3f} {2:>10.3f}".format(
+        'spans (cached)', timed(get_all_spans, docgraph, node_ids),
+        timed(get_all_spans, frozen, node_ids)))
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        main(int(sys.argv[1]))
+    else:
+        main()
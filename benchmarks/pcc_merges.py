@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Author: Arne Neumann <discoursegraphs.programming@arne.cl>
+
+"""
+Measures how long it takes to merge all annotation layers of the documents
+of the Potsdam Commentary Corpus (one after another with ``merge_graphs``
+and all at once with ``merge_many``) and how long it takes to relabel
+nodes in place (``relabel_nodes`` with ``copy=False``) on synthetic
+documents of increasing size, where all nodes are renamed.
+
+Usage: python benchmarks/pcc_merges.py [num_of_pcc_documents]
+"""
+
+import fnmatch
+import gc
+import sys
+import time
+
+from discoursegraphs import merge_many, relabel
+from discoursegraphs.corpora import pcc
+
+from bulk_construction import build_document, make_elements
+
+
+def read_layers(doc_id):
+    """returns the annotation layer graphs of the given PCC document"""
+    layer_graphs = []
+    for layer_name in pcc.layers:
+        layer_files, read_function = pcc.layers[layer_name]
+        for layer_file in layer_files:
+            if fnmatch.fnmatch(layer_file, '*{}.*'.format(doc_id)):
+                layer_graphs.append(read_function(layer_file))
+    return layer_graphs
+
+
+def merge_pairwise(layer_graphs):
+    """merges the layer graphs one after another (cf. ``merge_graphs``)"""
+    docgraph = layer_graphs[0]
+    for layer_graph in layer_graphs[1:]:
+        docgraph.merge_graphs(layer_graph)
+    return docgraph
+
+
+def time_pcc_merges(num_of_documents, merge_function):
+    """
+    returns the time it took to merge the annotation layers of the given
+    number of PCC documents with the given merge function (reading the
+    layers isn't measured)
+    """
+    duration = 0.0
+    for doc_id in pcc.document_ids[:num_of_documents]:
+        layer_graphs = read_layers(doc_id)
+        gc.disable()
+        start = time.time()
+        merge_function(layer_graphs)
+        duration += time.time() - start
+        gc.enable()
+    return duration
+
+
+def time_relabel(num_of_tokens):
+    """returns the time it took to rename all nodes of a synthetic document"""
+    docgraph = build_document(*make_elements(num_of_tokens))
+    mapping = {node_id: 'new_{}'.format(node_id) for node_id in docgraph}
+    gc.disable()
+    start = time.time()
+    relabel.relabel_nodes(docgraph, mapping, copy=False)
+    duration = time.time() - start
+    gc.enable()
+    return duration
+
+
+def main(num_of_documents=20):
+    for merge_function in (merge_pairwise, merge_many):
+        duration = time_pcc_merges(num_of_documents, merge_function)
+        print("{0}: merging {1} PCC documents: {2:.3f} seconds "
+              "({3:.1f} msec per document)".format(
+                  merge_function.__name__, num_of_documents, duration,
+                  duration / num_of_documents * 1000))
+
+    print("{0:>10} {1:>10} {2:>14}".format('tokens', 'seconds',
+                                           'usec/token'))
+    for num_of_tokens in (1000, 10000, 100000):
+        duration = time_relabel(num_of_tokens)
+        print("{0:>10} {1:>10.3f} {2:>14.2f}".format(
+            num_of_tokens, duration, duration / num_of_tokens * 10**6))
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        main(int(sys.argv[1]))
+    else:
+        main()
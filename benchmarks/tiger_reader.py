@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Author: Arne Neumann <discoursegraphs.programming@arne.cl>
+
+"""
+Measures how long it takes to read a large TigerXML file into a document
+graph and how much memory the reader needs. The file is created by
+concatenating the sentences of all TigerXML files of the Potsdam Commentary
+Corpus (several times, with unique sentence/node IDs).
+
+Each measurement runs in its own process, so that the peak memory usage
+(maximum resident set size) of the process belongs to that measurement.
+The parallel reader uses one worker process per CPU (only the memory
+usage of the main process is measured).
+
+Usage: python benchmarks/tiger_reader.py [num_of_copies]
+"""
+
+import multiprocessing
+import os
+import re
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from discoursegraphs.corpora import pcc
+
+SENTENCE_RE = re.compile('<s .*?</s>', re.DOTALL)
+ID_RE = re.compile(r'(id|root|idref)="s')
+
+
+def make_tiger_file(path, num_of_copies):
+    """
+    writes a TigerXML file containing all PCC sentences (num_of_copies
+    times) and returns the number of sentences in that file
+    """
+    sentences = []
+    for tiger_file in pcc.syntax:
+        with open(tiger_file) as tiger:
+            sentences.extend(SENTENCE_RE.findall(tiger.read()))
+
+    with open(path, 'w') as output:
+        output.write('<?xml version="1.0" encoding="utf-8" standalone="yes"?>\n'
+                     '<corpus id="benchmark">\n<body>\n')
+        for copy in range(num_of_copies):
+            for i, sentence in enumerate(sentences):
+                prefix = r'\1="c{0}_d{1}_s'.format(copy, i)
+                output.write(ID_RE.sub(prefix, sentence))
+                output.write('\n')
+        output.write('</body>\n</corpus>\n')
+    return len(sentences) * num_of_copies
+
+
+def measure(mode, path):
+    """
+    reads the file (mode 'graph': into a TigerDocumentGraph, mode
+    'parallel': into a TigerDocumentGraph using one worker per CPU, mode
+    'tree': only into an lxml tree) and prints the duration and peak memory
+    usage
+    """
+    start = time.time()
+    if mode in ('graph', 'parallel'):
+        from discoursegraphs.readwrite.tiger import TigerDocumentGraph
+        workers = multiprocessing.cpu_count() if mode == 'parallel' else None
+        docgraph = TigerDocumentGraph(path, workers=workers)
+        size = len(docgraph)
+    else:
+        from lxml import etree
+        tree = etree.parse(path)
+        size = len(tree.getroot())
+    duration = time.time() - start
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print("{0} {1} {2}".format(duration, max_rss, size))
+
+
+def run(mode, path):
+    """runs a measurement in a new process and returns its results"""
+    output = subprocess.check_output(
+        [sys.executable, __file__, '--measure', mode, path])
+    duration, max_rss, _size = output.split()
+    return float(duration), int(max_rss)
+
+
+def main(num_of_copies=10):
+    temp_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(temp_dir, 'benchmark.xml')
+        num_of_sentences = make_tiger_file(path, num_of_copies)
+        print("TigerXML file with {0} sentences ({1:.1f} MB)".format(
+            num_of_sentences, os.path.getsize(path) / 1024.0**2))
+
+        parallel = 'TigerDocumentGraph ({0} workers)'.format(
+            multiprocessing.cpu_count())
+        for mode, description in (('tree', 'lxml tree only'),
+                                  ('graph', 'TigerDocumentGraph'),
+                                  ('parallel', parallel)):
+            duration, max_rss = run(mode, path)
+            print("{0:>34}: {1:>7.3f} seconds, {2:>7.1f} MB peak memory".format(
+                description, duration, max_rss / 1024.0))
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 4 and sys.argv[1] == '--measure':
+        measure(sys.argv[2], sys.argv[3])
+    elif len(sys.argv) > 1:
+        main(int(sys.argv[1]))
+    else:
+        main()
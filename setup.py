@@ -18,7 +18,7 @@ install_requires = [
     # For more details, see:
     # http://packages.python.org/distribute/setuptools.html#declaring-dependencies
     "nltk", "lxml", "networkx", "pygraphviz",
-    "brewer2mpl", "unidecode", "pydot2", "pydotplus"
+    "brewer2mpl", "unidecode", "pydot2", "pydotplus", "numpy"
 ]
 
 
@@ -12,16 +12,18 @@ import os
 from networkx import write_gpickle
 
 from discoursegraphs.discoursegraph import (
-    DiscourseDocumentGraph, EdgeTypes, create_token_mapping,
-    get_annotation_layers, get_span, get_span_offsets,
-    get_text, is_continuous, istoken, layer2namespace,
+    DiscourseDocumentGraph, EdgeTypes, FrozenDocumentGraph, TokenList,
+    TokenTable, create_token_mapping, get_annotation_layers, get_span,
+    get_spans, get_span_mask, get_span_offsets, get_span_ranges, get_text,
+    is_continuous, istoken, layer2namespace, merge_many, span_contains,
+    spans_overlap,
     select_neighbors_by_edge_attribute,
     select_neighbors_by_layer, select_nodes_by_attribute,
-    select_nodes_by_layer, select_edges_by_attribute,
-    select_edges_by, tokens2text,
+    select_nodes_by_layer, select_edges, select_edges_by_attribute,
+    select_edges_by, edge_attribute_condition, tokens2text,
     get_pointing_chains, get_top_level_layers)
 from discoursegraphs.readwrite import (
-    read_anaphoricity, write_brackets, write_brat, read_conano, read_conll, write_conll,
+    read_anaphoricity, docgraph2arrays, stack_arrays, write_brackets, write_brat, read_conano, read_conll, write_conll,
     read_decour, write_dot, read_exb, read_exmaralda, write_exmaralda, write_exb,
     read_exportxml, write_freqt, write_graphml, write_gexf, read_mmax2,
     write_neo4j, write_geoff, write_paula,
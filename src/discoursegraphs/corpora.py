@@ -100,11 +100,7 @@ class PCC(Sequence):
 
         if not layer_graphs:
             raise TypeError("There are no files with that document ID.")
-        else:
-            doc_graph = layer_graphs[0]
-            for layer_graph in layer_graphs[1:]:
-                doc_graph.merge_graphs(layer_graph)
-        return doc_graph
+        return dg.merge_many(layer_graphs)
 
     def __getitem__(self, sliced):
         """access documents by their index or by their document ID"""
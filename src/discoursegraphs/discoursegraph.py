@@ -11,14 +11,19 @@ a ``layers`` attribute (which maps to the set of layers (str) it belongs to).
 TODO: implement a DiscourseCorpusGraph
 """
 
-import itertools
 import sys
 import warnings
+from array import array
+from bisect import bisect_right
 from collections import defaultdict, OrderedDict
+from functools import partial
+from itertools import izip
 
-from networkx import MultiGraph, MultiDiGraph, is_directed_acyclic_graph
+from networkx import (MultiGraph, MultiDiGraph, NetworkXError,
+                      is_directed_acyclic_graph)
 
 from discoursegraphs.relabel import relabel_nodes
+from discoursegraphs.traversal import fold, iter_paths
 from discoursegraphs.util import natural_sort_key
 
 
@@ -33,6 +38,218 @@ class EdgeTypes(object):
     precedence_relation = 'precedes'
 
 
+def _invalidating(method_name):
+    """
+    returns a list method that marks the token positions of a ``TokenList``
+    as outdated before calling the original ``list`` method.
+    """
+    list_method = getattr(list, method_name)
+
+    def method(self, *args):
+        self._positions = None
+        self.changes += 1
+        return list_method(self, *args)
+    method.__name__ = method_name
+    method.__doc__ = list_method.__doc__
+    return method
+
+
+class TokenList(list):
+    """
+    A list of token node IDs (in the order they occur in the text), which
+    also knows the (int) position of each token.
+
+    Positions are updated incrementally when tokens are appended to the
+    end of the list. All other changes to the list (e.g. inserting or
+    removing tokens) cause the positions to be recalculated the next time
+    they are needed.
+
+    Attributes
+    ----------
+    changes : int
+        the number of times the list was changed (used to detect outdated
+        spans, which are sorted by token position)
+    """
+    def __init__(self, token_ids=()):
+        super(TokenList, self).__init__(token_ids)
+        self._positions = None
+        self.changes = 0
+
+    @property
+    def positions(self):
+        """
+        a dict that maps from a token node ID to its position in the list.
+        If a token occurs more than once, its first position is used.
+        """
+        if self._positions is None:
+            positions = {}
+            for position, token_id in enumerate(self):
+                positions.setdefault(token_id, position)
+            self._positions = positions
+        return self._positions
+
+    def position(self, token_id):
+        """returns the position (int) of the given token node ID"""
+        return self.positions[token_id]
+
+    def sort_key(self, token_id):
+        """
+        returns a key that can be used to sort token node IDs by their
+        position. Node IDs which aren't in the list are sorted after all
+        tokens (using their natural sort order).
+        """
+        position = self.positions.get(token_id)
+        if position is None:
+            return (1, natural_sort_key(token_id))
+        return (0, position)
+
+    def append(self, token_id):
+        if self._positions is not None:
+            self._positions.setdefault(token_id, len(self))
+        self.changes += 1
+        super(TokenList, self).append(token_id)
+
+    def extend(self, token_ids):
+        first_new_position = len(self)
+        self.changes += 1
+        super(TokenList, self).extend(token_ids)
+        if self._positions is not None:
+            for position in xrange(first_new_position, len(self)):
+                self._positions.setdefault(self[position], position)
+
+    def __iadd__(self, token_ids):
+        self.extend(token_ids)
+        return self
+
+    def __reduce__(self):
+        # pickle would otherwise call extend() before __init__() has set
+        # the position index (which is rebuilt on demand anyway)
+        return (self.__class__, (list(self),))
+
+    __setitem__ = _invalidating('__setitem__')
+    __delitem__ = _invalidating('__delitem__')
+    __setslice__ = _invalidating('__setslice__')
+    __delslice__ = _invalidating('__delslice__')
+    __imul__ = _invalidating('__imul__')
+    insert = _invalidating('insert')
+    pop = _invalidating('pop')
+    remove = _invalidating('remove')
+    reverse = _invalidating('reverse')
+    sort = _invalidating('sort')
+
+
+class TokenTable(object):
+    """
+    A column-oriented table of the tokens of a document graph, i.e. the
+    token strings and their character offsets are stored in lists/arrays in
+    the order the tokens occur in the text (cf. ``TokenList.position``).
+
+    A token table is built by ``DiscourseDocumentGraph.token_table`` and
+    rebuilt after the tokens of the graph have changed.
+
+    Attributes
+    ----------
+    token_ids : TokenList
+        the token node IDs of the document graph
+    strings : list of unicode
+        the token strings
+    onsets : array of int
+        the character position where each token starts in ``text``
+    offsets : array of int
+        the character position where each token ends in ``text``
+
+    The onsets and offsets are computed from the token strings (as prefix
+    sums). The onsets/offsets of the tokens in other namespaces (i.e. the
+    ``namespace:onset`` and ``namespace:offset`` node attributes) are
+    read into arrays once, cf. ``get_offset_arrays``.
+    """
+    def __init__(self, docgraph):
+        self.token_ids = docgraph.tokens
+        self._node = docgraph.node
+        self._token_attrib = docgraph.ns+':token'
+        self.strings = [docgraph.node[token_id][self._token_attrib]
+                        for token_id in self.token_ids]
+
+        self.onsets = array('l')
+        self.offsets = array('l')
+        onset = 0
+        for token_str in self.strings:
+            offset = onset + len(token_str)
+            self.onsets.append(onset)
+            self.offsets.append(offset)
+            onset = offset + 1
+        self._text = None
+        self._namespace_offsets = {}
+
+    @property
+    def text(self):
+        """the text of the document (i.e. all tokens joined by spaces)"""
+        if self._text is None:
+            self._text = ' '.join(self.strings)
+        return self._text
+
+    def get_offset_arrays(self, offset_ns, read_nodes=True):
+        """
+        returns the onsets and offsets of all tokens in the given namespace
+        (or None, if not all tokens have onsets/offsets in that namespace).
+
+        Parameters
+        ----------
+        offset_ns : str
+            the namespace of the onset/offset node attributes
+        read_nodes : bool
+            If False, only return offsets that were already read or set
+            (cf. ``set_offset_arrays``).
+
+        Returns
+        -------
+        onsets : array of int
+            the character position where each token starts
+        offsets : array of int
+            the character position where each token ends
+        """
+        arrays = self._namespace_offsets.get(offset_ns)
+        if arrays is None and read_nodes:
+            onset_key = '{0}:{1}'.format(offset_ns, 'onset')
+            offset_key = '{0}:{1}'.format(offset_ns, 'offset')
+            try:
+                arrays = (
+                    array('l', (self._node[token_id][onset_key]
+                                for token_id in self.token_ids)),
+                    array('l', (self._node[token_id][offset_key]
+                                for token_id in self.token_ids)))
+            except KeyError:  # no (complete) offsets stored in the nodes
+                return None
+            self._namespace_offsets[offset_ns] = arrays
+        return arrays
+
+    def set_offset_arrays(self, offset_ns, onsets, offsets):
+        """sets the onsets and offsets of all tokens in the given namespace"""
+        self._namespace_offsets[offset_ns] = (onsets, offsets)
+
+    def get_string(self, token_id):
+        """returns the token string of the given token node"""
+        position = self.token_ids.positions.get(token_id)
+        if position is None:  # not in the tokens list (or in a merged graph)
+            return self._node[token_id][self._token_attrib]
+        return self.strings[position]
+
+    def join(self, token_ids):
+        """
+        returns the string representation of the given token node IDs
+        (i.e. their token strings joined by spaces). If the tokens are
+        adjacent and in order, this is just a slice of ``text``.
+        """
+        positions = self.token_ids.positions
+        if token_ids and all(token_id in positions for token_id in token_ids):
+            first_pos = positions[token_ids[0]]
+            if all(positions[token_id] == first_pos + i
+                   for i, token_id in enumerate(token_ids)):
+                last_pos = first_pos + len(token_ids) - 1
+                return self.text[self.onsets[first_pos]:self.offsets[last_pos]]
+        return ' '.join(self.get_string(token_id) for token_id in token_ids)
+
+
 class DiscourseDocumentGraph(MultiDiGraph):
     """
     Base class for representing annotated documents as directed graphs
@@ -49,9 +266,11 @@ class DiscourseDocumentGraph(MultiDiGraph):
         sorted list of all sentence root node IDs (of sentences
         contained in this document graph -- iff the document was annotated
         for sentence boundaries in one of the layers present in this graph)
-    tokens : list of int
+    tokens : TokenList of int
         a list of node IDs (int) which represent the tokens in the
-        order they occur in the text
+        order they occur in the text. It also maps each token node ID
+        to its (int) position, cf. ``TokenList.position``.
+        Lists assigned to this attribute are converted into a TokenList.
 
     TODO list:
 
@@ -86,6 +305,36 @@ class DiscourseDocumentGraph(MultiDiGraph):
         """
         # super calls __init__() of base class MultiDiGraph
         super(DiscourseDocumentGraph, self).__init__()
+        # inverted indices, which map from a layer name to the IDs of all
+        # nodes / edges (source, target, key) that belong to this layer
+        # (and from an edge type to all edges of that type).
+        # They are updated by all methods that add or remove nodes, edges
+        # or layers.
+        self._node_layer_index = defaultdict(OrderedDict)
+        self._edge_layer_index = defaultdict(OrderedDict)
+        self._edge_type_index = defaultdict(OrderedDict)
+        # maps from a node ID to the (sorted) token node IDs that it spans
+        # (and to the relative bitmask of their token positions, cf.
+        # _get_relative_span_mask()).
+        # It is filled by get_span() and cleared whenever nodes are removed
+        # or updated, whenever non-pointing edges are added or removed and
+        # whenever the tokens list changes (cf. _get_span_cache()).
+        self._span_cache = {}
+        self._span_mask_cache = {}
+        self._span_cache_tokens = None
+        # column-oriented token strings and offsets (cf. token_table)
+        self._token_table = None
+        self._token_table_tokens = None
+        # namespaces in which add_offsets() added onsets/offsets to the
+        # tokens (these are recomputed when the tokens change)
+        self._offset_namespaces = set()
+        # layer registry: all nodes/edges with the same layers share the
+        # same frozenset of layers, and each layer is assigned one bit of
+        # a bitmask (cf. layer_mask())
+        self._layersets = {}
+        self._layer_bits = {}
+        self._layerset_masks = {}
+
         self.name = name
         self.ns = namespace
         self.root = root if root else self.ns+':root_node'
@@ -95,6 +344,32 @@ class DiscourseDocumentGraph(MultiDiGraph):
         self.sentences = []
         self.tokens = []
 
+    @property
+    def tokens(self):
+        """the token node IDs of the document (in the order they occur)"""
+        return self._tokens
+
+    @tokens.setter
+    def tokens(self, token_ids):
+        if not isinstance(token_ids, TokenList):
+            token_ids = TokenList(token_ids)
+        self._tokens = token_ids
+
+    @property
+    def token_table(self):
+        """
+        a ``TokenTable`` containing the token strings and offsets of this
+        document. It is rebuilt when the tokens list has changed or a
+        node was updated or removed since it was built.
+        """
+        tokens = self.tokens
+        tokens_state = (id(tokens), tokens.changes)
+        if self._token_table is None or \
+                self._token_table_tokens != tokens_state:
+            self._token_table = TokenTable(self)
+            self._token_table_tokens = tokens_state
+        return self._token_table
+
     def add_offsets(self, offset_ns=None):
         """
         adds the onset and offset to each token in the document graph, i.e.
@@ -102,15 +377,32 @@ class DiscourseDocumentGraph(MultiDiGraph):
         """
         if offset_ns is None:
             offset_ns = self.ns
-
-        onset = 0
-        offset = 0
-
-        for token_id, token_str in self.get_tokens():
-            offset = onset + len(token_str)
-            self.node[token_id]['{0}:{1}'.format(offset_ns, 'onset')] = onset
-            self.node[token_id]['{0}:{1}'.format(offset_ns, 'offset')] = offset
-            onset = offset + 1
+        onset_key = '{0}:{1}'.format(offset_ns, 'onset')
+        offset_key = '{0}:{1}'.format(offset_ns, 'offset')
+
+        table = self.token_table
+        for token_id, onset, offset in izip(table.token_ids, table.onsets,
+                                            table.offsets):
+            token_attrs = self.node[token_id]
+            token_attrs[onset_key] = onset
+            token_attrs[offset_key] = offset
+        table.set_offset_arrays(offset_ns, table.onsets, table.offsets)
+        self._offset_namespaces.add(offset_ns)
+
+    def _get_offset_arrays(self, offset_ns):
+        """
+        returns the onset and offset arrays of all tokens in the given
+        namespace (cf. ``TokenTable.get_offset_arrays``). If the tokens don't
+        have offsets in this namespace, yet, or if the tokens have changed
+        since ``add_offsets`` was called, the offsets will be (re)added.
+        """
+        table = self.token_table
+        read_nodes = offset_ns not in self._offset_namespaces
+        arrays = table.get_offset_arrays(offset_ns, read_nodes)
+        if arrays is None:
+            self.add_offsets(offset_ns)
+            arrays = table.get_offset_arrays(offset_ns, read_nodes=False)
+        return arrays
 
     def get_offsets(self, token_node_id=None, offset_ns=None):
         """
@@ -141,20 +433,41 @@ class DiscourseDocumentGraph(MultiDiGraph):
         if offset_ns is None:
             offset_ns = self.ns
 
-        try:
-            if token_node_id is not None:
-                assert istoken(self, token_node_id), \
-                    "'{}' is not a token node.".format(token_node_id)
-                onset = self.node[token_node_id]['{0}:{1}'.format(offset_ns, 'onset')]
-                offset = self.node[token_node_id]['{0}:{1}'.format(offset_ns, 'offset')]
-                return (onset, offset)
-            else:  # return offsets for all tokens in the document
-                return self._get_all_offsets(offset_ns)
-
-        # if the document doesn't have offsets: add them and rerun this method
-        except KeyError as e:
-            self.add_offsets(offset_ns)
-            return self.get_offsets(token_node_id, offset_ns)
+        if token_node_id is None:  # return offsets for all tokens
+            return self._get_all_offsets(offset_ns)
+
+        assert istoken(self, token_node_id), \
+            "'{}' is not a token node.".format(token_node_id)
+        onsets, offsets = self._get_offset_arrays(offset_ns)
+        position = self.tokens.positions.get(token_node_id)
+        if position is None:  # token isn't in the tokens list
+            token_attrs = self.node[token_node_id]
+            return (token_attrs['{0}:{1}'.format(offset_ns, 'onset')],
+                    token_attrs['{0}:{1}'.format(offset_ns, 'offset')])
+        return (onsets[position], offsets[position])
+
+    def get_token_at_offset(self, char_offset, offset_ns=None):
+        """
+        returns the node ID of the token that covers the given character
+        position (or None, if the position is between two tokens or outside
+        of the text).
+
+        Parameters
+        ----------
+        char_offset : int
+            a character position in the text of the document
+        offset_ns : str or None
+            The namespace from which the offsets will be retrieved. If no
+            namespace is given, the default namespace of this document graph is
+            chosen
+        """
+        if offset_ns is None:
+            offset_ns = self.ns
+        onsets, offsets = self._get_offset_arrays(offset_ns)
+        position = bisect_right(onsets, char_offset) - 1
+        if position >= 0 and char_offset < offsets[position]:
+            return self.tokens[position]
+        return None
 
     def _get_all_offsets(self, offset_ns=None):
         """
@@ -175,10 +488,10 @@ class DiscourseDocumentGraph(MultiDiGraph):
             offset int) tuples, which represents all the tokens in the order
             they occur in the document.
         """
-        for token_id, _token_str in self.get_tokens():
-            onset = self.node[token_id]['{0}:{1}'.format(offset_ns, 'onset')]
-            offset = self.node[token_id]['{0}:{1}'.format(offset_ns, 'offset')]
-            yield (token_id, onset, offset)
+        if offset_ns is None:
+            offset_ns = self.ns
+        onsets, offsets = self._get_offset_arrays(offset_ns)
+        return izip(self.tokens, onsets, offsets)
 
     def get_phrases(self, ns=None, layer='syntax', cat_key='cat', cat_val='NP'):
         """yield all node IDs that dominate the given phrase type, e.g. all NPs"""
@@ -200,6 +513,8 @@ class DiscourseDocumentGraph(MultiDiGraph):
             the set of layers the node belongs to,
             e.g. {'tiger:token', 'anaphoricity:annotation'}.
             Will be set to {self.ns} if None.
+            The layers are stored as a frozenset, which is shared by all
+            nodes and edges of the graph that belong to the same layers.
         attr_dict : dictionary, optional (default= no attributes)
             Dictionary of node attributes.  Key/value pairs will
             update existing data associated with the node.
@@ -241,12 +556,12 @@ class DiscourseDocumentGraph(MultiDiGraph):
         """
         if not layers:
             layers = {self.ns}
-        assert isinstance(layers, set), \
+        assert isinstance(layers, (set, frozenset)), \
             "'layers' parameter must be given as a set of strings."
         assert all((isinstance(layer, str) for layer in layers)), \
             "All elements of the 'layers' set must be strings."
         # add layers to keyword arguments dict
-        attr.update({'layers': layers})
+        attr.update({'layers': self._intern_layers(layers)})
 
         # set up attribute dict
         if attr_dict is None:
@@ -261,16 +576,19 @@ class DiscourseDocumentGraph(MultiDiGraph):
             self.succ[n] = {}
             self.pred[n] = {}
             self.node[n] = attr_dict
+            self._index_node_layers(n, layers)
         else:  # update attr even if node already exists
             # if a node exists, its attributes will be updated, except
             # for the layers attribute. the value of 'layers' will
             # be the union of the existing layers set and the new one.
             existing_layers = self.node[n]['layers']
-            all_layers = existing_layers.union(layers)
+            all_layers = self._intern_layers(existing_layers.union(layers))
             attrs_without_layers = {k: v for (k, v) in attr_dict.items()
                                     if k != 'layers'}
             self.node[n].update(attrs_without_layers)
             self.node[n].update({'layers': all_layers})
+            self._index_node_layers(n, layers)
+            self._clear_node_caches()
 
     def add_nodes_from(self, nodes, **attr):
         """Add multiple nodes.
@@ -328,7 +646,7 @@ class DiscourseDocumentGraph(MultiDiGraph):
                     ndict['layers'] = {self.ns}
 
                 layers = ndict['layers']
-                assert isinstance(layers, set), \
+                assert isinstance(layers, (set, frozenset)), \
                     "'layers' must be specified as a set of strings."
                 assert all((isinstance(layer, str) for layer in layers)), \
                     "All elements of the 'layers' set must be strings."
@@ -338,14 +656,18 @@ class DiscourseDocumentGraph(MultiDiGraph):
                     self.pred[node_id] = {}
                     newdict = additional_attribs.copy()
                     newdict.update(ndict)  # all given attribs incl. layers
+                    newdict['layers'] = self._intern_layers(layers)
                     self.node[node_id] = newdict
                 else:  # node already exists
                     existing_layers = self.node[node_id]['layers']
-                    all_layers = existing_layers.union(layers)
+                    all_layers = self._intern_layers(
+                        existing_layers.union(layers))
 
                     self.node[node_id].update(ndict)
                     self.node[node_id].update(additional_attribs)
                     self.node[node_id].update({'layers': all_layers})
+                    self._clear_node_caches()
+                self._index_node_layers(node_id, layers)
                 continue  # process next node
 
             # newnode check didn't raise an exception
@@ -357,9 +679,15 @@ class DiscourseDocumentGraph(MultiDiGraph):
                 # (node_id, attribute dict) tuple, we don't know which layers
                 # it is part of. Therefore, we'll add the namespace of the
                 # graph as the node layer
-                self.node[n].update({'layers': set([self.ns])})
+                self.node[n].update({'layers': self._intern_layers([self.ns])})
+                self._index_node_layers(n, self.node[n]['layers'])
             else:  # n is a node_id and it's already in the graph
+                old_layers = self.node[n]['layers']
                 self.node[n].update(attr)
+                if 'layers' in attr:
+                    self.node[n]['layers'] = self._intern_layers(attr['layers'])
+                self._reindex_node_layers(n, old_layers)
+                self._clear_node_caches()
 
     def add_edge(self, u, v, layers=None, key=None, attr_dict=None, **attr):
         """Add an edge between u and v.
@@ -438,7 +766,7 @@ class DiscourseDocumentGraph(MultiDiGraph):
         """
         if not layers:
             layers = {self.ns}
-        assert isinstance(layers, set), \
+        assert isinstance(layers, (set, frozenset)), \
             "'layers' parameter must be given as a set of strings."
         assert all((isinstance(layer, str) for layer in layers)), \
             "All elements of the 'layers' set must be strings."
@@ -455,7 +783,7 @@ class DiscourseDocumentGraph(MultiDiGraph):
                 raise AttributeError("The attr_dict argument must be "
                                      "a dictionary: ".format(e))
         for node in (u, v):  # u = source, v = target
-            if node not in self.nodes_iter():
+            if node not in self.succ:
                 self.add_node(node, layers={self.ns})
 
         if v in self.succ[u]:  # if there's already an edge from u to v
@@ -466,13 +794,16 @@ class DiscourseDocumentGraph(MultiDiGraph):
                 key = len(keydict)
                 while key in keydict:
                     key += 1
+            new_edge = key not in keydict
             datadict = keydict.get(key, {})  # works for existing & new edge
-            existing_layers = datadict.get('layers', set())
-            all_layers = existing_layers.union(layers)
+            existing_layers = datadict.get('layers', frozenset())
+            all_layers = self._intern_layers(existing_layers.union(layers))
+            old_edge_type = datadict.get('edge_type')
 
             datadict.update(attr_dict)
             datadict.update({'layers': all_layers})
             keydict[key] = datadict
+            self._index_edge((u, v, key), layers, old_edge_type, new_edge)
 
         else:  # there's no edge between u and v, yet
             # selfloops work this way without special treatment
@@ -480,9 +811,11 @@ class DiscourseDocumentGraph(MultiDiGraph):
                 key = 0
             datadict = {}
             datadict.update(attr_dict)  # includes layers
+            datadict['layers'] = self._intern_layers(layers)
             keydict = {key: datadict}
             self.succ[u][v] = keydict
             self.pred[v][u] = keydict
+            self._index_edge((u, v, key), layers)
 
     def add_edges_from(self, ebunch, attr_dict=None, **attr):
         """Add all the edges in ebunch.
@@ -573,14 +906,14 @@ class DiscourseDocumentGraph(MultiDiGraph):
                 dd['layers'] = {self.ns}
 
             layers = dd['layers']
-            assert isinstance(layers, set), \
+            assert isinstance(layers, (set, frozenset)), \
                 "'layers' must be specified as a set of strings."
             assert all((isinstance(layer, str)
                         for layer in layers)), \
                 "All elements of the 'layers' set must be strings."
             additional_layers = attr_dict.get('layers', {})
             if additional_layers:
-                assert isinstance(additional_layers, set), \
+                assert isinstance(additional_layers, (set, frozenset)), \
                     "'layers' must be specified as a set of strings."
                 assert all((isinstance(layer, str)
                             for layer in additional_layers)), \
@@ -611,6 +944,153 @@ class DiscourseDocumentGraph(MultiDiGraph):
             self.add_edge(u, v, layers=all_layers, key=key,
                           attr_dict=updated_attrs)
 
+    def add_nodes_bulk(self, nodes):
+        """Add a large number of nodes at once.
+
+        In contrast to ``add_nodes_from``, the layers of the nodes are not
+        checked one node at a time, but only once for each distinct
+        ``layers`` set (e.g. a set shared by many nodes). The attribute dicts of new nodes are stored as they are (i.e.
+        they are not copied), so this method should only be fed with dicts
+        that aren't used anywhere else (e.g. the nodes of a graph that will
+        be thrown away afterwards).
+
+        Parameters
+        ----------
+        nodes : iterable of (node ID, attribute dict) tuples
+            Each attribute dict may contain a ``layers`` set. If it doesn't,
+            the node will be added to the ``{self.ns}`` layer. If a node
+            already exists, its attributes will be updated and its layers
+            will be the union of the existing and the new layers.
+
+        Raises
+        ------
+        AssertionError
+            If a ``layers`` attribute is not a set of strings. The check is
+            run before the node is added, so the graph keeps all the nodes
+            that were added before it.
+        """
+        layersets = {}  # maps from id(layers) to layers
+        updated_nodes = False
+        for node_id, ndict in nodes:
+            layers = ndict.get('layers')
+            if not layers:
+                layers = ndict['layers'] = {self.ns}
+            if id(layers) not in layersets:
+                self._validate_layersets((layers,))
+                layersets[id(layers)] = layers
+
+            if node_id not in self.succ:
+                self.succ[node_id] = {}
+                self.pred[node_id] = {}
+                self.node[node_id] = ndict
+                ndict['layers'] = self._intern_layers(layers)
+            else:  # node already exists, cf. add_node()
+                existing_attrs = self.node[node_id]
+                all_layers = self._intern_layers(
+                    existing_attrs['layers'].union(layers))
+                existing_attrs.update(ndict)
+                existing_attrs['layers'] = all_layers
+                updated_nodes = True
+            self._index_node_layers(node_id, layers)
+        if updated_nodes:
+            self._clear_node_caches()
+
+    def add_edges_bulk(self, ebunch):
+        """Add a large number of edges at once.
+
+        In contrast to ``add_edges_from``, the existence of the source and
+        target nodes is checked in constant time and the layers of the edges
+        are only validated once for each distinct ``layers`` set. The attribute
+        dicts of new edges are stored as they are (i.e. they are not copied),
+        cf. ``add_nodes_bulk``.
+
+        Parameters
+        ----------
+        ebunch : iterable of edge tuples
+            Each edge can be a 3-tuple (u, v, attribs) or a
+            4-tuple (u, v, key, attribs). Source/target nodes that don't
+            exist, yet, will be added to the ``{self.ns}`` layer.
+
+        Raises
+        ------
+        AttributeError
+            If an edge is neither a 3-tuple nor a 4-tuple.
+        AssertionError
+            If a ``layers`` attribute is not a set of strings. The check is
+            run before the edge is added, so the graph keeps all the edges
+            that were added before it.
+        """
+        layersets = {}  # maps from id(layers) to layers
+        ns_layers = self._intern_layers([self.ns])
+        for e in ebunch:
+            ne = len(e)
+            if ne == 4:
+                u, v, key, dd = e
+            elif ne == 3:
+                u, v, dd = e
+                key = None
+            else:
+                raise AttributeError(
+                    "Edge tuple {0} must be a 3-tuple (u,v,attribs) "
+                    "or 4-tuple (u,v,key,attribs).".format(e))
+
+            layers = dd.get('layers')
+            if not layers:
+                layers = dd['layers'] = {self.ns}
+            if id(layers) not in layersets:
+                self._validate_layersets((layers,))
+                layersets[id(layers)] = layers
+
+            for node_id in (u, v):
+                if node_id not in self.succ:
+                    self.succ[node_id] = {}
+                    self.pred[node_id] = {}
+                    self.node[node_id] = {'layers': ns_layers}
+                    self._index_node_layers(node_id, ns_layers)
+
+            keydict = self.succ[u].get(v)
+            if keydict is None:  # there's no edge between u and v, yet
+                if key is None:
+                    key = 0
+                dd['layers'] = self._intern_layers(layers)
+                keydict = {key: dd}
+                self.succ[u][v] = keydict
+                self.pred[v][u] = keydict
+                self._index_edge((u, v, key), layers)
+                continue
+
+            if key is None:  # find a unique integer key
+                key = len(keydict)
+                while key in keydict:
+                    key += 1
+            datadict = keydict.get(key)
+            if datadict is None:
+                dd['layers'] = self._intern_layers(layers)
+                keydict[key] = dd
+                self._index_edge((u, v, key), layers)
+            else:  # update an existing edge, cf. add_edge()
+                all_layers = self._intern_layers(
+                    datadict['layers'].union(layers))
+                old_edge_type = datadict.get('edge_type')
+                datadict.update(dd)
+                datadict['layers'] = all_layers
+                self._index_edge((u, v, key), layers, old_edge_type,
+                                 new_edge=False)
+
+    @staticmethod
+    def _validate_layersets(layersets):
+        """
+        checks that each of the given ``layers`` attributes is a set of
+        strings. This is the check that ``add_node``, ``add_edge`` etc. run
+        for each element, but the ``*_bulk`` methods only run it once per
+        distinct ``layers`` set.
+        """
+        for layers in layersets:
+            assert isinstance(layers, (set, frozenset)), \
+                "'layers' must be specified as a set of strings."
+            assert all((isinstance(layer, str) for layer in layers)), \
+                "All elements of the 'layers' set must be strings."
+
     def add_layer(self, element, layer):
         """
         add a layer to an existing node or edge
@@ -632,12 +1112,268 @@ class DiscourseDocumentGraph(MultiDiGraph):
             edges = self.edge[source_id][target_id]
             for edge in edges:
                 existing_layers = edges[edge]['layers']
-                existing_layers.add(layer)
-                edges[edge]['layers'] = existing_layers
+                edges[edge]['layers'] = self._intern_layers(
+                    existing_layers.union([layer]))
+                self._edge_layer_index[layer][
+                    (source_id, target_id, edge)] = None
         if isinstance(element, (str, int)): # node
             existing_layers = self.node[element]['layers']
-            existing_layers.add(layer)
-            self.node[element]['layers'] = existing_layers
+            self.node[element]['layers'] = self._intern_layers(
+                existing_layers.union([layer]))
+            self._node_layer_index[layer][element] = None
+
+    def remove_node(self, n):
+        """Remove node n and all its in- and outgoing edges.
+
+        Parameters
+        ----------
+        n : node
+           A node in the graph
+
+        Raises
+        -------
+        NetworkXError
+           If n is not in the graph.
+        """
+        if n in self.succ:
+            self._unindex_node_layers(n, self.node[n].get('layers', ()))
+            for target_id, keydict in self.succ[n].iteritems():
+                for key, edge_attrs in keydict.iteritems():
+                    self._unindex_edge((n, target_id, key), edge_attrs)
+            for source_id, keydict in self.pred[n].iteritems():
+                if source_id == n:
+                    continue  # self-loops were already handled
+                for key, edge_attrs in keydict.iteritems():
+                    self._unindex_edge((source_id, n, key), edge_attrs)
+            self._clear_node_caches()
+        super(DiscourseDocumentGraph, self).remove_node(n)
+
+    def remove_nodes_from(self, nodes):
+        """Remove multiple nodes (ignoring those that aren't in the graph).
+
+        Parameters
+        ----------
+        nodes : iterable container
+            A container of nodes (list, dict, set, etc.).
+        """
+        for n in list(nodes):
+            try:
+                self.remove_node(n)
+            except NetworkXError:
+                pass
+
+    def remove_edge(self, u, v, key=None):
+        """Remove an edge between u and v.
+
+        Parameters
+        ----------
+        u, v : nodes
+            Remove an edge between nodes u and v.
+        key : hashable identifier, optional (default=None)
+            Used to distinguish multiple edges between a pair of nodes.
+            If None, remove a single (arbitrary) edge between u and v.
+
+        Raises
+        ------
+        NetworkXError
+            If there is not an edge between u and v, or
+            if there is no edge with the specified key.
+        """
+        old_edges = dict(self.succ.get(u, {}).get(v, {}))
+        super(DiscourseDocumentGraph, self).remove_edge(u, v, key=key)
+        remaining_edges = self.succ[u].get(v, {})
+        for old_key, edge_attrs in old_edges.iteritems():
+            if old_key not in remaining_edges:
+                self._unindex_edge((u, v, old_key), edge_attrs)
+
+    def clear(self):
+        """Remove all nodes and edges from the graph (incl. the root node)."""
+        super(DiscourseDocumentGraph, self).clear()
+        self._node_layer_index.clear()
+        self._edge_layer_index.clear()
+        self._edge_type_index.clear()
+        self._clear_node_caches()
+
+    def _rebuild_indices(self):
+        """
+        rebuilds the layer and edge type indices from scratch and clears all
+        caches. This is used after the node and adjacency dicts were rebuilt
+        in one go (cf. ``relabel_nodes``), instead of updating the indices
+        one node/edge at a time.
+        """
+        self._node_layer_index.clear()
+        self._edge_layer_index.clear()
+        self._edge_type_index.clear()
+        for node_id, node_attrs in self.node.iteritems():
+            layers = self._intern_layers(node_attrs['layers'])
+            node_attrs['layers'] = layers
+            self._index_node_layers(node_id, layers)
+        for source_id, targets in self.succ.iteritems():
+            for target_id, keydict in targets.iteritems():
+                for key, edge_attrs in keydict.iteritems():
+                    edge = (source_id, target_id, key)
+                    layers = self._intern_layers(edge_attrs['layers'])
+                    edge_attrs['layers'] = layers
+                    for layer in layers:
+                        self._edge_layer_index[layer][edge] = None
+                    edge_type = edge_attrs.get('edge_type')
+                    if edge_type is not None:
+                        self._edge_type_index[edge_type][edge] = None
+        self._clear_node_caches()
+
+    def _intern_layers(self, layers):
+        """
+        returns the (shared) frozenset of layers used by this graph, which is
+        equal to the given collection of layers
+        """
+        layerset = frozenset(layers)
+        interned = self._layersets.get(layerset)
+        if interned is None:
+            interned = self._layersets[layerset] = layerset
+            self._register_layers(interned)
+        return interned
+
+    def _register_layers(self, layers):
+        """
+        returns the bitmask of the given layers of a node/edge, assigning a
+        new bit to each layer that isn't used in this graph, yet.
+        """
+        if isinstance(layers, frozenset):
+            mask = self._layerset_masks.get(layers)
+            if mask is not None:
+                return mask
+
+        mask = 0
+        for layer in layers:
+            bit = self._layer_bits.get(layer)
+            if bit is None:
+                bit = self._layer_bits[layer] = 1 << len(self._layer_bits)
+            mask |= bit
+
+        if isinstance(layers, frozenset):
+            self._layerset_masks[layers] = mask
+        return mask
+
+    def layer_mask(self, layers):
+        """
+        returns a bitmask representing the given layer(s). Each layer used
+        in this graph is assigned its own bit, so that layer membership can
+        be tested with a bitwise AND, e.g.
+        ``docgraph.layer_mask(node_layers) & docgraph.layer_mask(layers)``.
+        Layers that aren't used in this graph are ignored, i.e. querying
+        them doesn't assign any new bits.
+
+        Parameters
+        ----------
+        layers : str or collection of str
+            a layer name or a collection of layer names
+
+        Returns
+        -------
+        mask : int
+            bitmask with one bit set for each of the given layers
+        """
+        if isinstance(layers, basestring):
+            layers = (layers,)
+        elif isinstance(layers, frozenset):  # e.g. the layers of a node
+            mask = self._layerset_masks.get(layers)
+            if mask is not None:
+                return mask
+
+        mask = 0
+        for layer in layers:
+            mask |= self._layer_bits.get(layer, 0)
+        return mask
+
+    def _clear_node_caches(self):
+        """
+        removes all cached data that depends on node attributes, i.e. the
+        token table and all cached spans
+        """
+        self._token_table = None
+        self._clear_span_cache()
+
+    def _clear_span_cache(self):
+        """removes all cached spans (and span bitmasks)"""
+        self._span_cache.clear()
+        self._span_mask_cache.clear()
+
+    def _set_node_layers(self, node_id, layers):
+        """
+        replaces the layers of an existing node. This should only be used
+        in the rare cases where a node must be removed from a layer,
+        otherwise use ``add_node`` or ``add_layer``.
+        """
+        old_layers = self.node[node_id]['layers']
+        self.node[node_id]['layers'] = self._intern_layers(layers)
+        self._reindex_node_layers(node_id, old_layers)
+
+    def _index_node_layers(self, node_id, layers):
+        """adds a node to the given layers of the layer index"""
+        for layer in layers:
+            self._node_layer_index[layer][node_id] = None
+
+    def _unindex_node_layers(self, node_id, layers):
+        """removes a node from the given layers of the layer index"""
+        for layer in layers:
+            _remove_from_index(self._node_layer_index, layer, node_id)
+
+    def _reindex_node_layers(self, node_id, old_layers):
+        """
+        updates the layer index after the ``layers`` attribute of a node was
+        replaced (instead of being updated in-place).
+        """
+        new_layers = self.node[node_id]['layers']
+        if new_layers is not old_layers:
+            self._unindex_node_layers(
+                node_id, set(old_layers).difference(new_layers))
+            self._index_node_layers(node_id, new_layers)
+
+    def _index_edge(self, edge, layers, old_edge_type=None, new_edge=True):
+        """
+        adds an edge (source ID, target ID, key) to the given layers of the
+        layer index and (re)indexes its edge type.
+
+        Parameters
+        ----------
+        edge : (str, str, int) tuple
+            (source ID, target ID, key) of an edge that is already present
+            in the graph
+        layers : set of str
+            the layers that the edge was added to
+        old_edge_type : str or None
+            the edge type of the edge before it was updated (None, if it
+            is a new edge or didn't have an edge type)
+        new_edge : bool
+            False, iff an existing edge was updated
+        """
+        for layer in layers:
+            self._edge_layer_index[layer][edge] = None
+
+        source_id, target_id, key = edge
+        edge_type = self.succ[source_id][target_id][key].get('edge_type')
+        if edge_type != old_edge_type:
+            _remove_from_index(self._edge_type_index, old_edge_type, edge)
+        if edge_type is not None:
+            self._edge_type_index[edge_type][edge] = None
+
+        # pointing relations aren't part of any span
+        pointing = EdgeTypes.pointing_relation
+        if edge_type != pointing or (not new_edge and
+                                     old_edge_type != pointing):
+            self._clear_span_cache()
+
+    def _unindex_edge(self, edge, edge_attrs):
+        """
+        removes an edge (source ID, target ID, key) from the layer and edge
+        type indices.
+        """
+        for layer in edge_attrs.get('layers', ()):
+            _remove_from_index(self._edge_layer_index, layer, edge)
+        _remove_from_index(self._edge_type_index,
+                           edge_attrs.get('edge_type'), edge)
+        if edge_attrs.get('edge_type') != EdgeTypes.pointing_relation:
+            self._clear_span_cache()
 
 
     def get_token(self, token_node_id, token_attrib='token'):
@@ -657,6 +1393,8 @@ class DiscourseDocumentGraph(MultiDiGraph):
         token : unicode
             the token string
         """
+        if token_attrib == 'token':
+            return self.token_table.get_string(token_node_id)
         return self.node[token_node_id][self.ns+':'+token_attrib]
 
     def get_tokens(self, token_attrib='token', token_strings_only=False):
@@ -676,7 +1414,16 @@ class DiscourseDocumentGraph(MultiDiGraph):
             a generator of (token node ID, token string) tuples if
             token_strings_only==False, a generator of token strings otherwise
         """
-        if token_strings_only:
+        if token_attrib == 'token':
+            table = self.token_table
+            if token_strings_only:
+                for token_str in table.strings:
+                    yield token_str
+            else:
+                for token_id, token_str in izip(table.token_ids,
+                                                table.strings):
+                    yield (token_id, token_str)
+        elif token_strings_only:
             for token_id in self.tokens:
                 yield self.get_token(token_id, token_attrib)
         else:
@@ -688,26 +1435,82 @@ class DiscourseDocumentGraph(MultiDiGraph):
         Merges another document graph into the current one, thereby adding all
         the necessary nodes and edges (with attributes, layers etc.).
 
+        The token node IDs of the other graph are mapped to the token node IDs
+        of this graph on the fly (i.e. the other graph isn't relabeled) and
+        all nodes and edges are inserted in bulk. The node/edge attribute
+        dicts of the other graph are (shallowly) copied, so both graphs can
+        still be modified independently after merging.
+
         NOTE: This will only work if both graphs have exactly the same
-        tokenization.
+        tokenization. To merge more than two graphs, use ``merge_many``.
+
+        Parameters
+        ----------
+        other_docgraph : DiscourseDocumentGraph
+            the document graph to merge into this one
+        verbose : bool
+            If True, a tokenization mismatch error will show the tokens
+            around the mismatch in both graphs
+        """
+        # map the token IDs of the other graph to the ones used in this graph
+        old2new = create_token_mapping(other_docgraph, self, verbose=verbose)
+        self._merge_graph(other_docgraph, old2new)
+        self._clear_node_caches()
+
+    def _merge_graph(self, other_docgraph, old2new):
+        """
+        adds the nodes and edges of another document graph to this one (cf.
+        ``merge_graphs``), after its token node IDs were mapped to the token
+        node IDs of this graph (cf. ``create_token_mapping``). The node
+        caches (i.e. the token table and the spans) aren't cleared.
         """
+        other_root = other_docgraph.root
         # keep track of all merged/old root nodes in case we need to
         # delete them or their attributes (e.g. 'metadata')
         if hasattr(self, 'merged_rootnodes'):
-            self.merged_rootnodes.append(other_docgraph.root)
+            self.merged_rootnodes.append(other_root)
+        else:
+            self.merged_rootnodes = [other_root]
+
+        assert not other_docgraph.pred[other_root], \
+            "root node in graph '{}' must not have any ingoing edges".format(
+                other_docgraph.name)
+
+        if hasattr(self, 'renamed_nodes'):
+            self.renamed_nodes.update(old2new)
         else:
-            self.merged_rootnodes = [other_docgraph.root]
+            self.renamed_nodes = old2new
+        new_id = old2new.get
 
-        # renaming the tokens of the other graph to match this one
-        rename_tokens(other_docgraph, self, verbose=verbose)
-        self.add_nodes_from(other_docgraph.nodes(data=True))
+        # the root node of the other graph is merged into this one. The
+        # attribute dicts are copied, as the bulk methods store them as they
+        # are (and intern their layers)
+        self.add_nodes_bulk(
+            (new_id(node_id, node_id), dict(node_attrs))
+            for node_id, node_attrs in other_docgraph.node.iteritems()
+            if node_id != other_root)
 
         # copy token node attributes to the current namespace
-        for node_id, node_attrs in other_docgraph.nodes(data=True):
-            if istoken(other_docgraph, node_id) and \
-                self.ns+':token' not in self.node[node_id]:
-                    self.node[node_id].update({self.ns+':token': other_docgraph.get_token(node_id)})
-        self.add_edges_from(other_docgraph.edges(data=True))
+        token_attrib = self.ns+':token'
+        other_token_attrib = other_docgraph.ns+':token'
+        if token_attrib != other_token_attrib:
+            for node_id, node_attrs in other_docgraph.node.iteritems():
+                if other_token_attrib in node_attrs:
+                    self.node[new_id(node_id, node_id)].setdefault(
+                        token_attrib, node_attrs[other_token_attrib])
+
+        root_edges = []
+        def merged_edges():
+            for source_id, targets in other_docgraph.succ.iteritems():
+                if source_id == other_root:
+                    root_edges.extend(targets.iteritems())
+                    continue
+                source_id = new_id(source_id, source_id)
+                for target_id, keydict in targets.iteritems():
+                    target_id = new_id(target_id, target_id)
+                    for edge_attrs in keydict.itervalues():
+                        yield (source_id, target_id, dict(edge_attrs))
+        self.add_edges_bulk(merged_edges())
 
         # workaround for issues #89 and #96
         # copy the token node IDs / sentence node IDs from the other graph,
@@ -719,8 +1522,18 @@ class DiscourseDocumentGraph(MultiDiGraph):
         if other_docgraph.sentences and not self.sentences:
             self.sentences = other_docgraph.sentences
 
-        # there should be no dangling, unused root nodes in a merged graph
-        self.merge_rootnodes(other_docgraph)
+        # there should be no dangling, unused root nodes in a merged graph,
+        # so we'll attach the edges of the other root node to this one
+        # (like ``merge_rootnodes``, the edges are moved into this namespace)
+        if 'metadata' in other_docgraph.node[other_root]:
+            other_meta = other_docgraph.node[other_root]['metadata']
+            self.node[self.root]['metadata'].update(other_meta)
+        ns_layers = {self.ns}
+        self.add_edges_bulk(
+            (self.root, new_id(target_id, target_id),
+             dict(edge_attrs, layers=ns_layers))
+            for target_id, keydict in root_edges
+            for edge_attrs in keydict.itervalues())
 
     def merge_rootnodes(self, other_docgraph):
         """
@@ -742,6 +1555,14 @@ class DiscourseDocumentGraph(MultiDiGraph):
                 self.add_edge(self.root, target, attr_dict=attrs)
         self.remove_node(other_docgraph.root)
 
+    def freeze(self):
+        """
+        returns a read-only snapshot of this document graph, which is
+        optimized for queries (cf. ``FrozenDocumentGraph``). Later changes
+        to this graph don't affect the snapshot.
+        """
+        return FrozenDocumentGraph(self)
+
     def add_precedence_relations(self):
         """
         add precedence relations to the document graph (i.e. an edge from the
@@ -760,6 +1581,431 @@ class DiscourseDocumentGraph(MultiDiGraph):
                           edge_type=EdgeTypes.precedence_relation)
 
 
+class FrozenDocumentGraph(object):
+    """
+    A read-only snapshot of a ``DiscourseDocumentGraph`` (cf.
+    ``DiscourseDocumentGraph.freeze``), which needs less memory and is
+    faster to query. The memory savings come from the adjacency structure
+    only: the node attribute dicts are copied, so that the snapshot doesn't
+    change along with the original graph.
+
+    ``select_nodes_by_layer``, ``select_edges_by``, ``get_span`` and
+    ``get_pointing_chains`` work on both kinds of graphs.
+
+    Nodes are represented by integers (their index in ``node_ids``). Edges
+    are numbered in the order of their source nodes and stored in
+    compressed sparse row (CSR) format, i.e. the outgoing edges of node
+    ``i`` are the edges ``out_offsets[i]`` to ``out_offsets[i+1] - 1``.
+
+    Attributes
+    ----------
+    name : str
+        name, ID of the document
+    ns : str
+        the namespace of the document
+    root : str
+        name of the document root node ID
+    tokens : tuple of str
+        token node IDs (in the order they occur in the text)
+    node_ids : list of str
+        maps from a node index (int) to a node ID
+    node_index : dict of (str, int)
+        maps from a node ID to a node index
+    node_attrs : list of dict
+        the node attributes of each node (a copy of each attribute dict of
+        the original graph)
+    node_layer_masks : array of int or list of int
+        the layers of each node (bitmask, cf. ``layer_mask``)
+    edge_sources : array of int
+        the source node index of each edge
+    edge_targets : array of int
+        the target node index of each edge
+    edge_keys : list
+        the (networkx) key of each edge
+    edge_types : array of int
+        the edge type of each edge (as an index into ``edge_type_names``)
+    edge_type_names : list of str
+        the edge types used in the graph
+    edge_layer_masks : array of int or list of int
+        the layers of each edge (bitmask, cf. ``layer_mask``)
+    out_offsets : array of int
+        the number of the first outgoing edge of each node (CSR row offsets)
+    in_offsets : array of int
+        the position of the first incoming edge of each node in ``in_edges``
+    in_edges : array of int
+        edge numbers sorted by their target node
+    """
+    def __init__(self, docgraph):
+        """
+        creates a snapshot of the given document graph.
+
+        Parameters
+        ----------
+        docgraph : DiscourseDocumentGraph
+            the document graph to take a snapshot of
+        """
+        self.name = docgraph.name
+        self.ns = docgraph.ns
+        self.root = docgraph.root
+        self.tokens = tuple(docgraph.tokens)
+        self._layer_bits = {}
+        self._mask_layers = {0: frozenset()}
+        # query results: nodes by layer mask, edges by (layer mask, edge
+        # type), spans (as token IDs / as token positions) by node index
+        self._layer_nodes = {}
+        self._selected_edges = {}
+        self._span_cache = {}
+        self._span_positions = {}
+
+        self.node_ids = docgraph.nodes()
+        self.node_index = {node_id: node_index
+                           for node_index, node_id in enumerate(self.node_ids)}
+        self.node_attrs = [dict(docgraph.node[node_id])
+                           for node_id in self.node_ids]
+        self.node_layer_masks = self._mask_array(
+            [self._register_layers(node_attrs['layers'])
+             for node_attrs in self.node_attrs])
+
+        self.edge_sources = array('l')
+        self.edge_targets = array('l')
+        self.edge_keys = []
+        edge_types = []
+        self.edge_type_names = []
+        self._edge_type_codes = {}
+        edge_layer_masks = []
+        # edge attributes other than 'layers' and 'edge_type' (or None)
+        self._edge_extra_attrs = []
+        self.out_offsets = array('l', [0])
+        for source_index, source_id in enumerate(self.node_ids):
+            for target_id, keydict in docgraph.succ[source_id].iteritems():
+                target_index = self.node_index[target_id]
+                for key, edge_attrs in keydict.iteritems():
+                    self.edge_sources.append(source_index)
+                    self.edge_targets.append(target_index)
+                    self.edge_keys.append(key)
+                    edge_types.append(
+                        self._register_edge_type(edge_attrs.get('edge_type')))
+                    edge_layer_masks.append(
+                        self._register_layers(edge_attrs['layers']))
+                    extra_attrs = {
+                        attr: val for attr, val in edge_attrs.iteritems()
+                        if attr not in ('layers', 'edge_type')}
+                    self._edge_extra_attrs.append(extra_attrs or None)
+            self.out_offsets.append(len(self.edge_sources))
+        self.edge_layer_masks = self._mask_array(edge_layer_masks)
+        self.edge_types = self._code_array(edge_types)
+        self._type_edges = defaultdict(lambda: array('l'))
+        for edge, code in enumerate(self.edge_types):
+            self._type_edges[code].append(edge)
+        self._type_edges = dict(self._type_edges)
+
+        # maps from the index of a token node to its position in the text.
+        # Token nodes that aren't in the tokens list are put after all
+        # tokens (in their natural sort order), cf. TokenList.sort_key()
+        token_attrib = self.ns+':token'
+        self._token_positions = {
+            self.node_index[token_id]: position
+            for position, token_id in enumerate(self.tokens)
+            if token_id in self.node_index
+            and token_attrib in self.node_attrs[self.node_index[token_id]]}
+        unlisted_token_ids = sorted(
+            (node_id for node_index, node_id in enumerate(self.node_ids)
+             if token_attrib in self.node_attrs[node_index]
+             and node_index not in self._token_positions),
+            key=natural_sort_key)
+        # maps from a token position to a token node ID
+        self._position_tokens = self.tokens + tuple(unlisted_token_ids)
+        for position, token_id in enumerate(unlisted_token_ids,
+                                            len(self.tokens)):
+            self._token_positions[self.node_index[token_id]] = position
+
+        # sort the edge numbers by target node (counting sort)
+        self.in_offsets = array('l', [0]) * (len(self.node_ids) + 1)
+        for target_index in self.edge_targets:
+            self.in_offsets[target_index+1] += 1
+        for node_index in xrange(len(self.node_ids)):
+            self.in_offsets[node_index+1] += self.in_offsets[node_index]
+        self.in_edges = array('l', [0]) * len(self.edge_targets)
+        next_positions = self.in_offsets[:-1]
+        for edge, target_index in enumerate(self.edge_targets):
+            self.in_edges[next_positions[target_index]] = edge
+            next_positions[target_index] += 1
+
+    def _register_layers(self, layers):
+        """returns the bitmask of the given layers, assigning new bits"""
+        mask = 0
+        for layer in layers:
+            bit = self._layer_bits.get(layer)
+            if bit is None:
+                bit = self._layer_bits[layer] = 1 << len(self._layer_bits)
+            mask |= bit
+        self._mask_layers.setdefault(mask, frozenset(layers))
+        return mask
+
+    def _register_edge_type(self, edge_type):
+        """returns the code (int) of the given edge type"""
+        code = self._edge_type_codes.get(edge_type)
+        if code is None:
+            code = self._edge_type_codes[edge_type] = len(self.edge_type_names)
+            self.edge_type_names.append(edge_type)
+        return code
+
+    def _code_array(self, codes):
+        """
+        returns an array of the given edge type codes, using the smallest
+        integer type that can hold all the edge types of the graph
+        """
+        num_of_types = len(self.edge_type_names)
+        for typecode in ('B', 'H', 'I'):
+            if num_of_types <= 2 ** (array(typecode).itemsize * 8):
+                return array(typecode, codes)
+        return array('l', codes)
+
+    def _mask_array(self, masks):
+        """
+        returns an array of the given bitmasks (or a list, if there are too
+        many layers to fit the masks into machine-sized integers)
+        """
+        if len(self._layer_bits) <= array('L').itemsize * 8:
+            return array('L', masks)
+        return masks
+
+    def __len__(self):
+        return len(self.node_ids)
+
+    def __iter__(self):
+        return iter(self.node_ids)
+
+    def __contains__(self, node_id):
+        return node_id in self.node_index
+
+    def layer_mask(self, layers):
+        """
+        returns a bitmask representing the given layer(s), cf.
+        ``DiscourseDocumentGraph.layer_mask``. Layers that aren't used in
+        this graph are ignored.
+        """
+        if isinstance(layers, basestring):
+            layers = (layers,)
+        mask = 0
+        for layer in layers:
+            mask |= self._layer_bits.get(layer, 0)
+        return mask
+
+    def number_of_edges(self):
+        """returns the number of edges in the graph"""
+        return len(self.edge_sources)
+
+    def nodes_iter(self, data=False):
+        """
+        yields all node IDs or -- if data is True -- (node ID, node
+        attribute dict) tuples.
+        """
+        if data:
+            return izip(self.node_ids, self.node_attrs)
+        return iter(self.node_ids)
+
+    def edges_iter(self, data=False):
+        """
+        yields all edges as (source, target) tuples or -- if data is True --
+        (source, target, edge attribute dict) tuples.
+        """
+        return self._iter_edges(xrange(len(self.edge_sources)), data)
+
+    def edge_attrs(self, edge):
+        """
+        returns a (new) attribute dict of the given edge (int).
+        """
+        edge_attrs = {'layers': self._mask_layers[self.edge_layer_masks[edge]]}
+        edge_type = self.edge_type_names[self.edge_types[edge]]
+        if edge_type is not None:
+            edge_attrs['edge_type'] = edge_type
+        extra_attrs = self._edge_extra_attrs[edge]
+        if extra_attrs:
+            edge_attrs.update(extra_attrs)
+        return edge_attrs
+
+    def _iter_edges(self, edges, data=False):
+        """
+        given an iterable of edge numbers, yields (source, target) tuples
+        or -- if data is True -- (source, target, edge attribute dict) tuples.
+        """
+        node_ids = self.node_ids
+        for edge in edges:
+            source_id = node_ids[self.edge_sources[edge]]
+            target_id = node_ids[self.edge_targets[edge]]
+            if data:
+                yield (source_id, target_id, self.edge_attrs(edge))
+            else:
+                yield (source_id, target_id)
+
+    def successors(self, node_id):
+        """returns the IDs of the nodes the given node has edges to"""
+        node_index = self.node_index[node_id]
+        targets = self.edge_targets[self.out_offsets[node_index]:
+                                    self.out_offsets[node_index+1]]
+        return [self.node_ids[target_index]
+                for target_index in OrderedDict.fromkeys(targets)]
+
+    def predecessors(self, node_id):
+        """returns the IDs of the nodes that have edges to the given node"""
+        node_index = self.node_index[node_id]
+        sources = (self.edge_sources[edge] for edge in
+                   self.in_edges[self.in_offsets[node_index]:
+                                 self.in_offsets[node_index+1]])
+        return [self.node_ids[source_index]
+                for source_index in OrderedDict.fromkeys(sources)]
+
+    def select_nodes_by_layer(self, layer=None, data=False):
+        """
+        yields all nodes belonging to (any of) the given layer(s), cf.
+        ``select_nodes_by_layer``.
+        """
+        if layer is None:
+            return self.nodes_iter(data=data)
+        mask = self.layer_mask(layer)
+        node_indices = self._layer_nodes.get(mask)
+        if node_indices is None:
+            node_indices = self._layer_nodes[mask] = tuple(
+                node_index for node_index, node_mask
+                in enumerate(self.node_layer_masks) if node_mask & mask)
+        if data:
+            return ((self.node_ids[node_index], self.node_attrs[node_index])
+                    for node_index in node_indices)
+        return (self.node_ids[node_index] for node_index in node_indices)
+
+    def select_edges_by(self, layer=None, edge_type=None, data=False):
+        """
+        yields all edges with the given edge type and layer, cf.
+        ``select_edges_by``.
+        """
+        if layer is None and edge_type is None:
+            return self.edges_iter(data=data)
+        mask = None if layer is None else self.layer_mask(layer)
+        query = (mask, edge_type)
+        edges = self._selected_edges.get(query)
+        if edges is None:
+            if edge_type is None:
+                edges = xrange(len(self.edge_sources))
+            else:
+                edges = self._type_edges.get(
+                    self._edge_type_codes.get(edge_type), ())
+            if mask is not None:
+                edges = [edge for edge in edges
+                         if self.edge_layer_masks[edge] & mask]
+            edges = self._selected_edges[query] = array('l', edges)
+        return self._iter_edges(edges, data)
+
+    def _span_children(self, node_index):
+        """
+        returns the indices of the nodes that the given node dominates or
+        spans, cf. ``_span_children``.
+        """
+        pointing = self._edge_type_codes.get(EdgeTypes.pointing_relation)
+        return [self.edge_targets[edge] for edge
+                in xrange(self.out_offsets[node_index],
+                          self.out_offsets[node_index+1])
+                if self.edge_targets[edge] != node_index
+                and self.edge_types[edge] != pointing]
+
+    def get_span(self, node_id):
+        """
+        returns all the tokens that are dominated or in a span relation with
+        the given node, cf. ``get_span``.
+        """
+        node_index = self.node_index[node_id]
+        span = self._span_cache.get(node_index)
+        if span is None:
+            token_positions = self._token_positions
+
+            def combine(node_index, child_spans):
+                # spans are sorted tuples of token positions
+                if len(child_spans) == 1 and node_index not in token_positions:
+                    return child_spans[0]
+                positions = set()
+                if node_index in token_positions:
+                    positions.add(token_positions[node_index])
+                for child_span in child_spans:
+                    positions.update(child_span)
+                return tuple(sorted(positions))
+
+            positions = fold(node_index, self._span_children, combine,
+                             results=self._span_positions)
+            span = self._span_cache[node_index] = tuple(
+                self._position_tokens[position] for position in positions)
+        return list(span)
+
+
+def _remove_from_index(index, key, element):
+    """
+    removes an element from an inverted index (a dict that maps from a key,
+    e.g. a layer name, to an ordered dict of elements). Keys without any
+    elements are removed from the index.
+    """
+    elements = index.get(key)
+    if elements is not None:
+        elements.pop(element, None)
+        if not elements:
+            del index[key]
+
+
+def merge_many(docgraphs, verbose=False):
+    """
+    merges several document graphs (e.g. all the annotation layers of one
+    document) into the first one. The result is the same as merging them
+    one after another with ``merge_graphs``, but the tokens of each graph
+    are aligned only once against the same reference tokenization (the
+    tokens of the first graph that has any), before any graph is changed.
+    All the graphs are then added to the first one in a single pass.
+
+    NOTE: This will only work if all graphs have exactly the same
+    tokenization. As with ``merge_graphs``, the attribute dicts of the
+    merged graphs are copied, so they aren't changed by later
+    modifications of the merged graph.
+
+    Parameters
+    ----------
+    docgraphs : list of DiscourseDocumentGraph
+        the document graphs to merge
+    verbose : bool
+        If True, a tokenization mismatch error will show the tokens around
+        the mismatch in both graphs
+
+    Returns
+    -------
+    merged_docgraph : DiscourseDocumentGraph
+        the first of the given graphs, which now contains all the others
+
+    Raises
+    ------
+    ValueError
+        if no graphs are given or if the tokenization of one of the graphs
+        doesn't match the reference tokenization. In the latter case, none
+        of the graphs will be changed.
+    """
+    if not docgraphs:
+        raise ValueError("Can't merge an empty list of document graphs.")
+    merged_docgraph = docgraphs[0]
+
+    reference = merged_docgraph if merged_docgraph.tokens else None
+    mappings = []
+    for docgraph in docgraphs[1:]:
+        if reference is None:
+            # the merged graph will use the token node IDs of the first
+            # graph that has any tokens
+            mappings.append({})
+            if docgraph.tokens:
+                reference = docgraph
+        else:
+            mappings.append(
+                create_token_mapping(docgraph, reference, verbose=verbose))
+
+    for docgraph, old2new in izip(docgraphs[1:], mappings):
+        merged_docgraph._merge_graph(docgraph, old2new)
+    merged_docgraph._clear_node_caches()
+    return merged_docgraph
+
+
 def rename_tokens(docgraph_with_old_names, docgraph_with_new_names, verbose=False):
     """
     Renames the tokens of a graph (``docgraph_with_old_names``) in-place,
@@ -779,8 +2025,10 @@ def rename_tokens(docgraph_with_old_names, docgraph_with_new_names, verbose=Fals
     else:
         docgraph_with_new_names.renamed_nodes = old2new
 
+    new_token_ids = [old2new[token_id]
+                     for token_id in docgraph_with_old_names.tokens
+                     if token_id in old2new]
     relabel_nodes(docgraph_with_old_names, old2new, copy=False)
-    new_token_ids = old2new.values()
 
     # new_token_ids could be empty (if docgraph_with_new_names is still empty)
     if new_token_ids:
@@ -809,33 +2057,35 @@ def create_token_mapping(docgraph_with_old_names, docgraph_with_new_names,
         ID used in ``docgraph_with_new_names`` to reference the same token
     """
     def kwic_string(docgraph, keyword_index):
-        tokens = [tok for (tokid, tok) in list(docgraph.get_tokens())]
+        tokens = docgraph.token_table.strings
         before, keyword, after = get_kwic(tokens, keyword_index)
         return "{0} (Index: {1}): {2} [[{3}]] {4}\n".format(
             docgraph.name, keyword_index, ' '.join(before), keyword,
             ' '.join(after))
 
-    # generators of (token ID, token) tuples
-    old_token_gen = docgraph_with_old_names.get_tokens()
-    new_token_gen = docgraph_with_new_names.get_tokens()
-
-    old2new = {}
-    for i, (new_tok_id, new_tok) in enumerate(new_token_gen):
-        old_tok_id, old_tok = old_token_gen.next()
-        if new_tok != old_tok:  # token mismatch
-            if verbose:
-                raise ValueError(u"Tokenization mismatch:\n{0}{1}".format(
-                    kwic_string(docgraph_with_old_names, i),
-                    kwic_string(docgraph_with_new_names, i)))
-            raise ValueError(
-                u"Tokenization mismatch: {0} ({1}) vs. {2} ({3})\n"
-                "\t{4} != {5}".format(
-                    docgraph_with_new_names.name, docgraph_with_new_names.ns,
-                    docgraph_with_old_names.name, docgraph_with_old_names.ns,
-                    new_tok, old_tok).encode('utf-8'))
-        else:
-            old2new[old_tok_id] = new_tok_id
-    return old2new
+    # the tokens of both graphs are compared as lists (instead of one token
+    # at a time) and the mapping is built with one pass over both token lists
+    old_table = docgraph_with_old_names.token_table
+    new_table = docgraph_with_new_names.token_table
+    old_strings, new_strings = old_table.strings, new_table.strings
+
+    if old_strings[:len(new_strings)] != new_strings:
+        # find the first token mismatch (or the first missing token)
+        for i, new_tok in enumerate(new_strings):
+            old_tok = old_strings[i] if i < len(old_strings) else u''
+            if new_tok != old_tok:
+                break
+        if verbose:
+            raise ValueError(u"Tokenization mismatch:\n{0}{1}".format(
+                kwic_string(docgraph_with_old_names, i),
+                kwic_string(docgraph_with_new_names, i)))
+        raise ValueError(
+            u"Tokenization mismatch: {0} ({1}) vs. {2} ({3})\n"
+            "\t{4} != {5}".format(
+                docgraph_with_new_names.name, docgraph_with_new_names.ns,
+                docgraph_with_old_names.name, docgraph_with_old_names.ns,
+                new_tok, old_tok).encode('utf-8'))
+    return dict(izip(old_table.token_ids, new_table.token_ids))
 
 
 
@@ -875,9 +2125,6 @@ def get_kwic(tokens, index, context_window=5):
 
 def get_annotation_layers(docgraph):
     """
-    WARNING: this is higly inefficient!
-    Fix this via Issue #36.
-
     Returns
     -------
     all_layers : set or dict
@@ -889,9 +2136,6 @@ def get_annotation_layers(docgraph):
 
 def get_top_level_layers(docgraph):
     """
-    WARNING: this is higly inefficient!
-    Fix this via Issue #36.
-
     Returns
     -------
     top_level_layers : set
@@ -904,38 +2148,24 @@ def get_top_level_layers(docgraph):
 
 def get_node_annotation_layers(docgraph):
     """
-    WARNING: this is higly inefficient!
-    Fix this via Issue #36.
-
     Returns
     -------
     all_layers : set or dict
         the set of all annotation layers used for annotating nodes in the given
         graph
     """
-    all_layers = set()
-    for node_id, node_attribs in docgraph.nodes_iter(data=True):
-        for layer in node_attribs['layers']:
-            all_layers.add(layer)
-    return all_layers
+    return set(docgraph._node_layer_index)
 
 
 def get_edge_annotation_layers(docgraph):
     """
-    WARNING: this is higly inefficient!
-    Fix this via Issue #36.
-
     Returns
     -------
     all_layers : set or dict
         the set of all annotation layers used for annotating edges in the given
         graph
     """
-    all_layers = set()
-    for source_id, target_id, edge_attribs in docgraph.edges_iter(data=True):
-        for layer in edge_attribs['layers']:
-            all_layers.add(layer)
-    return all_layers
+    return set(docgraph._edge_layer_index)
 
 
 def get_span_offsets(docgraph, node_id):
@@ -950,12 +2180,18 @@ def get_span_offsets(docgraph, node_id):
     """
     try:
         span = get_span(docgraph, node_id)
-        # workaround for issue #138
-        # TODO: when #138 is fixed, just take the first onset / last offset
+        positions = docgraph.tokens.positions
+        if span and span[0] in positions and span[-1] in positions:
+            # spans are sorted by token position, so the first token has the
+            # lowest onset and the last one has the highest offset
+            onsets, offsets = docgraph._get_offset_arrays(docgraph.ns)
+            return (onsets[positions[span[0]]], offsets[positions[span[-1]]])
+
+        # workaround for issue #138 (tokens that aren't in the tokens list)
         onsets, offsets = zip(*[docgraph.get_offsets(tok_node)
                                 for tok_node in span])
         return (min(onsets), max(offsets))
-    except KeyError as _:
+    except (KeyError, ValueError) as _:
         raise KeyError("Node '{}' doesn't span any tokens.".format(node_id))
 
 
@@ -965,28 +2201,106 @@ def get_span(docgraph, node_id, debug=False):
     the given node. If debug is set to True, you'll get a warning if the
     graph is cyclic.
 
+    Spans are computed in one (iterative) pass over all the nodes below the
+    given node and are cached in the document graph, i.e. the spans of
+    overlapping subtrees are only computed once.
+
     Returns
     -------
     span : list of str
         sorted list of token nodes (token node IDs)
+
+    Raises
+    ------
+    RuntimeError
+        If the node is part of a cycle of non-pointing relations
+        (self-loops are ignored).
     """
+    if isinstance(docgraph, FrozenDocumentGraph):
+        return docgraph.get_span(node_id)
+
     if debug is True and is_directed_acyclic_graph(docgraph) is False:
         warnings.warn(
             ("Can't reliably extract span '{0}' from cyclical graph'{1}'."
-            "Maximum recursion depth may be exceeded.").format(node_id,
-                                                                   docgraph))
-    span = []
-    if docgraph.ns+':token' in docgraph.node[node_id]:
-        span.append(node_id)
-
-    for src_id, target_id, edge_attribs in docgraph.out_edges_iter(node_id,
-                                                                data=True):
-        if src_id == target_id:
-            continue  # ignore self-loops
-        # ignore pointing relations
-        if edge_attribs['edge_type'] != EdgeTypes.pointing_relation:
-            span.extend(get_span(docgraph, target_id))
-    return sorted(span, key=natural_sort_key)
+            "A dominance/spanning cycle will raise a RuntimeError.").format(
+                node_id, docgraph))
+    span = _get_span_cache(docgraph).get(node_id)
+    if span is None:
+        span = _cache_span(docgraph, node_id)
+    return list(span)
+
+
+def get_spans(docgraph, node_ids):
+    """
+    returns the spans of the given nodes (cf. ``get_span``).
+
+    Parameters
+    ----------
+    docgraph : DiscourseDocumentGraph
+        a document graph
+    node_ids : iterable of str
+        the nodes to get the spans for
+
+    Returns
+    -------
+    spans : list of list of str
+        a list of spans (i.e. sorted lists of token node IDs), one for each
+        of the given nodes
+    """
+    return [get_span(docgraph, node_id) for node_id in node_ids]
+
+
+def _get_span_cache(docgraph):
+    """
+    returns the span cache of the given document graph, after clearing it
+    if the tokens list of the graph was replaced or changed since the
+    cached spans were computed.
+    """
+    tokens = docgraph.tokens
+    tokens_state = (id(tokens), tokens.changes)
+    if docgraph._span_cache_tokens != tokens_state:
+        docgraph._clear_span_cache()
+        docgraph._span_cache_tokens = tokens_state
+    return docgraph._span_cache
+
+
+def _span_children(docgraph, node_id):
+    """
+    returns the IDs of the nodes that the given node dominates or spans,
+    i.e. the targets of all its outgoing edges except for self-loops and
+    pointing relations.
+    """
+    return [target_id
+            for target_id, keydict in docgraph.succ[node_id].iteritems()
+            if target_id != node_id and
+            any(edge_attribs.get('edge_type') != EdgeTypes.pointing_relation
+                for edge_attribs in keydict.itervalues())]
+
+
+def _cache_span(docgraph, node_id):
+    """
+    computes the span of the given node and of all the nodes below it,
+    which aren't in the span cache of the document graph, yet. The spans
+    are computed bottom-up (i.e. in post-order) and added to the cache.
+
+    Returns
+    -------
+    span : tuple of str
+        sorted tuple of the token nodes spanned by the given node
+    """
+    token_attrib = docgraph.ns+':token'
+    sort_key = docgraph.tokens.sort_key
+
+    def combine(current_id, child_spans):
+        span = set()
+        if token_attrib in docgraph.node[current_id]:
+            span.add(current_id)
+        for child_span in child_spans:
+            span.update(child_span)
+        return tuple(sorted(span, key=sort_key))
+
+    return fold(node_id, partial(_span_children, docgraph), combine,
+                results=docgraph._span_cache)
 
 
 def get_text(docgraph, node_id=None):
@@ -996,12 +2310,9 @@ def get_text(docgraph, node_id=None):
     document
     """
     if node_id:
-        tokens = (docgraph.node[node_id][docgraph.ns+':token']
-                  for node_id in get_span(docgraph, node_id))
+        return docgraph.token_table.join(get_span(docgraph, node_id))
     else:
-        tokens = (docgraph.node[token_id][docgraph.ns+':token']
-                  for token_id in docgraph.tokens)
-    return ' '.join(tokens)
+        return docgraph.token_table.text
 
 
 def tokens2text(docgraph, token_ids):
@@ -1009,8 +2320,7 @@ def tokens2text(docgraph, token_ids):
     given a list of token node IDs, returns a their string representation
     (concatenated token strings).
     """
-    return ' '.join(docgraph.node[token_id][docgraph.ns+':token']
-                    for token_id in token_ids)
+    return docgraph.token_table.join(list(token_ids))
 
 
 def istoken(docgraph, node_id, namespace=None):
@@ -1030,18 +2340,127 @@ def istoken(docgraph, node_id, namespace=None):
     return namespace+':token' in docgraph.node[node_id]
 
 
+def get_span_ranges(docgraph, node_id):
+    """
+    returns the span of the given node as a sorted list of token position
+    ranges, e.g. [(0, 2), (6, 6)] for a discontinuous span covering the
+    tokens at positions 0, 1, 2 and 6.
+
+    Returns
+    -------
+    ranges : list of (int, int) tuples
+        sorted list of (first token position, last token position) tuples
+
+    Raises
+    ------
+    KeyError
+        If the node spans a token that isn't in ``docgraph.tokens``.
+    """
+    token_positions = docgraph.tokens.positions
+    ranges = []
+    # spans are sorted by token position, cf. TokenList.sort_key()
+    for token_id in get_span(docgraph, node_id):
+        try:
+            position = token_positions[token_id]
+        except KeyError:
+            raise KeyError("Node '{0}' spans token '{1}', which isn't in the "
+                           "tokens list.".format(node_id, token_id))
+        if ranges and ranges[-1][1] == position - 1:
+            ranges[-1][1] = position
+        else:
+            ranges.append([position, position])
+    return [tuple(token_range) for token_range in ranges]
+
+
+def _get_relative_span_mask(docgraph, node_id):
+    """
+    returns the span of the given node as a (first token position, bitmask)
+    tuple. The n-th bit of the bitmask is set iff the node spans the token
+    at position first + n, so the size of the bitmask only depends on the
+    length of the span (and not on its position in the document). The
+    bitmask of an empty span is 0 (with a first position of 0).
+
+    Raises
+    ------
+    KeyError
+        If the node spans a token that isn't in ``docgraph.tokens``.
+    """
+    _get_span_cache(docgraph)  # drops outdated spans and bitmasks
+    relative_mask = docgraph._span_mask_cache.get(node_id)
+    if relative_mask is None:
+        ranges = get_span_ranges(docgraph, node_id)
+        first_position = ranges[0][0] if ranges else 0
+        mask = 0
+        for first, last in ranges:
+            mask |= ((1 << (last - first + 1)) - 1) << (first - first_position)
+        relative_mask = docgraph._span_mask_cache[node_id] = \
+            (first_position, mask)
+    return relative_mask
+
+
+def get_span_mask(docgraph, node_id):
+    """
+    returns the span of the given node as a bitmask, i.e. an integer
+    whose n-th bit is set iff the node spans the token at position n.
+
+    Note: The size of this integer grows with the position of the last
+    spanned token. To compare spans, use ``spans_overlap`` or
+    ``span_contains``, which only work on the (cached) bits of the span
+    itself.
+
+    Raises
+    ------
+    KeyError
+        If the node spans a token that isn't in ``docgraph.tokens``.
+    """
+    first_position, mask = _get_relative_span_mask(docgraph, node_id)
+    return mask << first_position
+
+
+def spans_overlap(docgraph, node_id, other_node_id):
+    """returns True, iff the two nodes span at least one common token"""
+    first, mask = _get_relative_span_mask(docgraph, node_id)
+    other_first, other_mask = _get_relative_span_mask(docgraph, other_node_id)
+    if first <= other_first:
+        return (mask >> (other_first - first)) & other_mask != 0
+    return (other_mask >> (first - other_first)) & mask != 0
+
+
+def span_contains(docgraph, node_id, other_node_id):
+    """
+    returns True, iff the first node spans all the tokens spanned by the
+    second node
+    """
+    first, mask = _get_relative_span_mask(docgraph, node_id)
+    other_first, other_mask = _get_relative_span_mask(docgraph, other_node_id)
+    if other_mask == 0:  # an empty span is contained in every span
+        return True
+    if other_first < first:
+        return False
+    return (mask >> (other_first - first)) & other_mask == other_mask
+
+
 def is_continuous(docgraph, dominating_node):
     """return True, if the tokens dominated by the given node are all adjacent"""
-    first_onset, last_offset = get_span_offsets(docgraph, dominating_node)
-    span_range = xrange(first_onset, last_offset+1)
-
-    token_offsets = (docgraph.get_offsets(tok)
-                     for tok in get_span(docgraph, dominating_node))
-    char_positions = set(itertools.chain.from_iterable(xrange(on, off+1)
-                         for on, off in token_offsets))
-    for item in span_range:
-        if item not in char_positions:
+    try:
+        _, mask = _get_relative_span_mask(docgraph, dominating_node)
+    except KeyError:
+        pass  # the node spans tokens that aren't in docgraph.tokens
+    else:
+        if mask:  # the bits of a continuous span are all set
+            return mask & (mask + 1) == 0
+
+    # fall back to character offsets for tokens that aren't in docgraph.tokens
+    span = get_span(docgraph, dominating_node)
+    token_offsets = sorted(docgraph.get_offsets(tok) for tok in span)
+    if not token_offsets:
+        raise KeyError(
+            "Node '{}' doesn't span any tokens.".format(dominating_node))
+    last_offset = token_offsets[0][1]
+    for onset, offset in token_offsets[1:]:
+        if onset > last_offset + 1:
             return False
+        last_offset = max(last_offset, offset)
     return True
 
 
@@ -1067,14 +2486,15 @@ def select_neighbors_by_layer(docgraph, node, layer, data=False):
         that are present in the given layer. If data is True,
         a generator of (node ID, node attrib dict) tuples.
     """
-    for node_id in docgraph.neighbors_iter(node):
-        node_layers = docgraph.node[node_id]['layers']
-        if isinstance(layer, (str, unicode)):
-            condition = layer in node_layers
-        else:  # ``layer`` is a list/set/dict of layers
-            condition = any(l in node_layers for l in layer)
-
-        if condition:
+    # the layers of the neighbors are registered first, as they might not
+    # have been added with add_node() etc. (e.g. after relabeling)
+    neighbor_masks = [
+        (node_id, docgraph._register_layers(docgraph.node[node_id]['layers']))
+        for node_id in docgraph.neighbors_iter(node)]
+    # ``layer`` can be a str or a list/set/dict of layers
+    layers_mask = docgraph.layer_mask(layer)
+    for node_id, node_mask in neighbor_masks:
+        if node_mask & layers_mask:
             yield (node_id, docgraph.node[node_id]) if data else (node_id)
 
 
@@ -1114,7 +2534,7 @@ def select_nodes_by_layer(docgraph, layer=None, data=False):
 
     Parameters
     ----------
-    docgraph : DiscourseDocumentGraph
+    docgraph : DiscourseDocumentGraph or FrozenDocumentGraph
         document graph from which the nodes will be extracted
     layer : str or collection of str or None
         name(s) of the layer(s) to select nodes from. If None, returns all
@@ -1129,18 +2549,48 @@ def select_nodes_by_layer(docgraph, layer=None, data=False):
         the given layer. If data is True, a generator of (node ID, node attrib
         dict) tuples.
     """
-    for node_id, node_attribs in docgraph.nodes_iter(data=True):
-        if layer is None:
-            condition = True # don't filter nodes
-        elif isinstance(layer, (str, unicode)):
-            condition = layer in node_attribs['layers']
-        else:  # ``layer`` is a list/set/dict of layers
-            condition = any(l in node_attribs['layers'] for l in layer)
-        if condition:
-            if data:
-                yield (node_id, node_attribs)
-            else:
-                yield node_id
+    if isinstance(docgraph, FrozenDocumentGraph):
+        for node in docgraph.select_nodes_by_layer(layer=layer, data=data):
+            yield node
+        return
+
+    if layer is None:  # don't filter nodes
+        node_ids = docgraph.nodes_iter()
+    else:
+        node_ids = _select_from_layer_index(docgraph._node_layer_index, layer)
+
+    for node_id in node_ids:
+        if data:
+            yield (node_id, docgraph.node[node_id])
+        else:
+            yield node_id
+
+
+def _select_from_layer_index(layer_index, layer):
+    """
+    returns a list of all the elements (node IDs or (source, target, key)
+    edge tuples) that belong to (any of) the given layer(s).
+
+    Parameters
+    ----------
+    layer_index : dict
+        an inverted index that maps from a layer name to an (ordered) dict,
+        whose keys are the elements belonging to that layer
+    layer : str or collection of str
+        name(s) of the layer(s)
+    """
+    if isinstance(layer, (str, unicode)):
+        return list(layer_index.get(layer, ()))
+
+    # ``layer`` is a list/set/dict of layers
+    seen = set()
+    elements = []
+    for single_layer in layer:
+        for element in layer_index.get(single_layer, ()):
+            if element not in seen:
+                seen.add(element)
+                elements.append(element)
+    return elements
 
 
 def select_nodes_by_attribute(docgraph, attribute=None, value=None, data=False):
@@ -1188,13 +2638,92 @@ def select_nodes_by_attribute(docgraph, attribute=None, value=None, data=False):
                     yield node_id
 
 
-def select_edges(docgraph, conditions, data):
-    """yields all edges that meet the conditions given as eval strings"""
-    for (src_id, target_id, edge_attribs) in docgraph.edges(data=True):
-        # if all conditions are fulfilled
-        # we need to add edge_attribs to the namespace eval is working in
-        if all((eval(cond, {'edge_attribs': edge_attribs})
-                for cond in conditions)):
+def edge_attribute_condition(attribute, value=None):
+    """
+    returns a condition (i.e. a function that takes an edge attribute dict
+    and returns a bool), which checks if an edge has the given attribute
+    and (optionally) one of the given values. The condition can be used
+    with ``select_edges``.
+
+    Parameters
+    ----------
+    attribute : str
+        Name of the edge attribute that all edges must posess.
+    value : str or collection of str or None
+        Value of the edge attribute that all edges must posess.
+        If a collection of values is given, edges must posess one of them.
+        If None, the condition only checks for the attribute key.
+
+    Returns
+    -------
+    condition : function
+        a function that takes an edge attribute dict and returns True, iff
+        it meets the condition
+    """
+    if value is None:
+        return lambda edge_attribs: attribute in edge_attribs
+    elif isinstance(value, basestring):
+        return lambda edge_attribs: (attribute in edge_attribs and
+                                     edge_attribs[attribute] == value)
+    else:  # ``value`` is a list/set/dict of values
+        values = frozenset(value)
+        return lambda edge_attribs: (attribute in edge_attribs and
+                                     edge_attribs[attribute] in values)
+
+
+def compile_condition(condition):
+    """
+    converts an edge condition into a function that takes an edge attribute
+    dict and returns a bool.
+
+    Parameters
+    ----------
+    condition : function or str
+        a function (which will be returned as is) or an eval string that
+        refers to the attributes of an edge as ``edge_attribs``, e.g.
+        ``"edge_attribs['edge_type'] == 'dominates'"``. Eval strings are
+        only supported for backwards compatibility, as they are much
+        slower than functions (e.g. those created by
+        ``edge_attribute_condition``).
+    """
+    if callable(condition):
+        return condition
+
+    code = compile(condition, '<condition>', 'eval')
+    return lambda edge_attribs: eval(code, {'edge_attribs': edge_attribs})
+
+
+def select_edges(docgraph, conditions, data=False):
+    """
+    yields all edges that meet all of the given conditions.
+
+    Parameters
+    ----------
+    docgraph : DiscourseDocumentGraph
+        document graph from which the edges will be extracted
+    conditions : list of (function or str)
+        Each condition is either a function that takes an edge attribute
+        dict and returns a bool or an eval string (cf. ``compile_condition``).
+        Conditions are compiled only once, not once per edge.
+    data : bool
+        If True, results will include edge attributes.
+
+    Returns
+    -------
+    edges : generator of str
+        a container/list of edges (represented as (source node ID, target
+        node ID) tuples). If data is True, edges are represented as
+        (source node ID, target node ID, edge attribute dict) tuples.
+    """
+    predicates = [compile_condition(cond) for cond in conditions]
+    if len(predicates) == 1:
+        meets_conditions = predicates[0]
+    else:
+        meets_conditions = \
+            lambda edge_attribs: all(pred(edge_attribs) for pred in predicates)
+
+    for (src_id, target_id, edge_attribs) in docgraph.edges_iter(data=True):
+        if meets_conditions(edge_attribs):
             if data:
                 yield (src_id, target_id, edge_attribs)
             else:
@@ -1203,18 +2732,20 @@ def select_edges(docgraph, conditions, data):
 
 def select_edges_by_attribute(docgraph, attribute=None, value=None, data=False):
     """
-    get all edges with the given edge type and layer.
+    get all edges with the given edge attribute (and value).
 
     Parameters
     ----------
     docgraph : DiscourseDocumentGraph
-        document graph from which the nodes will be extracted
+        document graph from which the edges will be extracted
     attribute : str or None
-        Name of the node attribute that all nodes must posess.
-        If None, returns all nodes.
+        Name of the edge attribute that all edges must posess.
+        If None, returns all edges.
     value : str or collection of str or None
-        Value of the node attribute that all nodes must posess.
-        If None, returns all nodes with the given node attribute key    .
+        Value of the edge attribute that all edges must posess.
+        If a collection of values is given, all edges posessing one of them
+        will be returned.
+        If None, returns all edges with the given edge attribute key.
     data : bool
         If True, results will include edge attributes.
 
@@ -1225,33 +2756,19 @@ def select_edges_by_attribute(docgraph, attribute=None, value=None, data=False):
         node ID) tuples). If data is True, edges are represented as
         (source node ID, target node ID, edge attribute dict) tuples.
     """
-    if attribute:
-        attrib_key_eval = "'{}' in edge_attribs".format(attribute)
+    if not attribute:  # don't filter edges at all
+        return docgraph.edges_iter(data=data)
 
-        if value is not None:
-            if isinstance(value, basestring):
-                attrib_val_eval = \
-                    "edge_attribs['{0}'] == '{1}'".format(attribute, value)
-                return select_edges(
-                    docgraph, data=data,
-                    conditions=[attrib_key_eval, attrib_val_eval])
+    if attribute == 'edge_type' and value is not None:
+        # edge types are indexed, so we don't need to look at other edges
+        if isinstance(value, basestring):
+            value = [value]
+        edges = [edge for edge_type in OrderedDict.fromkeys(value)
+                 for edge in docgraph._edge_type_index.get(edge_type, ())]
+        return _iter_indexed_edges(docgraph, edges, data)
 
-            else:  # ``value`` is a list/set/dict of values
-                attrib_val_evals = \
-                    ["edge_attribs['{0}'] == '{1}'".format(attribute, v)
-                     for v in value]
-                results = \
-                    [select_edges(docgraph, data=data,
-                                  conditions=[attrib_key_eval, val_eval])
-                     for val_eval in attrib_val_evals]
-                # results is a list of generators
-                return itertools.chain(*results)
-
-        else:  # yield all edges with the given attribute, regardless of value
-            return select_edges(docgraph, data=data, conditions=[attrib_key_eval])
-
-    else:  # don't filter edges at all
-        return docgraph.edges_iter(data=data)
+    return select_edges(docgraph, data=data,
+                        conditions=[edge_attribute_condition(attribute, value)])
 
 
 def select_edges_by(docgraph, layer=None, edge_type=None, data=False):
@@ -1260,7 +2777,7 @@ def select_edges_by(docgraph, layer=None, edge_type=None, data=False):
 
     Parameters
     ----------
-    docgraph : DiscourseDocumentGraph
+    docgraph : DiscourseDocumentGraph or FrozenDocumentGraph
         document graph from which the nodes will be extracted
     layer : str
         name of the layer
@@ -1277,22 +2794,39 @@ def select_edges_by(docgraph, layer=None, edge_type=None, data=False):
         node ID) tuples). If data is True, edges are represented as
         (source node ID, target node ID, edge attribute dict) tuples.
     """
-    edge_type_eval = "edge_attribs['edge_type'] == '{}'".format(edge_type)
-    layer_eval = "'{}' in edge_attribs['layers']".format(layer)
+    if isinstance(docgraph, FrozenDocumentGraph):
+        return docgraph.select_edges_by(layer=layer, edge_type=edge_type,
+                                        data=data)
+
+    if layer is None and edge_type is None:  # don't filter edges
+        return docgraph.edges_iter(data=data)
+
+    if edge_type is None:  # filter by layer, but not by edge type
+        edges = _select_from_layer_index(docgraph._edge_layer_index, layer)
+    elif layer is None:  # filter by edge type, but not by layer
+        edges = docgraph._edge_type_index.get(edge_type, ())
+    else:  # filter by layer and edge type: start with the smaller set
+        layer_edges = docgraph._edge_layer_index.get(layer, ())
+        type_edges = docgraph._edge_type_index.get(edge_type, ())
+        if len(type_edges) < len(layer_edges):
+            edges = [edge for edge in type_edges if edge in layer_edges]
+        else:
+            edges = [edge for edge in layer_edges if edge in type_edges]
+    return _iter_indexed_edges(docgraph, list(edges), data)
 
-    if layer is not None:
-        if edge_type is not None:
-            return select_edges(docgraph, data=data,
-                                conditions=[edge_type_eval, layer_eval])
-        else:  # filter by layer, but not by edge type
-            return select_edges(docgraph, conditions=[layer_eval], data=data)
 
-    else:  # don't filter layers
-        if edge_type is not None:  # filter by edge type, but not by layer
-            return select_edges(docgraph, data=data,
-                                conditions=[edge_type_eval])
-        else:  # neither layer, nor edge type is filtered
-            return docgraph.edges_iter(data=data)
+def _iter_indexed_edges(docgraph, edges, data=False):
+    """
+    given a list of (source, target, key) edge tuples, yields
+    (source, target) tuples or -- if data is True -- (source, target,
+    edge attribute dict) tuples.
+    """
+    for source_id, target_id, key in edges:
+        if data:
+            edge_attrs = docgraph.succ[source_id][target_id][key]
+            yield (source_id, target_id, edge_attrs)
+        else:
+            yield (source_id, target_id)
 
 
 def __walk_chain(rel_dict, src_id):
@@ -1300,12 +2834,13 @@ def __walk_chain(rel_dict, src_id):
     given a dict of pointing relations and a start node, this function
     will return a list of paths (each path is represented as a list of
     node IDs -- from the first node of the path to the last).
+    Pointing relation cycles are cut (cf. ``traversal.iter_paths``).
 
     Parameters
     ----------
     rel_dict : dict
         a dictionary mapping from an edge source node (node ID str)
-        to a set of edge target nodes (node ID str)
+        to an (ordered) collection of edge target nodes (node ID str)
     src_id : str
 
     Returns
@@ -1314,55 +2849,111 @@ def __walk_chain(rel_dict, src_id):
         each list constains a list of strings (i.e. a list of node IDs,
         which represent a chain of pointing relations)
     """
-    paths_starting_with_id = []
-    for target_id in rel_dict[src_id]:
-        if target_id in rel_dict:
-            for tail in __walk_chain(rel_dict, target_id):
-                paths_starting_with_id.append([src_id] + tail)
-        else:
-            paths_starting_with_id.append([src_id, target_id])
-    return paths_starting_with_id
+    return list(iter_paths(src_id, lambda node_id: rel_dict.get(node_id, ())))
 
 
-def get_pointing_chains(docgraph, layer=None):
+def __get_clusters(rel_dict):
+    """
+    given a dict of pointing relations, returns the connected components
+    of the pointing relation graph (computed with union-find).
+
+    Returns
+    -------
+    clusters : list of list of str
+        each list contains the node IDs of one cluster (in the order in
+        which they occur in the pointing relations)
+    """
+    parent = OrderedDict()
+
+    def find(node_id):
+        root_id = node_id
+        while parent[root_id] != root_id:
+            root_id = parent[root_id]
+        while parent[node_id] != root_id:  # path compression
+            parent[node_id], node_id = root_id, parent[node_id]
+        return root_id
+
+    for src_id, target_ids in rel_dict.iteritems():
+        parent.setdefault(src_id, src_id)
+        for target_id in target_ids:
+            parent.setdefault(target_id, target_id)
+            src_root, target_root = find(src_id), find(target_id)
+            if src_root != target_root:
+                parent[target_root] = src_root
+
+    clusters = OrderedDict()
+    for node_id in parent:
+        clusters.setdefault(find(node_id), []).append(node_id)
+    return clusters.values()
+
+
+def get_pointing_chains(docgraph, layer=None, clusters=False):
     """
     returns a list of chained pointing relations (e.g. coreference chains)
     found in the given document graph.
 
     Parameters
     ----------
-    docgraph : DiscourseDocumentGraph
+    docgraph : DiscourseDocumentGraph or FrozenDocumentGraph
         a text with annotations, represented by a document graph
     layer : str or None
         If layer is specifid, this function will only return pointing relations
         belonging to that layer.
+    clusters : bool
+        If True, return clusters (all nodes that are directly or indirectly
+        connected via pointing relations) instead of chains (paths).
+
+    Returns
+    -------
+    chains : list of list of str
+        If clusters is False, a list of all (maximal) pointing relation
+        paths, which start at a node that isn't pointed to (or, for cycles
+        that no such path leads into, at the node of the cycle that comes
+        first in natural sort order).
+        Otherwise, a list of clusters (lists of node IDs).
+
+    Notes
+    -----
+    Only the selection of chain start nodes (i.e. the filtering of partial
+    chains) takes linear time. If markables point to more than one
+    antecedent, the number of maximal paths (and thus the time needed to
+    enumerate them) can grow exponentially, e.g. for a sequence of
+    diamond-shaped relations. Use ``clusters=True`` in that case, which
+    takes (near-)linear time in the number of pointing relations.
     """
     pointing_relations = select_edges_by(docgraph, layer=layer,
                                          edge_type=EdgeTypes.pointing_relation)
 
     # a markable can point to more than one antecedent, cf. Issue #40
-    rel_dict = defaultdict(set)
+    rel_dict = OrderedDict()
+    pointed_to = set()
     for src_id, target_id in pointing_relations:
-        rel_dict[src_id].add(target_id)
+        rel_dict.setdefault(src_id, OrderedDict())[target_id] = None
+        if target_id != src_id:
+            pointed_to.add(target_id)
 
-    all_chains = [__walk_chain(rel_dict, src_id)
-                  for src_id in rel_dict.iterkeys()]
+    if clusters:
+        return __get_clusters(rel_dict)
 
     # don't return partial chains, i.e. instead of returning [a,b], [b,c] and
-    # [a,b,c,d], just return [a,b,c,d]
-    unique_chains = []
-    for i, src_id_chains in enumerate(all_chains):
-        # there will be at least one chain in this list and
-        # its first element is the from ID
-        src_id = src_id_chains[0][0]
-
-        # chain lists not starting with src_id
-        other_chainlists = all_chains[:i] + all_chains[i+1:]
-        if not any((src_id in chain
-                    for chain_list in other_chainlists
-                    for chain in chain_list)):
-                        unique_chains.extend(src_id_chains)
-    return unique_chains
+    # [a,b,c,d], just return [a,b,c,d]: only nodes that aren't pointed to
+    # start a chain
+    chains = []
+    for src_id in rel_dict:
+        if src_id not in pointed_to:
+            chains.extend(__walk_chain(rel_dict, src_id))
+
+    # cycles without an entry node (e.g. a -> b -> a) aren't reached by any
+    # of these chains, so they start at their first node (in natural sort
+    # order, which doesn't depend on the order of the edges)
+    chained_ids = set(node_id for chain in chains for node_id in chain)
+    for src_id in sorted(rel_dict, key=natural_sort_key):
+        if src_id not in chained_ids:
+            cycle_chains = __walk_chain(rel_dict, src_id)
+            chained_ids.update(
+                node_id for chain in cycle_chains for node_id in chain)
+            chains.extend(cycle_chains)
+    return chains
 
 
 def layer2namespace(layer):
@@ -12,8 +12,10 @@ import os
 import sys
 import argparse
 
+import networkx
+
 import discoursegraphs as dg
-from discoursegraphs import DiscourseDocumentGraph, write_dot
+from discoursegraphs import DiscourseDocumentGraph, merge_many, write_dot
 from discoursegraphs.util import create_dir
 
 
@@ -51,37 +53,36 @@ def merging_cli(debug=False):
                 "File '{}' doesn't exist".format(filepath)
 
     # create an empty document graph. merge it with other graphs later on.
-    discourse_docgraph = DiscourseDocumentGraph()
+    docgraphs = [DiscourseDocumentGraph()]
 
     if args.tiger_file:
         from discoursegraphs.readwrite.tiger import TigerDocumentGraph
-        tiger_docgraph = TigerDocumentGraph(args.tiger_file)
-        discourse_docgraph.merge_graphs(tiger_docgraph)
+        docgraphs.append(TigerDocumentGraph(args.tiger_file))
 
     if args.rst_file:
-        rst_graph = dg.read_rs3(args.rst_file)
-        discourse_docgraph.merge_graphs(rst_graph)
+        docgraphs.append(dg.read_rs3(args.rst_file))
 
     if args.anaphoricity_file:
         from discoursegraphs.readwrite import AnaphoraDocumentGraph
-        anaphora_graph = AnaphoraDocumentGraph(args.anaphoricity_file)
-        discourse_docgraph.merge_graphs(anaphora_graph)
-        # the anaphora doc graph only contains trivial edges from its root
-        # node.
-        try:
-            discourse_docgraph.remove_node('anaphoricity:root_node')
-        except networkx.NetworkXError as e:  # ignore if the node doesn't exist
-            pass
+        docgraphs.append(AnaphoraDocumentGraph(args.anaphoricity_file))
 
     if args.conano_file:
         from discoursegraphs.readwrite import ConanoDocumentGraph
-        conano_graph = ConanoDocumentGraph(args.conano_file)
-        discourse_docgraph.merge_graphs(conano_graph)
+        docgraphs.append(ConanoDocumentGraph(args.conano_file))
 
     if args.mmax_file:
         from discoursegraphs.readwrite import MMAXDocumentGraph
-        mmax_graph = MMAXDocumentGraph(args.mmax_file)
-        discourse_docgraph.merge_graphs(mmax_graph)
+        docgraphs.append(MMAXDocumentGraph(args.mmax_file))
+
+    discourse_docgraph = merge_many(docgraphs)
+
+    if args.anaphoricity_file:
+        # the anaphora doc graph only contains trivial edges from its root
+        # node.
+        try:
+            discourse_docgraph.remove_node('anaphoricity:root_node')
+        except networkx.NetworkXError as e:  # ignore if the node doesn't exist
+            pass
 
     if isinstance(args.output_file, str):  # if we're not piping to stdout ...
         # we need abspath to handle files in the current directory
@@ -8,6 +8,8 @@ processing.
 """
 
 from discoursegraphs.readwrite.anaphoricity import AnaphoraDocumentGraph, read_anaphoricity
+from discoursegraphs.readwrite.arrays import (
+    DocumentArrays, FeatureCodes, docgraph2arrays, stack_arrays)
 from discoursegraphs.readwrite.brackets import write_brackets
 from discoursegraphs.readwrite.brat import write_brat
 from discoursegraphs.readwrite.conano import ConanoDocumentGraph, read_conano
@@ -26,7 +28,8 @@ from discoursegraphs.readwrite.ptb import PTBDocumentGraph, read_ptb, read_mrg
 from discoursegraphs.readwrite.rst.rs3 import RSTGraph, read_rst, read_rs3
 from discoursegraphs.readwrite.rst.dis import read_dis
 from discoursegraphs.readwrite.salt.saltxmi import SaltDocument, SaltXMIGraph
-from discoursegraphs.readwrite.tiger import TigerDocumentGraph, read_tiger
+from discoursegraphs.readwrite.tiger import (
+    TigerCorpus, TigerDocumentGraph, read_tiger)
 
 from discoursegraphs.readwrite.tree import tree2bracket
 from discoursegraphs.readwrite.freqt import docgraph2freqt, write_freqt
@@ -0,0 +1,286 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Author: Arne Neumann <discoursegraphs.programming@arne.cl>
+
+"""
+The ``arrays`` module converts a ``DiscourseDocumentGraph`` into NumPy
+arrays (node types, layers, token positions, spans and edges), e.g. to
+use them as features in machine learning pipelines.
+
+Node types, edge types and layers are mapped to integer codes by a
+``FeatureCodes`` instance. Documents converted with the same instance
+use the same codes, so that their arrays can be stacked into one batch
+(cf. ``stack_arrays``).
+"""
+
+import numpy as np
+
+from discoursegraphs.discoursegraph import get_span
+
+
+# the maximum number of layers that fit into a (uint64) layer bitmask
+MAX_LAYERS = 64
+
+
+class FeatureCodes(object):
+    """
+    maps node types, edge types and layers to integer codes. Unknown
+    names get the next free code, so that one instance can be shared by
+    all documents of a corpus.
+
+    Attributes
+    ----------
+    node_types : dict of (str, int)
+        maps from a node type to its code
+    edge_types : dict of (str, int)
+        maps from an edge type to its code (edges without an ``edge_type``
+        attribute have the type '')
+    layers : dict of (str, int)
+        maps from a layer to the number of its bit in a layer bitmask
+    """
+    def __init__(self):
+        self.node_types = {}
+        self.edge_types = {}
+        self.layers = {}
+
+    @staticmethod
+    def _code(codes, name):
+        """returns the code of the given name, assigning a new one if needed"""
+        code = codes.get(name)
+        if code is None:
+            code = codes[name] = len(codes)
+        return code
+
+    def node_type_code(self, node_type):
+        """returns the code (int) of the given node type"""
+        return self._code(self.node_types, node_type)
+
+    def edge_type_code(self, edge_type):
+        """returns the code (int) of the given edge type"""
+        return self._code(self.edge_types, edge_type)
+
+    def layer_mask(self, layers):
+        """
+        returns the bitmask (int) representing the given set of layers.
+
+        Raises
+        ------
+        ValueError
+            if more than ``MAX_LAYERS`` different layers are used
+        """
+        mask = 0
+        for layer in layers:
+            bit = self._code(self.layers, layer)
+            if bit >= MAX_LAYERS:
+                del self.layers[layer]
+                raise ValueError(
+                    "Can't encode layer '{0}': layer bitmasks only support "
+                    "{1} layers.".format(layer, MAX_LAYERS))
+            mask |= 1 << bit
+        return mask
+
+
+class DocumentArrays(object):
+    """
+    the nodes and edges of one or more document graphs, represented as
+    NumPy arrays (cf. ``docgraph2arrays`` and ``stack_arrays``). Node
+    ``i`` is the node with the ID ``node_ids[i]``.
+
+    Attributes
+    ----------
+    codes : FeatureCodes
+        the mappings from node types, edge types and layers to codes
+    node_ids : list of str
+        maps from a node index to a node ID
+    node_document : np.array of int
+        the index of the document each node belongs to
+    node_types : np.array of int
+        the node type code of each node
+    node_layers : np.array of uint64
+        the layers of each node (bitmask, cf. ``FeatureCodes.layer_mask``)
+    token_index : np.array of int
+        the position of each token node in the tokens list of its document
+        (-1 for nodes that aren't tokens)
+    span_start : np.array of int
+        the position of the first token spanned by each node (-1 for nodes
+        that don't span any tokens)
+    span_end : np.array of int
+        the position of the last token spanned by each node (-1 for nodes
+        that don't span any tokens)
+    edge_index : np.array of int
+        2 x E array of the source (first row) and target (second row) node
+        indices of all edges
+    edge_types : np.array of int
+        the edge type code of each edge
+    edge_layers : np.array of uint64
+        the layers of each edge (bitmask, cf. ``FeatureCodes.layer_mask``)
+    """
+    def __init__(self, codes, node_ids, node_document, node_types,
+                 node_layers, token_index, span_start, span_end, edge_index,
+                 edge_types, edge_layers):
+        self.codes = codes
+        self.node_ids = node_ids
+        self.node_document = node_document
+        self.node_types = node_types
+        self.node_layers = node_layers
+        self.token_index = token_index
+        self.span_start = span_start
+        self.span_end = span_end
+        self.edge_index = edge_index
+        self.edge_types = edge_types
+        self.edge_layers = edge_layers
+
+    def __len__(self):
+        return len(self.node_ids)
+
+    @property
+    def node_index(self):
+        """a dict that maps from a node ID to its index"""
+        return {node_id: i for i, node_id in enumerate(self.node_ids)}
+
+
+def default_node_type(docgraph, node_id, node_attrs):
+    """
+    returns 'root' for the root node of the document graph, 'token' for
+    its token nodes and 'node' for all other nodes.
+    """
+    if node_id == docgraph.root:
+        return 'root'
+    if docgraph.ns+':token' in node_attrs:
+        return 'token'
+    return 'node'
+
+
+def docgraph2arrays(docgraph, codes=None, node_type_attr=None):
+    """
+    converts a document graph into NumPy arrays. Nodes are numbered in the
+    order of ``docgraph.nodes_iter()``.
+
+    Parameters
+    ----------
+    docgraph : DiscourseDocumentGraph
+        the document graph to convert
+    codes : FeatureCodes or None
+        the codes to use for node types, edge types and layers. Use the same
+        instance for all documents that you want to stack. If None, a new
+        instance is created.
+    node_type_attr : str or None
+        the node attribute (e.g. 'tiger:cat') to use as the node type. Nodes
+        without this attribute (and all nodes, if no attribute is given)
+        get their type from ``default_node_type``.
+
+    Returns
+    -------
+    arrays : DocumentArrays
+        the nodes and edges of the document graph as arrays
+
+    Raises
+    ------
+    RuntimeError
+        if a node is part of a cycle of non-pointing relations (cf.
+        ``get_span``)
+    """
+    if codes is None:
+        codes = FeatureCodes()
+    token_positions = docgraph.tokens.positions
+    num_of_nodes = docgraph.number_of_nodes()
+
+    node_ids = []
+    node_types = np.empty(num_of_nodes, dtype=np.int32)
+    node_layers = np.empty(num_of_nodes, dtype=np.uint64)
+    token_index = np.empty(num_of_nodes, dtype=np.int64)
+    span_start = np.empty(num_of_nodes, dtype=np.int64)
+    span_end = np.empty(num_of_nodes, dtype=np.int64)
+    node_index = {}
+    for i, (node_id, node_attrs) in enumerate(docgraph.nodes_iter(data=True)):
+        node_ids.append(node_id)
+        node_index[node_id] = i
+
+        node_type = node_attrs.get(node_type_attr) if node_type_attr else None
+        if node_type is None:
+            node_type = default_node_type(docgraph, node_id, node_attrs)
+        node_types[i] = codes.node_type_code(node_type)
+        node_layers[i] = codes.layer_mask(node_attrs['layers'])
+
+        if docgraph.ns+':token' in node_attrs:
+            token_index[i] = token_positions.get(node_id, -1)
+        else:
+            token_index[i] = -1
+
+        # spans are sorted by token position
+        span = get_span(docgraph, node_id)
+        if span:
+            span_start[i] = token_positions.get(span[0], -1)
+            span_end[i] = token_positions.get(span[-1], -1)
+        else:
+            span_start[i] = span_end[i] = -1
+
+    num_of_edges = docgraph.number_of_edges()
+    edge_index = np.empty((2, num_of_edges), dtype=np.int64)
+    edge_types = np.empty(num_of_edges, dtype=np.int32)
+    edge_layers = np.empty(num_of_edges, dtype=np.uint64)
+    for i, (source_id, target_id, edge_attrs) in enumerate(
+            docgraph.edges_iter(data=True)):
+        edge_index[0, i] = node_index[source_id]
+        edge_index[1, i] = node_index[target_id]
+        edge_types[i] = codes.edge_type_code(edge_attrs.get('edge_type', ''))
+        edge_layers[i] = codes.layer_mask(edge_attrs['layers'])
+
+    return DocumentArrays(
+        codes, node_ids, np.zeros(num_of_nodes, dtype=np.int64), node_types,
+        node_layers, token_index, span_start, span_end, edge_index,
+        edge_types, edge_layers)
+
+
+def stack_arrays(document_arrays):
+    """
+    stacks the arrays of several documents into one batch, i.e. one
+    ``DocumentArrays`` instance. The node indices in the ``edge_index`` of
+    each document are shifted by the number of nodes of all preceding
+    documents, while token positions and spans stay relative to their
+    document.
+
+    Parameters
+    ----------
+    document_arrays : list of DocumentArrays
+        the arrays of several documents, which must have been created with
+        the same ``FeatureCodes`` instance
+
+    Returns
+    -------
+    arrays : DocumentArrays
+        the stacked arrays. ``node_document`` contains the index of the
+        document (in ``document_arrays``) that each node belongs to.
+
+    Raises
+    ------
+    ValueError
+        if no arrays are given or if they use different ``FeatureCodes``
+    """
+    if not document_arrays:
+        raise ValueError("Can't stack an empty list of document arrays.")
+    codes = document_arrays[0].codes
+    if any(arrays.codes is not codes for arrays in document_arrays):
+        raise ValueError("Can't stack document arrays that were created "
+                         "with different FeatureCodes.")
+
+    node_ids = []
+    node_offsets = [0]
+    for arrays in document_arrays:
+        node_ids.extend(arrays.node_ids)
+        node_offsets.append(len(node_ids))
+    node_document = np.repeat(
+        np.arange(len(document_arrays), dtype=np.int64),
+        np.diff(node_offsets))
+
+    def concatenate(attrib):
+        return np.concatenate(
+            [getattr(arrays, attrib) for arrays in document_arrays])
+
+    return DocumentArrays(
+        codes, node_ids, node_document, concatenate('node_types'),
+        concatenate('node_layers'), concatenate('token_index'),
+        concatenate('span_start'), concatenate('span_end'),
+        np.concatenate([arrays.edge_index + offset for arrays, offset
+                        in zip(document_arrays, node_offsets)], axis=1),
+        concatenate('edge_types'), concatenate('edge_layers'))
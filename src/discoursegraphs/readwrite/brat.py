@@ -78,15 +78,14 @@ def brat_output(docgraph, layer=None, show_relations=True):
             markable_dict[markable] = (markable_index, span_text, len(span_text))
             markable_index += 1
 
-    onset = 0
-    for token_id in docgraph.tokens:
-        tok_len = len(docgraph.get_token(token_id))
+    token_table = docgraph.token_table
+    for token_id, onset in itertools.izip(token_table.token_ids,
+                                          token_table.onsets):
         if token_id in first_token2markables:
             for markable in first_token2markables[token_id]:
                 mark_index, mark_text, mark_len = markable_dict[markable]
                 ret_str += u"T{0}\tMarkable {1} {2}\t{3}\n".format(
                     mark_index, onset, onset+mark_len, mark_text)
-        onset += tok_len+1
 
     if show_relations:
         relation = 1
@@ -16,6 +16,7 @@ from lxml import etree
 from discoursegraphs import (DiscourseDocumentGraph, EdgeTypes, get_span,
                              select_nodes_by_layer)
 from discoursegraphs.readwrite.generic import generic_converter_cli
+from discoursegraphs.traversal import dfs_events
 from discoursegraphs.util import (ensure_unicode, natural_sort_key,
                                   sanitize_string)
 
@@ -87,7 +88,23 @@ class ConanoDocumentGraph(DiscourseDocumentGraph):
     def _add_element(self, element, parent_node):
         """
         add an element (i.e. a unit/connective/discourse or modifier)
-        to the docgraph.
+        and all its descendants to the docgraph.
+        """
+        # node IDs of the parents of the currently open elements
+        parent_nodes = [parent_node]
+        for current_element, entered in dfs_events(
+                element, lambda elem: elem.iterchildren()):
+            if entered:
+                parent_nodes.append(
+                    self._add_element_node(current_element, parent_nodes[-1]))
+            else:  # all descendants of the element were added
+                parent_nodes.pop()
+                self._add_element_tail(current_element, parent_nodes[-1])
+
+    def _add_element_node(self, element, parent_node):
+        """
+        add a node representing the element (and the text it starts with)
+        to the docgraph and return its node ID.
         """
         if element.tag == 'unit':
             element_node_id = element.attrib['id']+':'+element.attrib['type']
@@ -115,11 +132,12 @@ class ConanoDocumentGraph(DiscourseDocumentGraph):
                 self.node[element_node_id].update(
                     {'label': u"{0}: {1}...".format(element_node_id,
                                                    element_text[:20])})
+        return element_node_id
 
-
-        for child_element in element.iterchildren():
-            self._add_element(child_element, element_node_id)
-
+    def _add_element_tail(self, element, parent_node):
+        """
+        add the text following the given element to its parent node.
+        """
         if element.tail:  # tokens _after_ the </element> closes
             if self.tokenize:
                 for token in element.tail.split():
@@ -42,6 +42,8 @@ Here are the coresponding definitions in the ExportXML header:
 
 '''
 
+from collections import deque
+import multiprocessing
 import os
 import re
 import sys
@@ -51,35 +53,16 @@ from lxml import etree
 
 import discoursegraphs as dg
 from discoursegraphs import DiscourseDocumentGraph
-from discoursegraphs.readwrite.generic import convert_spanstring
+from discoursegraphs.readwrite.generic import (ElementIndex,
+                                               convert_spanstring)
 from discoursegraphs.util import add_prefix
 
 
 # example node ID: 's_1_n_506' -> sentence 1, node 506
 NODE_ID_REGEX = re.compile('s_(\d+)_n_(\d+)')
 
-
-class TextCountTarget(object):
-    '''
-    counts all <text> elements in the XML document to be parsed.
-    adapted from Listing 2 on
-    http://www.ibm.com/developerworks/library/x-hiperfparse/
-
-    NOTE: unused arguments (i.e. `attrib` and `data` are required)
-    '''
-    def __init__(self):
-        self.count = 0
-    def start(self, tag, attrib):
-        """handle the start of a <text> element"""
-        if tag == 'text':
-            self.count +=1
-    def end(self, tag):
-        pass
-    def data(self, data):
-        pass
-    def close(self):
-        """return the number of <text> elements"""
-        return self.count
+# example <text> start tag: '<text xml:id="text_0" origin="T990507.2">'
+ORIGIN_REGEX = re.compile(r'\sorigin="([^"]*)"')
 
 
 class ExportXMLCorpus(object):
@@ -92,8 +75,16 @@ class ExportXMLCorpus(object):
     little memory as possible. To retrieve the document graphs of the
     documents contained in the corpus, simply iterate over the class
     instance (or use the ``.next()`` method).
+
+    Single documents can be accessed by their index, their xml:id or their
+    origin, e.g. ``corpus[0]``, ``corpus['text_0']`` or
+    ``corpus['T990507.2']`` (or sliced, e.g. ``corpus[10:20]``). Only the
+    requested documents are parsed, using a byte offset index of all <text>
+    elements, which is built on first use and stored next to the corpus
+    file (cf. ``ElementIndex``).
     """
-    def __init__(self, exportxml_file, name=None, debug=False):
+    def __init__(self, exportxml_file, name=None, debug=False,
+                 index_filepath=None):
         """
         Parameters
         ----------
@@ -108,12 +99,19 @@ class ExportXMLCorpus(object):
             If False, create an iterator that parses the documents
             contained in the file into ExportXMLDocumentGraph instances.
             (default: False)
+        index_filepath : str or None
+            path to the sidecar file that stores the byte offsets of all
+            documents. If None, the path of the corpus file plus '.text.idx'
+            is used.
         """
         self.name = name if name else os.path.basename(exportxml_file)
-        self._num_of_documents = None
         self.exportxml_file = exportxml_file
         self.path = os.path.abspath(exportxml_file)
         self.debug = debug
+        self.index_filepath = index_filepath
+        self._index = None
+        self._origins = None
+        self._num_of_documents = None
 
         self.__context = None
         self._reset_corpus_iterator()
@@ -131,26 +129,133 @@ class ExportXMLCorpus(object):
         self.__context = etree.iterparse(self.exportxml_file, events=('end',),
                                          tag='text', recover=True)
 
+    @property
+    def index(self):
+        """
+        the byte offset index of all <text> elements (maps from their xml:id
+        to their start and end offsets), which is built/loaded on first use
+        """
+        if self._index is None:
+            self._index = ElementIndex(self.exportxml_file, 'text',
+                                       id_attrib='xml:id',
+                                       index_filepath=self.index_filepath)
+        return self._index
+
+    @property
+    def document_ids(self):
+        """the xml:ids of all documents (in the order of the corpus file)"""
+        return self.index.ids
+
+    @property
+    def origins(self):
+        """
+        maps from the origin of a document (e.g. 'T990507.2') to its xml:id.
+        Only the start tags of the <text> elements are read to build it.
+        """
+        if self._origins is None:
+            self._origins = {}
+            for text_id in self.index:
+                match = ORIGIN_REGEX.search(self.index.read_start_tag(text_id))
+                if match:
+                    self._origins[match.group(1)] = text_id
+        return self._origins
+
     def __len__(self):
-        if self._num_of_documents is not None:
-            return self._num_of_documents
-        elif self.name == 'tuebadz-8.0-mit-NE+Anaphern+Diskurs.exml.xml':
-            return 3258  # I'll burn in hell for this!
+        if self._index is not None:
+            return len(self._index)
+        if self._num_of_documents is None:
+            # counting the documents doesn't store an index next to the
+            # corpus file (but uses one, if it exists)
+            self._num_of_documents = len(ElementIndex(
+                self.exportxml_file, 'text', id_attrib='xml:id',
+                index_filepath=self.index_filepath, persistent=False))
+        return self._num_of_documents
+
+    def get_document(self, document_id):
+        """
+        given the xml:id (e.g. 'text_0') or the origin (e.g. 'T990507.2') of
+        a document, returns it as an ExportXMLDocumentGraph (or as a <text>
+        element if ``debug`` is set to ``True``).
+        """
+        if document_id in self.index:
+            text_id = document_id
+        elif document_id in self.origins:
+            text_id = self.origins[document_id]
         else:
-            return self._get_num_of_documents()
-
-    def _get_num_of_documents(self):
-        '''
-        counts the number of documents in an ExportXML file.
-        adapted from Listing 2 on
-        http://www.ibm.com/developerworks/library/x-hiperfparse/
-        '''
-        parser = etree.XMLParser(target = TextCountTarget())
-        # When iterated over, 'results' will contain the output from
-        # target parser's close() method
-        num_of_documents = etree.parse(self.exportxml_file, parser)
-        self._num_of_documents = num_of_documents
-        return num_of_documents
+            raise KeyError(
+                "There's no document with the xml:id or origin '{0}' in "
+                "'{1}'".format(document_id, self.name))
+
+        text_element = self.index.parse(
+            text_id, parser=etree.XMLParser(recover=True))
+        if self.debug:
+            return text_element
+        return ExportXMLDocumentGraph(text_element, name=text_id)
+
+    def __getitem__(self, sliced):
+        """access documents by their index, xml:id or origin"""
+        if isinstance(sliced, str):  # get document by its xml:id/origin
+            return self.get_document(sliced)
+        elif isinstance(sliced, int):  # get document by its index
+            return self.get_document(self.document_ids[sliced])
+        else:  # get a slice/range of documents
+            return [self.get_document(text_id)
+                    for text_id in self.document_ids[sliced]]
+
+    def imap(self, func, workers=None, chunksize=1):
+        """
+        applies a function to each document of the corpus (i.e. to its
+        ExportXMLDocumentGraph or to its <text> element if ``debug`` is set
+        to ``True``) in a pool of worker processes and yields the results in
+        the order of the corpus, cf. ``multiprocessing.Pool.imap``.
+
+        The workers only get the byte offsets of the documents (cf.
+        ``self.index``), which they read and parse themselves. At most
+        two chunks of documents per worker are processed (or waiting to be
+        consumed) at the same time, so that the memory usage doesn't grow
+        with the size of the corpus.
+
+        Parameters
+        ----------
+        func : function
+            a function that takes a document and returns a (picklable)
+            result. It must be picklable itself, i.e. defined at the top
+            level of a module (no lambda).
+        workers : int or None
+            number of worker processes. If None, one worker per CPU is used.
+            If 1, the documents are processed in this process.
+        chunksize : int
+            number of documents that are sent to a worker at once
+        """
+        if workers is None:
+            workers = multiprocessing.cpu_count()
+        document_ids = self.document_ids
+        chunks = ((self.path, self.debug, func,
+                   [(text_id, ) + self.index.offsets[text_id]
+                    for text_id in document_ids[i:i+chunksize]])
+                  for i in xrange(0, len(document_ids), chunksize))
+
+        if workers == 1:
+            for chunk in chunks:
+                for result in _apply_to_documents(chunk):
+                    yield result
+            return
+
+        pool = multiprocessing.Pool(workers)
+        try:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(
+                    pool.apply_async(_apply_to_documents, (chunk, )))
+                if len(pending) >= 2 * workers:
+                    for result in pending.popleft().get():
+                        yield result
+            while pending:
+                for result in pending.popleft().get():
+                    yield result
+        finally:
+            pool.terminate()
+            pool.join()
 
     def __iter__(self):
         return iter(self.text_iter(self.__context))
@@ -287,9 +392,8 @@ class ExportXMLDocumentGraph(DiscourseDocumentGraph):
         # add a key 'connective' to the token with add rel1/rel2 attributes as a dict and
         # add the token to the namespace:connective layer
         connective_attribs = {key: val for (key, val) in connective.attrib.items() if key != 'konn'}
-        word_node = self.node[word_node_id]
-        word_node['layers'].add(self.ns+':connective')
-        word_node.update({'connective': connective_attribs})
+        self.add_layer(word_node_id, self.ns+':connective')
+        self.node[word_node_id].update({'connective': connective_attribs})
 
     def add_discrel(self, discrel):
         """
@@ -727,6 +831,39 @@ class ExportXMLDocumentGraph(DiscourseDocumentGraph):
         return self.get_element_id(sentence_elem)
 
 
+def _apply_to_documents(chunk):
+    """
+    reads and parses a chunk of documents from an ExportXML file and applies
+    a function to each of them (cf. ``ExportXMLCorpus.imap``, this runs in
+    a worker process).
+
+    Parameters
+    ----------
+    chunk : (str, bool, function, list of (str, int, int))
+        the path to the ExportXML file, the ``debug`` flag of the corpus,
+        the function to be applied and the (xml:id, start offset, end offset)
+        of each document
+
+    Returns
+    -------
+    results : list
+        the results of the function, in the order of the documents
+    """
+    exportxml_filepath, debug, func, documents = chunk
+    parser = etree.XMLParser(recover=True)
+    results = []
+    with open(exportxml_filepath, 'rb') as exportxml_file:
+        for text_id, start, end in documents:
+            exportxml_file.seek(start)
+            text_element = etree.fromstring(
+                exportxml_file.read(end - start), parser)
+            if not debug:
+                text_element = ExportXMLDocumentGraph(text_element,
+                                                      name=text_id)
+            results.append(func(text_element))
+    return results
+
+
 def add_ns(key, ns='http://www.w3.org/XML/1998/namespace'):
     """
     adds a namespace prefix to a string, e.g. turns 'foo' into
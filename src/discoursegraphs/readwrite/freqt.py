@@ -12,6 +12,7 @@ import os
 
 from discoursegraphs import istoken
 from discoursegraphs.readwrite.tree import sorted_bfs_successors
+from discoursegraphs.traversal import fold
 from discoursegraphs.util import create_dir, create_multiple_replace_func
 
 FREQT_BRACKET_ESCAPE = {'(': r'-LRB-', ')': r'-RRB-'}
@@ -42,17 +43,11 @@ def sentence2freqt(docgraph, root, successors=None, include_pos=False,
     if successors is None:
         successors = sorted_bfs_successors(docgraph, root)
 
-    if root in successors:  # root node has children / subgraphs
-        embed_str = u"".join(sentence2freqt(docgraph, child, successors,
-                                            include_pos=include_pos,
-                                            escape_func=escape_func)
-                             for child in successors[root])
-        return node2freqt(
-            docgraph, root, embed_str, include_pos=include_pos,
-            escape_func=escape_func)
-    else:  # root node has no children / subgraphs
-        return node2freqt(docgraph, root, include_pos=include_pos,
-                          escape_func=escape_func)
+    def combine(node_id, child_strs):
+        return node2freqt(docgraph, node_id, u"".join(child_strs),
+                          include_pos=include_pos, escape_func=escape_func)
+
+    return fold(root, lambda node_id: successors.get(node_id, ()), combine)
 
 
 def docgraph2freqt(docgraph, root=None, include_pos=False,
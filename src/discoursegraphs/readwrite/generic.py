@@ -7,8 +7,13 @@ This module contains code that is used by multiple importers and/or exporters.
 """
 
 import os
+import re
 import sys
 import argparse
+import mmap
+import warnings
+
+from lxml import etree
 
 from discoursegraphs.readwrite.dot import write_dot
 from discoursegraphs.util import ensure_utf8, ensure_ascii
@@ -72,13 +77,13 @@ def layerset2str(discoursegraph):
     """
     for node_id in discoursegraph:
         discoursegraph.node[node_id]['layers'] = \
-            str(discoursegraph.node[node_id]['layers'])
+            layers2str(discoursegraph.node[node_id]['layers'])
     for (from_id, to_id) in discoursegraph.edges_iter():
         # there might be multiple edges between 2 nodes
         edge_dict = discoursegraph.edge[from_id][to_id]
         for edge_id in edge_dict:
             edge_dict[edge_id]['layers'] = \
-                str(edge_dict[edge_id]['layers'])
+                layers2str(edge_dict[edge_id]['layers'])
 
 
 def attriblist2str(discoursegraph):
@@ -109,25 +114,349 @@ def attriblist2str(discoursegraph):
                         = str(edge_dict[edge_id][attrib])
 
 
+def get_root_nodes(docgraph):
+    """
+    returns the IDs of all (current and former) root nodes of a document
+    graph, i.e. the nodes that may have a ``metadata`` attribute.
+    """
+    root_nodes = {docgraph.root}
+    # the generic root node probably only exists when we merge graphs on the
+    # command line, cf. issue #89
+    if 'discoursegraph:root_node' in docgraph.node:
+        root_nodes.add('discoursegraph:root_node')
+    # former root nodes which have been merged into this graph (some of
+    # these nodes may not exist any longer)
+    if hasattr(docgraph, 'merged_rootnodes'):
+        root_nodes.update(node_id for node_id in docgraph.merged_rootnodes
+                          if node_id in docgraph.node)
+    return root_nodes
+
+
 def remove_root_metadata(docgraph):
     """
     removes the ``metadata`` attribute of the root node of a document graph.
     this is necessary for some exporters, as the attribute may contain
     (nested) dictionaries.
     """
-    docgraph.node[docgraph.root].pop('metadata', None)
-    # delete metadata from the generic root node (which probably only exists
-    # when we merge graphs on the command line, cf. issue #89
-    if 'discoursegraph:root_node' in docgraph.node:
-        docgraph.node['discoursegraph:root_node'].pop('metadata', None)
-    # delete the metadata from all former root nodes which have been merged
-    # into this graph
-    if hasattr(docgraph, 'merged_rootnodes'):
-        for merged_rootnode in docgraph.merged_rootnodes:
-            try:  # some of these nodes may not exist any longer
-                docgraph.node[merged_rootnode].pop('metadata', None)
-            except KeyError as e:
-                pass
+    for root_node in get_root_nodes(docgraph):
+        docgraph.node[root_node].pop('metadata', None)
+
+
+def layers2str(layers):
+    """
+    converts a set of layers into a string (e.g. to export it into the
+    `gexf` and `graphml` formats), cf. ``layerset2str``.
+    """
+    # layers are stored as frozensets, but we'll keep the set(...) notation
+    return str(set(layers))
+
+
+class ExportView(object):
+    """
+    A read-only view of a document graph that converts node/edge attributes
+    on the fly, while they are read by an exporter. In contrast to
+    a deepcopy of the graph (modified by ``layerset2str``,
+    ``attriblist2str``, ``remove_root_metadata`` etc.), this only creates a
+    new attribute dict for the node/edge that is currently read.
+
+    The view provides the parts of the networkx graph API that are used by
+    the networkx writers (e.g. ``nodes_iter``, ``edges_iter``, ``node``,
+    ``graph``).
+    """
+    def __init__(self, docgraph, layers=None, attriblist2str=False,
+                 remove_root_metadata=False, add_labels=False):
+        """
+        Parameters
+        ----------
+        docgraph : DiscourseDocumentGraph
+            the document graph to export
+        layers : function or None
+            a function that converts the ``layers`` set of a node/edge, e.g.
+            ``layers2str`` or ``list``
+        attriblist2str : bool
+            If True, convert all node/edge attributes whose values are lists
+            into strings (cf. ``attriblist2str``)
+        remove_root_metadata : bool
+            If True, hide the ``metadata`` attribute of the root node(s)
+            (cf. ``remove_root_metadata``)
+        add_labels : bool
+            If True, add the ID of each (str/unicode) node that doesn't have
+            a ``label`` as its label
+        """
+        self.docgraph = docgraph
+        self.name = docgraph.name
+        # exporters may change the graph attribute dict
+        self.graph = dict(docgraph.graph)
+        self.node = _NodeAttributeView(self)
+        self._layers = layers
+        self._attriblist2str = attriblist2str
+        self._metadata_nodes = \
+            get_root_nodes(docgraph) if remove_root_metadata else set()
+        self._add_labels = add_labels
+
+    def is_directed(self):
+        return self.docgraph.is_directed()
+
+    def is_multigraph(self):
+        return self.docgraph.is_multigraph()
+
+    def __len__(self):
+        return len(self.docgraph)
+
+    def __iter__(self):
+        return self.nodes_iter()
+
+    def number_of_nodes(self):
+        return self.docgraph.number_of_nodes()
+
+    def number_of_edges(self):
+        return self.docgraph.number_of_edges()
+
+    def _convert_attrs(self, attrs):
+        """returns a converted copy of a node/edge attribute dict"""
+        attrs = dict(attrs)
+        if self._layers is not None and 'layers' in attrs:
+            attrs['layers'] = self._layers(attrs['layers'])
+        if self._attriblist2str:
+            for attrib, value in attrs.iteritems():
+                if isinstance(value, list):
+                    attrs[attrib] = str(value)
+        return attrs
+
+    def _node_attrs(self, node_id):
+        """returns the converted attribute dict of the given node"""
+        attrs = self._convert_attrs(self.docgraph.node[node_id])
+        if node_id in self._metadata_nodes:
+            attrs.pop('metadata', None)
+        if self._add_labels and 'label' not in attrs \
+                and isinstance(node_id, (str, unicode)):
+            attrs['label'] = ensure_utf8(node_id)
+        return attrs
+
+    def nodes_iter(self, data=False):
+        """
+        yields all node IDs or -- if data is True -- (node ID, converted
+        node attribute dict) tuples.
+        """
+        for node_id in self.docgraph.nodes_iter():
+            if data:
+                yield (node_id, self._node_attrs(node_id))
+            else:
+                yield node_id
+
+    def nodes(self, data=False):
+        return list(self.nodes_iter(data=data))
+
+    def edges_iter(self, data=False, keys=False):
+        """
+        yields all edges as (source, target) tuples, optionally followed by
+        the edge key and/or the converted edge attribute dict.
+        """
+        for edge in self.docgraph.edges_iter(data=True, keys=True):
+            source_id, target_id, key, attrs = edge
+            edge = (source_id, target_id)
+            if keys:
+                edge += (key,)
+            if data:
+                edge += (self._convert_attrs(attrs),)
+            yield edge
+
+    def edges(self, data=False, keys=False):
+        return list(self.edges_iter(data=data, keys=keys))
+
+
+class _NodeAttributeView(object):
+    """
+    provides read-only access to the converted node attributes of an
+    ``ExportView`` via ``view.node[node_id]``.
+    """
+    def __init__(self, export_view):
+        self.export_view = export_view
+
+    def __getitem__(self, node_id):
+        return self.export_view._node_attrs(node_id)
+
+    def __contains__(self, node_id):
+        return node_id in self.export_view.docgraph
+
+    def __iter__(self):
+        return self.export_view.nodes_iter()
+
+    def __len__(self):
+        return len(self.export_view)
+
+
+class ElementIndex(object):
+    """
+    A byte offset index of the elements with a given tag (e.g. the <s>
+    elements of a TigerXML file), which is used to read/parse single
+    elements of a large XML file without parsing the whole file.
+
+    The index is built by scanning the file once and is then stored in a
+    sidecar file (by default, the path of the XML file plus '.<tag>.idx'),
+    together with the size and modification time of the XML file. If the
+    XML file has changed since, the index is rebuilt.
+
+    Note: The elements must not be nested in elements with the same tag and
+    their IDs must be given as (double-quoted) attributes.
+
+    Attributes
+    ----------
+    xml_filepath : str
+        path to the indexed XML file
+    index_filepath : str
+        path to the sidecar file that stores the index
+    tag : str
+        the tag of the indexed elements
+    ids : list of str
+        the IDs of all indexed elements (in the order they occur in the file)
+    offsets : dict of (str, (int, int))
+        maps from an element ID to the byte offsets where the element starts
+        and ends in the file
+    """
+    def __init__(self, xml_filepath, tag, id_attrib='id', index_filepath=None,
+                 persistent=True):
+        """
+        Parameters
+        ----------
+        xml_filepath : str
+            path to the XML file to be indexed
+        tag : str
+            the tag of the elements to be indexed, e.g. 's'
+        id_attrib : str
+            the name of the attribute that contains the ID of an element,
+            as it is written in the file (e.g. 'id' or 'xml:id')
+        index_filepath : str or None
+            path to the sidecar file that stores the index. If None, the path
+            of the XML file plus '.<tag>.idx' is used.
+        persistent : bool
+            If False, an existing sidecar file is still used, but a newly
+            built index is not stored.
+        """
+        self.xml_filepath = xml_filepath
+        self.tag = tag
+        self.id_attrib = id_attrib
+        if index_filepath is None:
+            index_filepath = '{0}.{1}.idx'.format(xml_filepath, tag)
+        self.index_filepath = index_filepath
+
+        self.ids = []
+        self.offsets = {}
+        if not self._load():
+            self._build()
+            if persistent:
+                self._save()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, element_id):
+        return element_id in self.offsets
+
+    def __iter__(self):
+        return iter(self.ids)
+
+    def _file_signature(self):
+        """returns the size and modification time of the indexed file"""
+        stat = os.stat(self.xml_filepath)
+        return '{0}\t{1!r}'.format(stat.st_size, stat.st_mtime)
+
+    def _load(self):
+        """
+        reads the index from its sidecar file. Returns False, iff the
+        sidecar file doesn't exist or belongs to a different version of the
+        XML file.
+        """
+        try:
+            with open(self.index_filepath) as index_file:
+                if index_file.readline().rstrip('\n') != \
+                        self._file_signature():
+                    return False
+                for line in index_file:
+                    element_id, start, end = line.rstrip('\n').split('\t')
+                    self.ids.append(element_id)
+                    self.offsets[element_id] = (int(start), int(end))
+        except (IOError, ValueError):  # missing or broken index file
+            self.ids = []
+            self.offsets = {}
+            return False
+        return True
+
+    def _build(self):
+        """scans the XML file for the byte offsets of all indexed elements"""
+        start_re = re.compile(r'<{0}\s(?:[^>]*?\s)?{1}="([^"]*)"'.format(
+            re.escape(self.tag), re.escape(self.id_attrib)))
+        end_tag = '</{0}>'.format(self.tag)
+        with open(self.xml_filepath, 'rb') as xml_file:
+            if os.fstat(xml_file.fileno()).st_size == 0:
+                return  # mmap can't map empty files
+            xml_map = mmap.mmap(xml_file.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                position = 0
+                while True:
+                    match = start_re.search(xml_map, position)
+                    if match is None:
+                        break
+                    start = match.start()
+                    tag_end = xml_map.find('>', match.end())
+                    if xml_map[tag_end-1] == '/':  # empty element
+                        end = tag_end + 1
+                    else:
+                        end = xml_map.find(end_tag, tag_end)
+                        if end == -1:
+                            raise ValueError(
+                                "Can't find the end of element '{0}' in "
+                                "'{1}'".format(match.group(1),
+                                               self.xml_filepath))
+                        end += len(end_tag)
+                    element_id = match.group(1)
+                    self.ids.append(element_id)
+                    self.offsets[element_id] = (start, end)
+                    position = end
+            finally:
+                xml_map.close()
+
+    def _save(self):
+        """
+        writes the index to a temporary file, which then replaces the
+        sidecar file (so that other processes never read incomplete files)
+        """
+        temp_filepath = '{0}.{1}.tmp'.format(self.index_filepath, os.getpid())
+        try:
+            with open(temp_filepath, 'w') as index_file:
+                index_file.write(self._file_signature() + '\n')
+                for element_id in self.ids:
+                    start, end = self.offsets[element_id]
+                    index_file.write('{0}\t{1}\t{2}\n'.format(
+                        element_id, start, end))
+            os.rename(temp_filepath, self.index_filepath)
+        except (IOError, OSError) as e:
+            warnings.warn("Can't store the index of '{0}': {1}".format(
+                self.xml_filepath, e))
+
+    def read(self, element_id):
+        """returns the given element as it is written in the file (str)"""
+        start, end = self.offsets[element_id]
+        with open(self.xml_filepath, 'rb') as xml_file:
+            xml_file.seek(start)
+            return xml_file.read(end - start)
+
+    def read_start_tag(self, element_id):
+        """
+        returns the start tag of the given element (str), e.g.
+        '<s id="s1">', without reading the whole element
+        """
+        start, end = self.offsets[element_id]
+        with open(self.xml_filepath, 'rb') as xml_file:
+            xml_file.seek(start)
+            start_tag = ''
+            while '>' not in start_tag and len(start_tag) < end - start:
+                start_tag += xml_file.read(1024)
+        return start_tag[:start_tag.find('>')+1]
+
+    def parse(self, element_id, parser=None):
+        """returns the given element, parsed into an lxml etree element"""
+        return etree.fromstring(self.read(element_id), parser)
 
 
 def convert_spanstring(span_string):
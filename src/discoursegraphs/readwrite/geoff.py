@@ -7,7 +7,6 @@
 # minor modifications: Arne Neumann <discoursegraphs.programming@arne.cl>
 
 import json
-import networkx as nx
 
 
 def node2geoff(node_name, properties, encoder):
@@ -88,7 +87,7 @@ def graph2geoff(graph, edge_rel_name, encoder=None):
 
     Parameters
     ----------
-    graph : Graph or DiGraph
+    graph : Graph or DiGraph or ExportView
         a NetworkX Graph or a DiGraph
     edge_rel_name : str
         relationship name between the nodes
@@ -102,14 +101,14 @@ def graph2geoff(graph, edge_rel_name, encoder=None):
     """
     if encoder is None:
         encoder = json.JSONEncoder()
-    is_digraph = isinstance(graph, nx.DiGraph)
+    is_digraph = graph.is_directed()
 
     lines = []
     lapp = lines.append
-    for node_name, properties in graph.nodes(data=True):
+    for node_name, properties in graph.nodes_iter(data=True):
         lapp(node2geoff(node_name, properties, encoder))
 
-    for from_node, to_node, properties in graph.edges(data=True):
+    for from_node, to_node, properties in graph.edges_iter(data=True):
         lapp(edge2geoff(from_node, to_node, properties, edge_rel_name, encoder))
         if not is_digraph:
             lapp(edge2geoff(to_node, from_node, properties, edge_rel_name,
@@ -6,11 +6,8 @@
 This module contains code to convert document graphs to GraphML files.
 """
 
-from copy import deepcopy
-
 from networkx import write_graphml as nx_write_graphml
-from discoursegraphs.readwrite.generic import (
-    attriblist2str, layerset2str, remove_root_metadata)
+from discoursegraphs.readwrite.generic import ExportView, layers2str
 
 
 def write_graphml(docgraph, output_file):
@@ -18,9 +15,6 @@ def write_graphml(docgraph, output_file):
     takes a document graph, converts it into GraphML format and writes it to
     a file.
     """
-    dg_copy = deepcopy(docgraph)
-    layerset2str(dg_copy)
-    attriblist2str(dg_copy)
-    remove_root_metadata(dg_copy)
-    nx_write_graphml(dg_copy, output_file)
-
+    export_view = ExportView(docgraph, layers=layers2str, attriblist2str=True,
+                             remove_root_metadata=True)
+    nx_write_graphml(export_view, output_file)
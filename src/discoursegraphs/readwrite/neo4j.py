@@ -7,10 +7,8 @@ The ``neo4j`` module converts a ``DiscourseDocumentGraph`` into a ``Geoff``
 string which can be imported into a ``Neo4j`` graph database.
 """
 
-from copy import deepcopy
-
 from discoursegraphs.util import ensure_utf8
-from discoursegraphs.readwrite.generic import layerset2list
+from discoursegraphs.readwrite.generic import ExportView
 from discoursegraphs.readwrite.geoff import graph2geoff
 
 
@@ -42,10 +40,8 @@ def convert_to_geoff(discoursegraph):
     geoff : string
         a geoff string representation of the discourse graph.
     """
-    dg_copy = deepcopy(discoursegraph)
-    layerset2list(dg_copy)
-    add_node_ids_as_labels(dg_copy)
-    return graph2geoff(dg_copy, 'LINKS_TO')
+    export_view = ExportView(discoursegraph, layers=list, add_labels=True)
+    return graph2geoff(export_view, 'LINKS_TO')
 
 
 def write_geoff(discoursegraph, output_file):
@@ -22,9 +22,7 @@ from lxml.builder import ElementMaker
 from discoursegraphs import (EdgeTypes, get_text, get_top_level_layers,
                              istoken, select_edges_by, select_nodes_by_layer,
                              tokens2text)
-from discoursegraphs.util import (create_dir, ensure_xpointer_compatibility,
-                                  natural_sort_key)
-from discoursegraphs.relabel import relabel_nodes
+from discoursegraphs.util import create_dir, ensure_xpointer_compatibility
 
 
 NSMAP = {'xlink': 'http://www.w3.org/1999/xlink',
@@ -121,18 +119,17 @@ class PaulaDocument(object):
 
     def __make_xpointer_compatible(self):
         """
-        ensure that all node and IDs in the document graph are valid
-        xpointer IDs. this will relabel all node IDs in place in the discourse
-        graph and change its ``.tokens`` list accordingly.
+        ensure that all node IDs written to the PAULA files are valid
+        xpointer IDs. Instead of relabeling (a copy of) the document graph,
+        this maps each node ID to its xpointer compatible version, which is
+        used whenever a node ID is written (cf. ``__xpointer_id``).
         """
+        self.xpointer_ids = {node: ensure_xpointer_compatibility(node)
+                             for node in self.dg.nodes_iter()}
 
-        node_id_map = {node: ensure_xpointer_compatibility(node)
-                       for node in self.dg.nodes_iter()}
-
-        old_token_ids = self.dg.tokens
-        # replace document graph with node relabeled version
-        self.dg = relabel_nodes(self.dg, node_id_map, copy=True)
-        self.dg.tokens = [node_id_map[tok] for tok in old_token_ids]
+    def __xpointer_id(self, node_id):
+        """returns the xpointer compatible version of the given node ID"""
+        return self.xpointer_ids[node_id]
 
     def __gen_primary_text_file(self):
         """
@@ -192,7 +189,7 @@ class PaulaDocument(object):
         for (tid, onset, tlen) in get_onsets(tok_tuples):
             # even SaltNPepper still uses xpointers for string-ranges!
             xp = "#xpointer(string-range(//body,'',{0},{1}))".format(onset, tlen)
-            mlist.append(E('mark', {'id': tid,
+            mlist.append(E('mark', {'id': self.__xpointer_id(tid),
                                     XLINKHREF: xp}))
         tree.append(mlist)
         self.files[paula_id] = tree
@@ -230,13 +227,15 @@ class PaulaDocument(object):
 
         target_dict = defaultdict(list)
         for source_id in span_dict:
-            targets = sorted(span_dict[source_id], key=natural_sort_key)
+            targets = sorted(span_dict[source_id],
+                             key=self.dg.tokens.sort_key)
             if saltnpepper_compatible:  # SNP doesn't like xpointer ranges
-                xp = ' '.join('#{0}'.format(target_id)
+                xp = ' '.join('#{0}'.format(self.__xpointer_id(target_id))
                               for target_id in targets)
             else:  # PAULA XML 1.1 specification
-                xp = '#xpointer(id({0})/range-to(id({1})))'.format(targets[0],
-                                                                 targets[-1])
+                xp = '#xpointer(id({0})/range-to(id({1})))'.format(
+                    self.__xpointer_id(targets[0]),
+                    self.__xpointer_id(targets[-1]))
             mark = E('mark', {XLINKHREF: xp})
             if self.human_readable:
                 # add <!-- comments --> containing the token strings
@@ -246,7 +245,7 @@ class PaulaDocument(object):
                 mlist.append(mark)
 
         if self.human_readable:  # order <mark> elements by token ordering
-            for target in sorted(target_dict, key=natural_sort_key):
+            for target in sorted(target_dict, key=self.dg.tokens.sort_key):
                 for mark in target_dict[target]:
                     mlist.append(mark)
 
@@ -273,7 +272,7 @@ class PaulaDocument(object):
 
         for token_id in self.dg.tokens:
             mfeat = E('multiFeat',
-                      {XLINKHREF: '#{0}'.format(token_id)})
+                      {XLINKHREF: '#{0}'.format(self.__xpointer_id(token_id))})
             token_dict = self.dg.node[token_id]
             for feature in token_dict:
                 # TODO: highly inefficient! refactor!1!!
@@ -323,7 +322,7 @@ class PaulaDocument(object):
             data=True)
         dominance_dict = defaultdict(lambda: defaultdict(str))
         for source_id, target_id, edge_attrs in dominance_edges:
-            if source_id != layer+':root_node':
+            if self.__xpointer_id(source_id) != layer+':root_node':
                 dominance_dict[source_id][target_id] = edge_attrs
 
         # in PAULA XML, token spans are also part of the hierarchy
@@ -336,20 +335,20 @@ class PaulaDocument(object):
         slist = E('structList', {'type': layer})
         for source_id in dominance_dict:
             struct = E('struct',
-                       {'id': str(source_id)})
+                       {'id': str(self.__xpointer_id(source_id))})
             if self.human_readable:
                 struct.append(Comment(self.dg.node[source_id].get('label')))
 
             for target_id in dominance_dict[source_id]:
                 if istoken(self.dg, target_id):
                     href = '{0}.xml#{1}'.format(self.paulamap['tokenization'],
-                                              target_id)
+                                              self.__xpointer_id(target_id))
                 else:
-                    href = '#{0}'.format(target_id)
+                    href = '#{0}'.format(self.__xpointer_id(target_id))
 
                 rel = E(
                     'rel',
-                    {'id': 'rel_{0}_{1}'.format(source_id, target_id),
+                    {'id': self.__rel_id(source_id, target_id),
                      'type': dominance_dict[source_id][target_id]['edge_type'],
                      XLINKHREF: href})
                 struct.append(rel)
@@ -382,7 +381,8 @@ class PaulaDocument(object):
         for node_id in select_nodes_by_layer(self.dg, top_level_layer):
             if not istoken(self.dg, node_id):
                 mfeat = E('multiFeat',
-                          {XLINKHREF: '#{0}'.format(node_id)})
+                          {XLINKHREF: '#{0}'.format(
+                              self.__xpointer_id(node_id))})
                 node_dict = self.dg.node[node_id]
                 for attr in node_dict:
                     if attr not in IGNORED_NODE_ATTRIBS:
@@ -414,7 +414,7 @@ class PaulaDocument(object):
             edge_type=EdgeTypes.dominance_relation, data=True)
         dominance_dict = defaultdict(lambda: defaultdict(str))
         for source_id, target_id, edge_attrs in dominance_edges:
-            if source_id != top_level_layer+':root_node':
+            if self.__xpointer_id(source_id) != top_level_layer+':root_node':
                 dominance_dict[source_id][target_id] = edge_attrs
 
         base_paula_id = self.paulamap['hierarchy'][top_level_layer]
@@ -422,7 +422,7 @@ class PaulaDocument(object):
                    {XMLBASE: base_paula_id+'.xml'})
         for source_id in dominance_dict:
             for target_id in dominance_dict[source_id]:
-                rel_href = '#rel_{0}_{1}'.format(source_id, target_id)
+                rel_href = '#'+self.__rel_id(source_id, target_id)
                 mfeat = E('multiFeat',
                           {XLINKHREF: rel_href})
                 edge_attrs = dominance_dict[source_id][target_id]
@@ -473,7 +473,7 @@ class PaulaDocument(object):
                 source_href = self.__gen_node_href(top_level_layer, source_id)
                 target_href = self.__gen_node_href(top_level_layer, target_id)
                 rel = E('rel',
-                        {'id': 'rel_{0}_{1}'.format(source_id, target_id),
+                        {'id': self.__rel_id(source_id, target_id),
                          XLINKHREF: source_href,
                          'target': target_href})
 
@@ -515,7 +515,7 @@ class PaulaDocument(object):
                    {XMLBASE: base_paula_id+'.xml'})
         for source_id in pointing_dict:
             for target_id in pointing_dict[source_id]:
-                rel_href = '#rel_{0}_{1}'.format(source_id, target_id)
+                rel_href = '#'+self.__rel_id(source_id, target_id)
                 mfeat = E('multiFeat',
                           {XLINKHREF: rel_href})
                 edge_attrs = pointing_dict[source_id][target_id]
@@ -574,7 +574,12 @@ class PaulaDocument(object):
             base_paula_id = self.paulamap['tokenization']
         else:
             base_paula_id = self.paulamap['hierarchy'][layer]
-        return '{0}.xml#{1}'.format(base_paula_id, node_id)
+        return '{0}.xml#{1}'.format(base_paula_id, self.__xpointer_id(node_id))
+
+    def __rel_id(self, source_id, target_id):
+        """returns the ID of the <rel> element representing the given edge"""
+        return 'rel_{0}_{1}'.format(self.__xpointer_id(source_id),
+                                    self.__xpointer_id(target_id))
 
 
 def paula_etree_to_string(tree, dtd_filename):
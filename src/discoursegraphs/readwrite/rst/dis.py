@@ -19,6 +19,7 @@ from nltk.tree import ParentedTree
 
 from discoursegraphs import DiscourseDocumentGraph, EdgeTypes
 from discoursegraphs.readwrite.ptb import PTB_BRACKET_ESCAPE
+from discoursegraphs.traversal import preorder
 
 
 SUBTREE_TYPES = ('Root', 'Nucleus', 'Satellite')
@@ -91,14 +92,29 @@ class RSTLispDocumentGraph(DiscourseDocumentGraph):
 
     def parse_rst_tree(self, rst_tree, indent=0):
         """parse an RST ParentedTree into this document graph"""
+        for subtree in preorder(rst_tree, self.get_subtrees):
+            self.parse_rst_subtree(subtree)
+
+    def get_subtrees(self, rst_tree):
+        """
+        returns the Nucleus / Satellite subtrees of the given (sub)tree
+        """
         tree_type = self.get_tree_type(rst_tree)
-        assert tree_type in SUBTREE_TYPES
         if tree_type == 'Root':
-            span, children = rst_tree[0], rst_tree[1:]
-            for child in children:
-                self.parse_rst_tree(child, indent=indent+1)
+            return rst_tree[1:]
+        elif self.get_node_type(rst_tree) == 'leaf':
+            return []
+        else:  # node_type == 'span'
+            return rst_tree[3:]
 
-        else: # tree_type in ('Nucleus', 'Satellite')
+    def parse_rst_subtree(self, rst_tree):
+        """
+        parse the root of an RST (sub)tree (but not its subtrees) into
+        this document graph
+        """
+        tree_type = self.get_tree_type(rst_tree)
+        assert tree_type in SUBTREE_TYPES
+        if tree_type != 'Root':  # tree_type in ('Nucleus', 'Satellite')
             node_id = self.get_node_id(rst_tree)
             node_type = self.get_node_type(rst_tree)
             relation_type = self.get_relation_type(rst_tree)
@@ -160,9 +176,6 @@ class RSTLispDocumentGraph(DiscourseDocumentGraph):
                 else:
                     raise ValueError("Unexpected child combinations: {}\n".format(child_types))
 
-                for child in children:
-                    self.parse_rst_tree(child, indent=indent+1)
-
     def get_child_types(self, children):
         """
         maps from (sub)tree type (i.e. Nucleus or Satellite) to a list
@@ -21,8 +21,8 @@ from lxml import etree
 
 from discoursegraphs import (DiscourseDocumentGraph, EdgeTypes, get_span,
                              istoken, select_neighbors_by_layer)
-from discoursegraphs.util import (get_segment_token_offsets, natural_sort_key,
-                                  sanitize_string, TokenMapper)
+from discoursegraphs.util import (get_segment_token_offsets, sanitize_string,
+                                  TokenMapper)
 from discoursegraphs.readwrite.generic import generic_converter_cli
 
 
@@ -218,8 +218,8 @@ class RSTGraph(DiscourseDocumentGraph):
                 # it, since 'span' is not very informative
                 if not self.ns+':segment_type' in self.node[group_id]:
                     group_attrs[self.ns+':segment_type'] = segment_type
-            self.node[group_id].update(group_attrs,
-                                       layers={self.ns, self.ns+':group'})
+            self.node[group_id].update(group_attrs)
+            self._set_node_layers(group_id, {self.ns, self.ns+':group'})
 
         if 'parent' not in group.attrib:  # mark group as RST root node
             # each discourse docgraphs has a default root node, but we will
@@ -227,12 +227,12 @@ class RSTGraph(DiscourseDocumentGraph):
             old_root_id = self.root
             self.root = group_id
             # workaround for #141: the layers attribute is append-only,
-            # but here we're updating it as a part of the attribute dict
+            # but here we're replacing it
             #
             # root segment type: always span
-            root_attrs = {'layers': {self.ns, self.ns+':root'},
-                          self.ns+':segment_type': 'span'}
+            root_attrs = {self.ns+':segment_type': 'span'}
             self.node[group_id].update(root_attrs)
+            self._set_node_layers(group_id, {self.ns, self.ns+':root'})
             # copy metadata from old root node
             self.node[group_id]['metadata'] = self.node[old_root_id]['metadata']
             # finally, remove the old root node
@@ -469,7 +469,7 @@ def get_rst_relations(docgraph):
                                            layer={'rst:segment', 'rst:group'}))
         multinuc_nuc_count = 1
         directly_dominated_tokens = sorted([node for node in docgraph.neighbors(dom_node)
-                                            if istoken(docgraph, node)], key=natural_sort_key)
+                                            if istoken(docgraph, node)], key=docgraph.tokens.sort_key)
         if directly_dominated_tokens:
             rst_relations[dom_node]['tokens'] = directly_dominated_tokens
 
@@ -7,14 +7,20 @@ The ``tiger`` module converts a ``TigerXML`` file into a networkx-based
 document graph.
 """
 
+import marshal
+import multiprocessing
 import os
+from collections import deque, OrderedDict
 from lxml import etree
 
 import discoursegraphs as dg
 from discoursegraphs import DiscourseDocumentGraph, EdgeTypes
 from discoursegraphs.util import natural_sort_key, ensure_unicode, add_prefix
-from discoursegraphs.readwrite.generic import generic_converter_cli
-from discoursegraphs.relabel import relabel_nodes
+from discoursegraphs.readwrite.generic import (ElementIndex,
+                                               generic_converter_cli)
+
+# number of sentences that a worker process parses at once
+SENTENCE_CHUNKSIZE = 500
 
 
 class TigerDocumentGraph(DiscourseDocumentGraph):
@@ -54,11 +60,17 @@ class TigerDocumentGraph(DiscourseDocumentGraph):
     tokens : list of str
         sorted list of all token node IDs contained in this document graph
     """
-    def __init__(self, tiger_filepath=None, name=None, namespace='tiger'):
+    def __init__(self, tiger_filepath=None, name=None, namespace='tiger',
+                 workers=None):
         """
         Creates a directed graph that represents all syntax annotated
         sentences in the given TigerXML file.
 
+        If more than one worker is requested, the sentences are parsed in
+        a pool of worker processes and then added to the document graph in
+        their original order. This requires a sentence index of the file
+        (cf. ``TigerCorpus``), which is stored next to it.
+
         Parameters
         ----------
         tiger_filepath : str or None
@@ -69,6 +81,9 @@ class TigerDocumentGraph(DiscourseDocumentGraph):
             given, the basename of the input file is used.
         namespace : str
             the namespace of the graph (default: tiger)
+        workers : int or None
+            number of worker processes used for parsing the sentences.
+            If None (or 1), the file is parsed in this process.
         """
         # super calls __init__() of base class DiscourseDocumentGraph
         super(TigerDocumentGraph, self).__init__(namespace=namespace)
@@ -77,23 +92,72 @@ class TigerDocumentGraph(DiscourseDocumentGraph):
         if not tiger_filepath:
             return  # create empty document graph
 
-        utf8_parser = etree.XMLParser(encoding="utf-8")
-        tigerxml_tree = etree.parse(tiger_filepath, utf8_parser)
-        tigerxml_root = tigerxml_tree.getroot()
-
         self.name = name if name else os.path.basename(tiger_filepath)
-        self.corpus_id = tigerxml_root.attrib['id']
-
         self.tokens = []
         self.sentences = []
-        for sentence in tigerxml_root.iterfind('./body/s'):
-            self.__add_sentence_to_document(sentence)
+
+        if workers is not None and workers > 1:
+            self.__add_sentences_in_parallel(tiger_filepath, workers)
+            self.corpus_id = _get_corpus_id(tiger_filepath)
+        else:
+            self.__add_sentences(tiger_filepath)
         self.sentences = sorted(self.sentences, key=natural_sort_key)
 
+    def __add_sentences(self, tiger_filepath):
+        """
+        Parses the given TigerXML file one sentence at a time (so that only
+        the current <s> element and not the whole XML tree is kept in memory)
+        and adds the sentences to this document graph.
+        """
+        context = etree.iterparse(tiger_filepath, events=('end',), tag='s',
+                                  encoding='utf-8')
+        for _event, sentence in context:
+            self.__add_sentence_to_document(sentence)
+            # removes element (and references to it) from memory after
+            # processing it
+            sentence.clear()
+            while sentence.getprevious() is not None:
+                del sentence.getparent()[0]
+        self.corpus_id = context.root.attrib['id']
+
+    def __add_sentences_in_parallel(self, tiger_filepath, workers):
+        """
+        Splits the sentences of the given TigerXML file into chunks, which
+        are parsed by a pool of worker processes (cf.
+        ``_parse_sentence_chunk``), and adds the resulting nodes and edges
+        to this document graph (in the order of the sentences in the file).
+
+        At most two chunks per worker are parsed (or waiting to be added) at
+        the same time, so that the parsed chunks don't pile up in memory if
+        the workers are faster than this process.
+        """
+        index = ElementIndex(tiger_filepath, 's')
+        offsets = [index.offsets[sentence_id] for sentence_id in index.ids]
+        chunks = ((tiger_filepath, self.ns, offsets[i:i+SENTENCE_CHUNKSIZE])
+                  for i in xrange(0, len(offsets), SENTENCE_CHUNKSIZE))
+
+        def add_chunk(parsed_chunk):
+            for parsed_sentence in marshal.loads(parsed_chunk.get()):
+                self.__add_parsed_sentence(*parsed_sentence)
+
+        pool = multiprocessing.Pool(workers)
+        try:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(
+                    pool.apply_async(_parse_sentence_chunk, (chunk, )))
+                if len(pending) >= 2 * workers:
+                    add_chunk(pending.popleft())
+            while pending:
+                add_chunk(pending.popleft())
+        finally:
+            pool.terminate()
+            pool.join()
+
     def __add_sentence_to_document(self, sentence):
         """
-        Converts a sentence into a TigerSentenceGraph and adds all
-        its nodes, edges (and their features) to this document graph.
+        Converts a sentence into nodes and edges (cf. ``TigerSentenceGraph``)
+        and adds them (and their features) directly to this document graph.
 
         This also adds a ``dominance_relation`` edge from the root node of this
         document graph to the root node of the sentence and appends the
@@ -104,12 +168,23 @@ class TigerDocumentGraph(DiscourseDocumentGraph):
         sentence : lxml.etree._Element
             a sentence from a TigerXML file in etree element format
         """
-        sentence_graph = TigerSentenceGraph(sentence)
-        self.tokens.extend(sentence_graph.tokens)
-        sentence_root_node_id = sentence_graph.root
+        sentence_root_node_id, tokens, nodes, edges = \
+            _parse_sentence(sentence, self.ns)
+        self.__add_parsed_sentence(sentence_root_node_id, tokens,
+                                   nodes.iteritems(), edges)
+
+    def __add_parsed_sentence(self, sentence_root_node_id, tokens, nodes,
+                              edges):
+        """
+        adds the nodes and edges of a parsed sentence (cf.
+        ``_parse_sentence``) to this document graph.
+        """
+        self.tokens.extend(tokens)
 
-        self.add_nodes_from(sentence_graph.nodes(data=True))
-        self.add_edges_from(sentence_graph.edges(data=True))
+        # the attribute dicts aren't used anywhere else, so we can simply
+        # take them over
+        self.add_nodes_bulk(nodes)
+        self.add_edges_bulk(edges)
         self.add_edge(self.root, sentence_root_node_id,
                       layers={self.ns, self.ns+':sentence'},
                       edge_type=EdgeTypes.dominance_relation)
@@ -150,140 +225,296 @@ class TigerSentenceGraph(DiscourseDocumentGraph):
         self.remove_node(self.root)  # delete default root node
         self.ns = namespace
 
-        self.tokens = []
-
-        graph_element = sentence.find('./graph')
-        self.root = graph_element.attrib['root']
         self.name = sentence.attrib.get('id', '')
+        self.root, self.tokens, nodes, edges = \
+            _parse_sentence(sentence, self.ns)
+        self.add_nodes_bulk(nodes.iteritems())
+        self.add_edges_bulk(edges)
 
-        # sentence.attrib is a lxml.etree._Attrib, which is 'dict-like'
-        # but doesn't behave exactly like a dict (i.e. it threw an error
-        # when I tried to update it)
-        sentence_attributes = add_prefix(sentence.attrib, self.ns+':')
 
-        # some sentences in the Tiger corpus are marked as discontinuous
-        if 'discontinuous' in graph_element.attrib:
-            sentence_attributes.update(
-                {self.ns+':discontinuous':
-                    graph_element.attrib['discontinuous']})
+class TigerCorpus(object):
+    """
+    provides random access to the sentences of a (large) TigerXML file,
+    e.g. the complete TIGER treebank. Instead of parsing the whole file,
+    each requested sentence is read from its byte offset and parsed into a
+    ``TigerSentenceGraph``.
 
-        self.__tigersentence2graph(sentence)
-        self.__repair_unconnected_nodes()
+    The byte offsets of all sentences are collected when a file is
+    opened for the first time and are stored in a sidecar index file,
+    which is reused afterwards (cf. ``ElementIndex``).
 
-    def __tigersentence2graph(self, sentence):
-        """
-        Reads a sentence with syntax annotation (parsed from a TigerXML
-        file) into this directed graph. Adds an attribute named 'tokens'
-        to the sentence root node containing a sorted list of token node
-        IDs. (The same list is also stored in ``self.tokens``).
+    To print the tokens of a specific sentence, use::
 
+        corpus = TigerCorpus('/path/to/tiger.file')
+        tsg = corpus['s2001']
+        for token_id in tsg.tokens:
+            print tsg.get_token(token_id)
+
+    Attributes
+    ----------
+    name : str
+        the basename of the TigerXML file
+    path : str
+        the absolute path of the TigerXML file
+    ns : str
+        the namespace of the sentence graphs (default: tiger)
+    index : ElementIndex
+        maps from a sentence ID to the byte offsets of the sentence
+    """
+    def __init__(self, tiger_filepath, index_filepath=None, namespace='tiger'):
+        """
         Parameters
         ----------
-        sentence : lxml.etree._Element
-            a sentence from a TigerXML file in etree element format
+        tiger_filepath : str
+            absolute or relative path to the TigerXML file
+        index_filepath : str or None
+            path to the sidecar file that stores the byte offsets of all
+            sentences. If None, the path of the TigerXML file plus '.s.idx'
+            is used.
+        namespace : str
+            the namespace of the sentence graphs (default: tiger)
         """
-        # add sentence root to graph
-        self.add_node(self.root,
-                      layers={self.ns, self.ns+':sentence',
-                              self.ns+':sentence:root'})
-
-
-        token_ids = []
-        # add terminals to graph (tokens)
-        for t in sentence.iterfind('./graph/terminals/t'):
-            terminal_id = t.attrib['id']
-            token_ids.append(terminal_id)
-            # all token attributes shall belong to the tiger namespace
-            terminal_features = add_prefix(t.attrib, self.ns+':')
-            # convert tokens to unicode
-            terminal_features[self.ns+':token'] = ensure_unicode(
-                terminal_features[self.ns+':word'])
-            self.add_node(terminal_id, layers={self.ns, self.ns+':token'},
-                          attr_dict=terminal_features,
-                          label=terminal_features[self.ns+':token'])
-
-            # add secedge pointing relations from tokens to other tokens or
-            # syntactic categories
-            for secedge in t.iterfind('./secedge'):
-                to_id = secedge.attrib['idref']
-                secedge_attribs = add_prefix(secedge.attrib, self.ns+':')
-                if to_id not in self:  # if graph doesn't contain to-node, yet
-                    self.add_node(to_id, layers={self.ns, self.ns+':secedge'})
-                self.add_edge(terminal_id, to_id,
-                              layers={self.ns, self.ns+':secedge'},
-                              attr_dict=secedge_attribs,
-                              edge_type=EdgeTypes.pointing_relation)
-
-        # add sorted list of all token node IDs to sentence root node
-        # to make queries simpler/faster
-        sorted_token_ids = sorted(token_ids, key=natural_sort_key)
-        self.node[self.root].update({'tokens': sorted_token_ids})
-        self.tokens = sorted_token_ids
-
-        # add nonterminals (syntax categories) to graph
-        for nt in sentence.iterfind('./graph/nonterminals/nt'):
-            from_id = nt.attrib['id']
-            nt_feats = add_prefix(nt.attrib, self.ns+':')
-            nt_feats['label'] = nt_feats[self.ns+':cat']
-            # root node already exists, but doesn't have a cat value
-            if from_id in self:
-                self.node[from_id].update(nt_feats)
-            else:
-                self.add_node(from_id, layers={self.ns, self.ns+':syntax'},
-                              attr_dict=nt_feats)
-
-            # add edges to graph (syntax cat dominances token/other cat)
-            for edge in nt.iterfind('./edge'):
-                to_id = edge.attrib['idref']
-                if to_id not in self:  # if graph doesn't contain to-node, yet
-                    self.add_node(to_id, layers={self.ns, self.ns+':secedge'})
-                edge_attribs = add_prefix(edge.attrib, self.ns+':')
-
-                # add a spanning relation from a syntax cat to a token
-                if self.ns+':token' in self.node[to_id]['layers']:
-                    edge_type = EdgeTypes.spanning_relation
-                else:  # add a dominance relation between two syntax categories
-                    edge_type = EdgeTypes.dominance_relation
-
-                self.add_edge(from_id, to_id,
-                              layers={self.ns, self.ns+':edge'},
-                              attr_dict=edge_attribs,
-                              label=edge_attribs[self.ns+':label'],
-                              edge_type=edge_type)
-
-            # add secondary edges to graph (cat points to other cat/token)
-            for secedge in nt.iterfind('./secedge'):
-                to_id = secedge.attrib['idref']
-                if to_id not in self:  # if graph doesn't contain to-node, yet
-                    self.add_node(to_id, layers={self.ns, self.ns+':secedge'})
-                secedge_attribs = add_prefix(secedge.attrib, self.ns+':')
-                self.add_edge(from_id, to_id,
-                              layers={self.ns, self.ns+':secedge'},
-                              attr_dict=secedge_attribs,
-                              label=edge_attribs[self.ns+':label'],
-                              edge_type=EdgeTypes.pointing_relation)
-
-    def __repair_unconnected_nodes(self):
+        self.name = os.path.basename(tiger_filepath)
+        self.path = os.path.abspath(tiger_filepath)
+        self.ns = namespace
+        self.index = ElementIndex(tiger_filepath, 's',
+                                  index_filepath=index_filepath)
+
+    @property
+    def sentence_ids(self):
+        """the IDs of all sentences (in the order they occur in the file)"""
+        return self.index.ids
+
+    def __len__(self):
+        """return the number of sentences in the corpus"""
+        return len(self.index)
+
+    def __contains__(self, sentence_id):
+        return sentence_id in self.index
+
+    def __iter__(self):
+        for sentence_id in self.index:
+            yield self.get_sentence(sentence_id)
+
+    def get_sentence(self, sentence_id):
         """
-        Adds a (``dominance_relation``) edge from the sentence root node to all
-        previously unconnected nodes (token nodes, that either represent a
-        punctuation mark or are part of a headline 'sentence' that has no
-        full syntax structure annotation).
+        given a sentence ID (i.e. the 'id' attribute of an <s> element),
+        returns the sentence as a ``TigerSentenceGraph``.
         """
-        unconnected_node_ids = get_unconnected_nodes(self)
-        if dg.istoken(self, self.root):
-            # This sentence has no hierarchical structure, i.e. the root
-            # node is also a terminal / token node.
-            # We will add a virtual root node to compensate for this.
-            self.root = self.ns+':VROOT'
-            self.add_node(self.root,
-                layers={'tiger', 'tiger:sentence', 'tiger:sentence:root'})
-
-        for unconnected_node_id in unconnected_node_ids:
-            self.add_edge(self.root, unconnected_node_id,
-                          layers={self.ns, self.ns+':sentence',
-                                  self.ns+':unconnected'},
-                          edge_type=EdgeTypes.dominance_relation)
+        return TigerSentenceGraph(self.index.parse(sentence_id),
+                                  namespace=self.ns)
+
+    def __getitem__(self, sliced):
+        """access sentences by their index or by their sentence ID"""
+        if isinstance(sliced, str):  # get sentence by its sentence ID
+            return self.get_sentence(sliced)
+        elif isinstance(sliced, int):  # get sentence by its index
+            return self.get_sentence(self.sentence_ids[sliced])
+        else:  # get a slice/range of sentences
+            return [self.get_sentence(sentence_id)
+                    for sentence_id in self.sentence_ids[sliced]]
+
+
+def _parse_sentence(sentence, namespace='tiger'):
+    """
+    Reads a sentence with syntax annotation (parsed from a TigerXML
+    file) into nodes and edges, without building a graph. Adds an attribute
+    named 'tokens' to the sentence root node containing a sorted list of
+    token node IDs.
+
+    Previously unconnected nodes (token nodes, that either represent a
+    punctuation mark or are part of a headline 'sentence' that has no
+    full syntax structure annotation) are connected to the sentence root
+    node via a ``dominance_relation``.
+
+    Parameters
+    ----------
+    sentence : lxml.etree._Element
+        a sentence from a TigerXML file in etree element format
+    namespace : str
+        the namespace of the nodes and edges (default: tiger)
+
+    Returns
+    -------
+    root : str
+        node ID of the root node of the sentence
+    tokens : list of str
+        a sorted list of terminal node IDs (i.e. token nodes)
+    nodes : OrderedDict
+        maps from a node ID to its attribute dict (incl. its ``layers``)
+    edges : list of (str, str, dict) tuples
+        the (source node ID, target node ID, attribute dict) of all edges,
+        in the order in which a ``TigerSentenceGraph`` would return them
+    """
+    ns = namespace
+    nodes = OrderedDict()
+    # maps from a source node ID to a dict, which maps from a target node ID
+    # to the list of attribute dicts of all edges between them
+    adjacency = {}
+
+    def add_node(node_id, layers, attr_dict=None):
+        """adds a node or updates its attributes/layers, cf. add_node()"""
+        node_attrs = nodes.get(node_id)
+        if node_attrs is None:
+            node_attrs = nodes[node_id] = {}
+            all_layers = layers
+        else:
+            all_layers = node_attrs['layers'].union(layers)
+        if attr_dict:
+            node_attrs.update(attr_dict)
+        node_attrs['layers'] = all_layers
+
+    def add_edge(source_id, target_id, layers, attr_dict, **attr):
+        attr_dict.update(attr)
+        attr_dict['layers'] = layers
+        targets = adjacency.setdefault(source_id, {})
+        targets.setdefault(target_id, []).append(attr_dict)
+
+    root = sentence.find('./graph').attrib['root']
+    # add sentence root to graph
+    add_node(root, {ns, ns+':sentence', ns+':sentence:root'})
+
+    token_ids = []
+    # add terminals to graph (tokens)
+    for t in sentence.iterfind('./graph/terminals/t'):
+        terminal_id = t.attrib['id']
+        token_ids.append(terminal_id)
+        # all token attributes shall belong to the tiger namespace
+        terminal_features = add_prefix(t.attrib, ns+':')
+        # convert tokens to unicode
+        terminal_features[ns+':token'] = ensure_unicode(
+            terminal_features[ns+':word'])
+        terminal_features['label'] = terminal_features[ns+':token']
+        add_node(terminal_id, {ns, ns+':token'}, terminal_features)
+
+        # add secedge pointing relations from tokens to other tokens or
+        # syntactic categories
+        for secedge in t.iterfind('./secedge'):
+            to_id = secedge.attrib['idref']
+            if to_id not in nodes:  # if graph doesn't contain to-node, yet
+                add_node(to_id, {ns, ns+':secedge'})
+            secedge_attribs = add_prefix(secedge.attrib, ns+':')
+            add_edge(terminal_id, to_id, {ns, ns+':secedge'},
+                     secedge_attribs, edge_type=EdgeTypes.pointing_relation)
+
+    # add sorted list of all token node IDs to sentence root node
+    # to make queries simpler/faster
+    sorted_token_ids = sorted(token_ids, key=natural_sort_key)
+    nodes[root]['tokens'] = sorted_token_ids
+
+    # add nonterminals (syntax categories) to graph
+    for nt in sentence.iterfind('./graph/nonterminals/nt'):
+        from_id = nt.attrib['id']
+        nt_feats = add_prefix(nt.attrib, ns+':')
+        nt_feats['label'] = nt_feats[ns+':cat']
+        # root node already exists, but doesn't have a cat value
+        if from_id in nodes:
+            nodes[from_id].update(nt_feats)
+        else:
+            add_node(from_id, {ns, ns+':syntax'}, nt_feats)
+
+        # add edges to graph (syntax cat dominances token/other cat)
+        for edge in nt.iterfind('./edge'):
+            to_id = edge.attrib['idref']
+            if to_id not in nodes:  # if graph doesn't contain to-node, yet
+                add_node(to_id, {ns, ns+':secedge'})
+            edge_attribs = add_prefix(edge.attrib, ns+':')
+
+            # add a spanning relation from a syntax cat to a token
+            if ns+':token' in nodes[to_id]['layers']:
+                edge_type = EdgeTypes.spanning_relation
+            else:  # add a dominance relation between two syntax categories
+                edge_type = EdgeTypes.dominance_relation
+
+            add_edge(from_id, to_id, {ns, ns+':edge'}, edge_attribs,
+                     label=edge_attribs[ns+':label'], edge_type=edge_type)
+
+        # add secondary edges to graph (cat points to other cat/token)
+        for secedge in nt.iterfind('./secedge'):
+            to_id = secedge.attrib['idref']
+            if to_id not in nodes:  # if graph doesn't contain to-node, yet
+                add_node(to_id, {ns, ns+':secedge'})
+            secedge_attribs = add_prefix(secedge.attrib, ns+':')
+            add_edge(from_id, to_id, {ns, ns+':secedge'}, secedge_attribs,
+                     label=edge_attribs[ns+':label'],
+                     edge_type=EdgeTypes.pointing_relation)
+
+    # a node is unconnected, if it doesn't have any in- or outgoing edges
+    # (and if it isn't the only node of the sentence), cf.
+    # get_unconnected_nodes()
+    connected_node_ids = set(adjacency)
+    for targets in adjacency.itervalues():
+        connected_node_ids.update(targets)
+    unconnected_node_ids = []
+    if len(nodes) > 1:
+        unconnected_node_ids = [node_id for node_id in nodes
+                                if node_id not in connected_node_ids]
+
+    if ns+':token' in nodes[root]:
+        # This sentence has no hierarchical structure, i.e. the root
+        # node is also a terminal / token node.
+        # We will add a virtual root node to compensate for this.
+        root = ns+':VROOT'
+        add_node(root, {'tiger', 'tiger:sentence', 'tiger:sentence:root'})
+
+    for unconnected_node_id in unconnected_node_ids:
+        add_edge(root, unconnected_node_id,
+                 {ns, ns+':sentence', ns+':unconnected'}, {},
+                 edge_type=EdgeTypes.dominance_relation)
+
+    # edges are grouped by their source node (in the order the nodes were
+    # added) and by their target node, like in the adjacency dicts of a
+    # DiscourseDocumentGraph
+    edges = [(source_id, target_id, edge_attrs)
+             for source_id in nodes if source_id in adjacency
+             for target_id, attr_dicts in adjacency[source_id].iteritems()
+             for edge_attrs in attr_dicts]
+    return root, sorted_token_ids, nodes, edges
+
+
+def _parse_sentence_chunk(chunk):
+    """
+    Parses a chunk of sentences from a TigerXML file (cf.
+    ``_parse_sentence``). This runs in a worker process, so it only gets
+    the byte offsets of the sentences and returns their nodes and edges as
+    plain lists, serialized with ``marshal`` (which serializes this kind of
+    data much faster than pickle).
+
+    Parameters
+    ----------
+    chunk : (str, str, list of (int, int))
+        the path to the TigerXML file, the namespace of the nodes and edges
+        and the (start, end) byte offsets of the consecutive sentences to be
+        parsed
+
+    Returns
+    -------
+    parsed_chunk : str
+        a marshalled list of (str, list of str, list, list) tuples, i.e.
+        the root node ID, the sorted token node IDs, the (node ID,
+        attribute dict) tuples and the (source node ID, target node ID,
+        attribute dict) tuples of each sentence
+    """
+    tiger_filepath, namespace, offsets = chunk
+    chunk_start = offsets[0][0]
+    with open(tiger_filepath, 'rb') as tiger_file:
+        tiger_file.seek(chunk_start)
+        chunk_str = tiger_file.read(offsets[-1][1] - chunk_start)
+
+    parsed_sentences = []
+    for start, end in offsets:
+        sentence = etree.fromstring(
+            chunk_str[start-chunk_start:end-chunk_start])
+        root, tokens, nodes, edges = _parse_sentence(sentence, namespace)
+        parsed_sentences.append((root, tokens, nodes.items(), edges))
+    return marshal.dumps(parsed_sentences)
+
+
+def _get_corpus_id(tiger_filepath):
+    """returns the 'id' attribute of the <corpus> element of a TigerXML file"""
+    for _event, corpus in etree.iterparse(tiger_filepath, events=('start',),
+                                          tag='corpus'):
+        return corpus.attrib['id']
 
 
 def _get_terminals_and_nonterminals(sentence_graph):
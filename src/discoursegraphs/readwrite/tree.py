@@ -14,6 +14,7 @@ import networkx as nx
 
 from discoursegraphs import (
     EdgeTypes, istoken, select_neighbors_by_edge_attribute)
+from discoursegraphs.traversal import fold
 
 
 def get_child_nodes(docgraph, parent_node_id, data=False):
@@ -56,24 +57,116 @@ def get_parents(docgraph, child_node, strict=True):
     return parents
 
 
-def horizontal_positions(docgraph, sentence_root=None):
-    """return map: node ID -> first token index (int) it covers"""
+class DominanceIndex(object):
+    """
+    An index of the dominance relations of a (sub)tree of a document graph,
+    which is built in one pass over the edges of the tree.
+
+    Attributes
+    ----------
+    root : str
+        the node ID of the root of the (sub)tree
+    parents : dict of (str, str)
+        maps from a node ID to the ID of the (first) node that dominates it.
+        This includes the ancestors of the root node.
+    children : dict of (str, list of str)
+        maps from a node ID to the IDs of the nodes that it dominates
+    conflicts : set of str
+        IDs of the nodes that are dominated by more than one parent node.
+        Merged document graphs usually contain such nodes (e.g. RST
+        segments), so they are only an error if a tree traversal actually
+        has to pass through them.
+    """
+    def __init__(self, docgraph, root=None):
+        """
+        Parameters
+        ----------
+        docgraph : DiscourseDocumentGraph
+            a document graph
+        root : str or None
+            the node ID of the root of the (sub)tree to index. If None,
+            the whole document graph (i.e. ``docgraph.root``) is indexed.
+        """
+        self.root = docgraph.root if root is None else root
+        self.parents = {}
+        self.children = {}
+        self.conflicts = set()
+
+        dominance = EdgeTypes.dominance_relation
+        queue = deque([self.root])
+        while queue:
+            parent = queue.popleft()
+            children = []
+            for child, edge_dict in docgraph.succ[parent].iteritems():
+                if any(edge_attrs['edge_type'] == dominance
+                       for edge_attrs in edge_dict.itervalues()):
+                    children.append(child)
+                    if child in self.parents or child == self.root:
+                        self.conflicts.add(child)
+                    else:
+                        self.parents[child] = parent
+                        queue.append(child)
+            self.children[parent] = children
+
+        node = self.root
+        while node not in self.parents:
+            root_parents = get_parents(docgraph, node, strict=False)
+            if not root_parents:
+                break
+            if len(root_parents) > 1:
+                self.conflicts.add(node)
+            self.parents[node] = root_parents[0]
+            node = root_parents[0]
+
+
+def horizontal_positions(docgraph, sentence_root=None, index=None):
+    """return map: node ID -> first token index (int) it covers
+
+    Parameters
+    ----------
+    docgraph : DiscourseDocumentGraph
+        a document graph
+    sentence_root : str or None
+        If given, only calculate positions for the subgraph that this
+        (sentence root) node dominates.
+    index : DominanceIndex or None
+        a dominance index of the (sentence) subgraph. If None, it will be
+        built.
+
+    Raises
+    ------
+    ValueError
+        if one of the ancestors of a token is dominated by more than one
+        parent node
+    """
     # calculate positions for the whole graph
     if (sentence_root is None) or (sentence_root == docgraph.root) \
         or ('tokens' not in docgraph.node[sentence_root]):
             sentence_root = docgraph.root
             token_nodes = docgraph.tokens
-            path = {}
+            root_position = None
     else:  # calculate positions only for the given sentence subgraph
         token_nodes = docgraph.node[sentence_root]['tokens']
-        path = {sentence_root: 0}
+        root_position = 0
+
+    if index is None or index.root != sentence_root:
+        index = DominanceIndex(docgraph, sentence_root)
+    parents = index.parents
+    conflicts = index.conflicts
 
+    path = {}
     for i, token_node in enumerate(token_nodes):
         start_node = token_node
-        while get_parents(docgraph, start_node, strict=True):
-            if start_node not in path:
-                path[start_node] = i
-            start_node = get_parents(docgraph, start_node, strict=True)[0]
+        # all ancestors of a node in the path are already in the path, too
+        while start_node in parents and start_node not in path:
+            if start_node in conflicts:
+                raise ValueError(("In a syntax tree, a node can't be "
+                                  "dominated by more than one parent"))
+            path[start_node] = i
+            start_node = parents[start_node]
+
+    if root_position is not None:
+        path[sentence_root] = root_position
     return path
 
 
@@ -101,24 +194,18 @@ def sorted_bfs_edges(G, source=None):
     if source is None:
         source = G.root
 
-    xpos = horizontal_positions(G, source)
-    neighbors = G.neighbors_iter
+    index = DominanceIndex(G, source)
+    xpos = horizontal_positions(G, source, index=index)
+    children = index.children
     visited = set([source])
-    source_children = get_child_nodes(G, source)
-    queue = deque([(source, iter(sorted(source_children,
-                                        key=lambda x: xpos[x])))])
+    queue = deque([source])
     while queue:
-        parent, children = queue[0]
-        try:
-            child = next(children)
+        parent = queue.popleft()
+        for child in sorted(children[parent], key=xpos.__getitem__):
             if child not in visited:
                 yield parent, child
                 visited.add(child)
-                grandchildren = get_child_nodes(G, child)
-                queue.append((child, iter(sorted(grandchildren,
-                                                 key=lambda x: xpos[x]))))
-        except StopIteration:
-            queue.popleft()
+                queue.append(child)
 
 
 def sorted_bfs_successors(G, source=None):
@@ -173,9 +260,10 @@ def tree2bracket(docgraph, root=None, successors=None):
     if successors is None:
         successors = sorted_bfs_successors(docgraph, root)
 
-    if root in successors:
-        embed_str = u" ".join(tree2bracket(docgraph, child, successors)
-                              for child in successors[root])
-        return node2bracket(docgraph, root, embed_str)
-    else:
-        return node2bracket(docgraph, root)
+    def combine(node_id, child_strs):
+        if child_strs:  # node has children / subgraphs
+            return node2bracket(docgraph, node_id, u" ".join(child_strs))
+        else:
+            return node2bracket(docgraph, node_id)
+
+    return fold(root, lambda node_id: successors.get(node_id, ()), combine)
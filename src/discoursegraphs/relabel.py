@@ -74,8 +74,8 @@ def relabel_nodes(G, mapping, copy=True):
     Only the nodes specified in the mapping will be relabeled.
 
     The keyword setting copy=False modifies the graph in place.
-    This is not always possible if the mapping is circular.
-    In that case use copy=True.
+    This also works for circular mappings, as the graph is rebuilt in one
+    pass (instead of relabeling one node after another).
 
     See Also
     --------
@@ -94,54 +94,105 @@ def relabel_nodes(G, mapping, copy=True):
 
 
 def _relabel_inplace(G, mapping):
-    old_labels = set(mapping.keys())
-    new_labels = set(mapping.values())
-    if len(old_labels & new_labels) > 0:
-        # labels sets overlap
-        # can we topological sort and still do the relabeling?
-        D = nx.DiGraph(list(mapping.items()))
-        D.remove_edges_from(D.selfloop_edges())
-        try:
-            nodes = nx.topological_sort(D)
-        except nx.NetworkXUnfeasible:
-            raise nx.NetworkXUnfeasible('The node label sets are overlapping '
-                                        'and no ordering can resolve the '
-                                        'mapping. Use copy=True.')
-        nodes.reverse()  # reverse topological order
+    """
+    relabels the nodes of G in place. Instead of moving one node at a time,
+    the node and adjacency dicts of the graph are rebuilt in one pass over
+    all nodes and edges. As each node is only looked up in the (old ->
+    new) mapping once, overlapping and circular mappings (e.g. a -> b,
+    b -> a) don't need any special treatment.
+
+    Nodes that are mapped to the same label (or to the label of a node
+    that isn't relabeled) are merged, cf. ``_merge_attrs``.
+    """
+    for old in mapping:
+        if old not in G.node:
+            raise KeyError("Node {0} is not in the graph".format(old))
+
+    node = G.node_dict_factory()
+    merged = set()  # labels shared by more than one node
+    for old, attrs in G.node.iteritems():
+        new = mapping.get(old, old)
+        if new in node:
+            _merge_attrs(node[new], attrs)
+            merged.add(new)
+        else:
+            node[new] = attrs
+    # (old) IDs of the nodes whose adjacency entries must be changed
+    affected = merged.union(old for old, new in mapping.iteritems()
+                            if old != new)
+
+    # in a directed graph, succ[u][v] and pred[v][u] share the same
+    # (key or attribute) dict, in an undirected one adj[u][v] and adj[v][u]
+    if G.is_directed():
+        succ, _ = _relabel_adjacency(G, G.succ, mapping, merged, affected)
+        pred, rebuilt = _relabel_adjacency(G, G.pred, mapping, merged,
+                                           affected)
+        for target in rebuilt:
+            for source in pred[target]:
+                pred[target][source] = succ[source][target]
+        G.node = node
+        G.adj = G.succ = G.edge = succ
+        G.pred = pred
     else:
-        # non-overlapping label sets
-        nodes = old_labels
+        adj, rebuilt = _relabel_adjacency(G, G.adj, mapping, merged, affected)
+        for source in rebuilt:
+            for target, data in adj[source].iteritems():
+                adj[target][source] = data
+        G.node = node
+        G.adj = G.edge = adj
+
+    # DiscourseDocumentGraphs have to rebuild their layer indices etc.
+    if hasattr(G, '_rebuild_indices'):
+        G._rebuild_indices()
+    return G
 
-    multigraph = G.is_multigraph()
-    directed = G.is_directed()
 
-    for old in nodes:
-        try:
-            new = mapping[old]
-        except KeyError:
+def _relabel_adjacency(G, adj, mapping, merged, affected):
+    """
+    returns a relabeled copy of an adjacency dict (e.g. ``G.succ``) and the
+    list of the (new) nodes whose neighbor dicts had to be rebuilt. The
+    neighbor dicts of all other nodes are reused, as none of their
+    neighbors were relabeled or merged.
+    """
+    multigraph = G.is_multigraph()
+    new_adj = G.node_dict_factory()
+    rebuilt = []
+    for old_node, neighbors in adj.iteritems():
+        new_node = mapping.get(old_node, old_node)
+        if new_node not in merged and affected.isdisjoint(neighbors):
+            new_adj[new_node] = neighbors
             continue
-        try:
-            layers = G.node[old]['layers']
-            G.add_node(new, layers, attr_dict=G.node[old])
-        except KeyError:
-            raise KeyError("Node {0} is not in the graph".format(old))
-        if multigraph:
-            new_edges = [(new, old == target and new or target, key, data)
-                         for (_, target, key, data)
-                         in G.edges(old, data=True, keys=True)]
-            if directed:
-                new_edges += [(old == source and new or source, new, key, data)
-                              for (source, _, key, data)
-                              in G.in_edges(old, data=True, keys=True)]
-        else:
-            new_edges = [(new, old == target and new or target, data)
-                         for (_, target, data) in G.edges(old, data=True)]
-            if directed:
-                new_edges += [(old == source and new or source, new, data)
-                              for (source, _, data) in G.in_edges(old, data=True)]
-        G.remove_node(old)
-        G.add_edges_from(new_edges)
-    return G
+
+        new_neighbors = new_adj.get(new_node)
+        if new_neighbors is None:
+            new_neighbors = new_adj[new_node] = G.adjlist_dict_factory()
+            rebuilt.append(new_node)
+        for old_neighbor, data in neighbors.iteritems():
+            new_neighbor = mapping.get(old_neighbor, old_neighbor)
+            existing = new_neighbors.get(new_neighbor)
+            if existing is None:
+                new_neighbors[new_neighbor] = data
+            elif existing is not data:  # edges between merged nodes
+                if multigraph:
+                    for key, edge_attrs in data.iteritems():
+                        if key in existing:
+                            _merge_attrs(existing[key], edge_attrs)
+                        else:
+                            existing[key] = edge_attrs
+                else:
+                    _merge_attrs(existing, data)
+    return new_adj, rebuilt
+
+
+def _merge_attrs(attrs, other_attrs):
+    """
+    updates the attributes of a node/edge with those of another one, which
+    is merged into it. The ``layers`` of both are combined.
+    """
+    layers = attrs.get('layers')
+    attrs.update(other_attrs)
+    if layers is not None and 'layers' in other_attrs:
+        attrs['layers'] = layers.union(other_attrs['layers'])
 
 
 def _relabel_copy(G, mapping):
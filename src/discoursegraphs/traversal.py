@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Author: Arne Neumann <discoursegraphs.programming@arne.cl>
+
+"""
+This module contains functions for traversing trees (e.g. the dominance /
+spanning relations of a document graph, XML element trees or NLTK trees)
+and chains of pointing relations.
+
+All functions use an explicit stack (or queue) instead of recursion, so
+they don't run into Python's recursion limit on very deep trees. They
+don't depend on a specific tree implementation, but take a ``children``
+function, which maps a node to an iterable of its children.
+"""
+
+from collections import deque
+
+
+def dfs_events(source, children):
+    """
+    Yields (node, entered) tuples in depth-first order, starting at the
+    source node: (node, True) before the descendants of the node are
+    visited and (node, False) after all of them were visited.
+
+    The nodes reachable from the source must form a tree. Nodes don't need
+    to be hashable (e.g. NLTK trees).
+
+    Parameters
+    ----------
+    source : object
+        the root node of the (sub)tree to traverse
+    children : function
+        a function that maps a node to an iterable of its children
+        (in the order in which they should be visited)
+    """
+    yield source, True
+    stack = [(source, iter(children(source)))]
+    while stack:
+        node, unvisited = stack[-1]
+        for child in unvisited:
+            yield child, True
+            stack.append((child, iter(children(child))))
+            break
+        else:  # all children of the node were visited
+            stack.pop()
+            yield node, False
+
+
+def preorder(source, children):
+    """
+    Yields the nodes of a tree in depth-first pre-order, i.e. each node is
+    yielded before its children (cf. ``dfs_events``).
+    """
+    for node, entered in dfs_events(source, children):
+        if entered:
+            yield node
+
+
+def postorder(source, children):
+    """
+    Yields the nodes of a tree in depth-first post-order, i.e. each node is
+    yielded after its children (cf. ``dfs_events``).
+    """
+    for node, entered in dfs_events(source, children):
+        if not entered:
+            yield node
+
+
+def bfs(source, children):
+    """
+    Yields the nodes of a tree in breadth-first order, starting at the
+    source node (cf. ``dfs_events``).
+    """
+    queue = deque([source])
+    while queue:
+        node = queue.popleft()
+        yield node
+        queue.extend(children(node))
+
+
+def fold(source, children, combine, results=None):
+    """
+    Computes a result for the source node bottom-up (i.e. in post-order):
+    the result of a node is ``combine(node, child_results)``, where
+    ``child_results`` is a list of the results of its children.
+
+    The nodes reachable from the source may form a directed acyclic graph.
+    The result of a node that is reachable via more than one path is only
+    computed once.
+
+    Parameters
+    ----------
+    source : hashable
+        the node to compute the result for
+    children : function
+        a function that maps a node to an iterable of its children
+    combine : function
+        a function that takes a node and a list of the results of its
+        children and returns the result for the node
+    results : dict or None
+        a dictionary that maps from nodes to their (already computed)
+        results. The results of all nodes visited by this function are
+        added to it.
+
+    Returns
+    -------
+    result : object
+        the result of ``combine`` for the source node
+
+    Raises
+    ------
+    RuntimeError
+        if the nodes reachable from the source contain a cycle
+    """
+    if results is None:
+        results = {}
+    if source in results:
+        return results[source]
+
+    source_children = list(children(source))
+    stack = [(source, source_children, iter(source_children))]
+    on_stack = {source}
+    while stack:
+        node, node_children, unvisited = stack[-1]
+        for child in unvisited:
+            if child in results:
+                continue
+            if child in on_stack:
+                raise RuntimeError(
+                    "Can't traverse node '{0}', as the nodes reachable from "
+                    "it contain a cycle.".format(source))
+            grandchildren = list(children(child))
+            stack.append((child, grandchildren, iter(grandchildren)))
+            on_stack.add(child)
+            break
+        else:  # all children of the node were visited
+            stack.pop()
+            on_stack.remove(node)
+            results[node] = combine(
+                node, [results[child] for child in node_children])
+    return results[source]
+
+
+def iter_paths(source, children):
+    """
+    Yields all maximal paths (lists of nodes) starting at the source node,
+    in depth-first order. Cycles are cut, i.e. a path ends when all the
+    children of its last node are already part of it.
+
+    Parameters
+    ----------
+    source : hashable
+        the first node of all paths
+    children : function
+        a function that maps a node to an iterable of its children
+    """
+    path = [source]
+    on_path = {source}
+    # each stack frame holds the unvisited children of a node on the path
+    # and whether the path was extended from that node
+    stack = [[iter(children(source)), False]]
+    while stack:
+        frame = stack[-1]
+        for child in frame[0]:
+            if child in on_path:
+                continue  # don't run in circles
+            frame[1] = True
+            path.append(child)
+            on_path.add(child)
+            stack.append([iter(children(child)), False])
+            break
+        else:  # all children of the last node on the path were visited
+            stack.pop()
+            if not frame[1] and len(path) > 1:
+                yield list(path)
+            on_path.discard(path.pop())
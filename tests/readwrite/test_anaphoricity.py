@@ -26,13 +26,8 @@ def test_read_anaphoricity():
     assert len(das_annos) == 6
 
 
-@pytest.mark.xfail
 def test_merge_anaphoricity_graphs():
-    """merging of two graphs with the same namespace doesn't work
-
-    I tried fixing this by making rename_tokens() work on a copy of the
-    input graph, but that didn't help.
-    """
+    """merge two graphs with the same namespace"""
     das_adg = dg.read_anaphoricity(
         os.path.join(dg.DATA_ROOT_DIR, 'maz-17706-das.anaphoricity'))
     assert isinstance(das_adg, AnaphoraDocumentGraph)
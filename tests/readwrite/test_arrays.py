@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# coding: utf-8
+# Author: Arne Neumann <discoursegraphs.programming@arne.cl>
+
+import numpy as np
+import pytest
+
+import discoursegraphs as dg
+from discoursegraphs.readwrite.arrays import (
+    FeatureCodes, docgraph2arrays, stack_arrays)
+
+
+def make_docgraph(name, tokens):
+    """return a docgraph with one NP node that spans all its tokens"""
+    docgraph = dg.DiscourseDocumentGraph(name=name)
+    for i, token in enumerate(tokens):
+        token_id = '{0}_t{1}'.format(name, i)
+        docgraph.add_node(token_id, layers={docgraph.ns+':token'},
+                          attr_dict={docgraph.ns+':token': token})
+        docgraph.tokens.append(token_id)
+    docgraph.add_node('NP', layers={docgraph.ns+':syntax'},
+                      attr_dict={docgraph.ns+':cat': 'NP'})
+    docgraph.add_edge(docgraph.root, 'NP', layers={docgraph.ns+':syntax'},
+                      edge_type=dg.EdgeTypes.dominance_relation)
+    for token_id in docgraph.tokens:
+        docgraph.add_edge('NP', token_id, layers={docgraph.ns+':syntax'},
+                          edge_type=dg.EdgeTypes.spanning_relation)
+    return docgraph
+
+
+def test_docgraph2arrays():
+    """a docgraph is converted into node, span and edge arrays"""
+    docgraph = make_docgraph('d1', ['the', 'old', 'man'])
+    docgraph.add_edge('d1_t2', 'd1_t0', layers={'foo'})
+    arrays = docgraph2arrays(docgraph, node_type_attr=docgraph.ns+':cat')
+    assert arrays.node_ids == docgraph.nodes()
+    assert len(arrays) == 5
+    index = arrays.node_index
+
+    codes = arrays.codes
+    assert arrays.node_types[index['NP']] == codes.node_types['NP']
+    assert arrays.node_types[index['d1_t1']] == codes.node_types['token']
+    assert arrays.node_types[index[docgraph.root]] == codes.node_types['root']
+    assert arrays.node_layers[index['NP']] == \
+        1 << codes.layers[docgraph.ns+':syntax']
+
+    assert [arrays.token_index[index[node_id]] for node_id in
+            (docgraph.root, 'NP', 'd1_t0', 'd1_t2')] == [-1, -1, 0, 2]
+    assert arrays.span_start[index['NP']] == 0
+    assert arrays.span_end[index['NP']] == 2
+    assert arrays.span_start[index['d1_t1']] == 1
+    assert arrays.span_end[index['d1_t1']] == 1
+
+    assert arrays.edge_index.shape == (2, docgraph.number_of_edges())
+    edges = set(zip(arrays.edge_index[0], arrays.edge_index[1],
+                    arrays.edge_types))
+    assert (index['NP'], index['d1_t1'],
+            codes.edge_types[dg.EdgeTypes.spanning_relation]) in edges
+    assert (index['d1_t2'], index['d1_t0'], codes.edge_types['']) in edges
+
+
+def test_stack_arrays():
+    """the arrays of several docgraphs are stacked into one batch"""
+    codes = FeatureCodes()
+    arrays1 = docgraph2arrays(make_docgraph('d1', ['a', 'b']), codes)
+    arrays2 = docgraph2arrays(make_docgraph('d2', ['c']), codes)
+    batch = stack_arrays([arrays1, arrays2])
+    assert len(batch) == len(arrays1) + len(arrays2) == 7
+    assert batch.node_ids == arrays1.node_ids + arrays2.node_ids
+    assert list(batch.node_document) == [0, 0, 0, 0, 1, 1, 1]
+    assert list(batch.token_index) == \
+        list(arrays1.token_index) + list(arrays2.token_index)
+    assert batch.edge_index.shape == (2, 5)
+    assert np.array_equal(batch.edge_index[:, 3:], arrays2.edge_index + 4)
+
+    with pytest.raises(ValueError):
+        stack_arrays([arrays1, docgraph2arrays(make_docgraph('d3', ['d']))])
+    with pytest.raises(ValueError):
+        stack_arrays([])
+
+
+def test_feature_codes_layer_limit():
+    """layer bitmasks are limited to 64 layers"""
+    codes = FeatureCodes()
+    assert codes.layer_mask(['l{}'.format(i) for i in range(64)]) == 2**64-1
+    with pytest.raises(ValueError):
+        codes.layer_mask(['l64'])
+    assert 'l64' not in codes.layers
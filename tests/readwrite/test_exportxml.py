@@ -4,7 +4,9 @@
 
 from cStringIO import StringIO
 import os
+import shutil
 import sys
+from tempfile import mkdtemp
 
 import lxml
 import pytest
@@ -266,6 +268,8 @@ def test_read_exportxml():
     exportxml_corpus = dg.read_exportxml(exportxml_filepath)
     assert isinstance(exportxml_corpus, dg.readwrite.exportxml.ExportXMLCorpus)
     assert len(exportxml_corpus) == 3
+    # counting the documents doesn't store an index in the data directory
+    assert not os.path.exists(exportxml_filepath+'.text.idx')
 
     docgraph_stats = []
     for docgraph in exportxml_corpus:
@@ -281,3 +285,77 @@ def test_read_exportxml():
     text_elem = next(exportxml_corpus_debug)
     assert isinstance(text_elem, lxml.etree._Element)
     assert text_elem.tag == 'text'
+
+
+def test_exportxml_corpus_random_access():
+    """
+    documents can be accessed by their index, xml:id or origin using a byte
+    offset index, which is stored in a sidecar file.
+    """
+    temp_dir = mkdtemp()
+    exportxml_filepath = os.path.join(temp_dir, 'exportxml-example.xml')
+    shutil.copy(os.path.join(dg.DATA_ROOT_DIR, 'exportxml-example.xml'),
+                exportxml_filepath)
+    try:
+        exportxml_corpus = ExportXMLCorpus(exportxml_filepath)
+        assert len(exportxml_corpus) == 3
+        assert not os.path.exists(exportxml_filepath+'.text.idx')
+        assert exportxml_corpus.document_ids == ['text_0', 'text_9', 'text_22']
+        assert os.path.isfile(exportxml_filepath+'.text.idx')
+        assert len(exportxml_corpus) == 3
+        assert exportxml_corpus.origins == {
+            'T990507.2': 'text_0', 'T990507.13': 'text_9',
+            'T990507.28': 'text_22'}
+
+        expected_stats = {'text_0': text_0_stats, 'text_9': text_9_stats,
+                          'text_22': text_22_stats}
+        docgraphs = [exportxml_corpus['T990507.13'],
+                     exportxml_corpus['text_22'], exportxml_corpus[0]]
+        docgraphs.extend(exportxml_corpus[1:])
+        assert [docgraph.name for docgraph in docgraphs] == \
+            ['text_9', 'text_22', 'text_0', 'text_9', 'text_22']
+        for docgraph in docgraphs:
+            assert isinstance(docgraph, ExportXMLDocumentGraph)
+            with Capturing() as output:
+                dg.info(docgraph)
+            assert output == expected_stats[docgraph.name]
+
+        with pytest.raises(KeyError):
+            exportxml_corpus['text_1']
+
+        exportxml_corpus_debug = ExportXMLCorpus(exportxml_filepath,
+                                                 debug=True)
+        text_elem = exportxml_corpus_debug['T990507.2']
+        assert isinstance(text_elem, lxml.etree._Element)
+        assert text_elem.attrib['origin'] == 'T990507.2'
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_exportxml_corpus_imap():
+    """
+    a function can be applied to all documents in parallel, yielding the
+    results in corpus order.
+    """
+    temp_dir = mkdtemp()
+    exportxml_filepath = os.path.join(temp_dir, 'exportxml-example.xml')
+    shutil.copy(os.path.join(dg.DATA_ROOT_DIR, 'exportxml-example.xml'),
+                exportxml_filepath)
+    try:
+        exportxml_corpus = ExportXMLCorpus(exportxml_filepath)
+        expected_texts = [dg.get_text(docgraph)
+                          for docgraph in ExportXMLCorpus(exportxml_filepath)]
+        assert len(expected_texts) == 3
+        for workers, chunksize in ((1, 1), (2, 1), (2, 2), (3, 5)):
+            assert list(exportxml_corpus.imap(
+                dg.get_text, workers=workers, chunksize=chunksize)) == \
+                expected_texts
+
+        # the function is applied to <text> elements in debug mode
+        exportxml_corpus_debug = ExportXMLCorpus(exportxml_filepath,
+                                                 debug=True)
+        assert list(exportxml_corpus_debug.imap(lxml.etree.tostring,
+                                                workers=2)) == \
+            [lxml.etree.tostring(exportxml_corpus_debug[i]) for i in range(3)]
+    finally:
+        shutil.rmtree(temp_dir)
@@ -4,7 +4,9 @@
 
 import pytest
 
-from discoursegraphs.readwrite.generic import convert_spanstring
+import discoursegraphs as dg
+from discoursegraphs.readwrite.generic import (
+    ExportView, convert_spanstring, layers2str)
 
 
 def test_convert_spanstring():
@@ -40,3 +42,26 @@ def test_convert_spanstring():
     # (cf. see issue #144).
     with pytest.raises(AssertionError):
         convert_spanstring('s2011_6..s2012_13')
+
+
+def test_export_view():
+    """an export view converts attributes without changing the graph"""
+    docgraph = dg.DiscourseDocumentGraph(name='doc')
+    docgraph.node[docgraph.root]['metadata'] = {'author': 'me'}
+    docgraph.add_node('t1', layers={'tok'}, attr_dict={'forms': ['a', 'b']})
+    docgraph.add_edge(docgraph.root, 't1', layers={'tok'})
+
+    view = ExportView(docgraph, layers=layers2str, attriblist2str=True,
+                      remove_root_metadata=True, add_labels=True)
+    assert len(view) == 2
+    assert view.is_directed() and view.is_multigraph()
+    assert view.nodes() == [docgraph.root, 't1']
+    assert view.node['t1'] == {
+        'layers': "set(['tok'])", 'forms': "['a', 'b']", 'label': 't1'}
+    assert 'metadata' not in view.node[docgraph.root]
+    assert view.edges(data=True, keys=True) == [
+        (docgraph.root, 't1', 0, {'layers': "set(['tok'])"})]
+
+    # the document graph itself is unchanged
+    assert docgraph.node['t1'] == {'layers': {'tok'}, 'forms': ['a', 'b']}
+    assert docgraph.node[docgraph.root]['metadata'] == {'author': 'me'}
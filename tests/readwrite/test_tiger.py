@@ -3,13 +3,17 @@
 # Author: Arne Neumann <discoursegraphs.programming@arne.cl>
 
 import os
+import shutil
+from tempfile import NamedTemporaryFile, mkdtemp
 
 from lxml import etree
 import pytest
 
 from discoursegraphs import get_span, get_text
 from discoursegraphs.corpora import pcc
-from discoursegraphs.readwrite.tiger import TigerSentenceGraph
+from discoursegraphs.readwrite import tiger
+from discoursegraphs.readwrite.generic import ElementIndex
+from discoursegraphs.readwrite.tiger import TigerCorpus, TigerSentenceGraph
 
 import discoursegraphs as dg
 
@@ -258,3 +262,119 @@ def test_select_nodes_by_layer():
     tiger_node_ids = list(dg.select_nodes_by_layer(tdg, 'tiger'))
     tiger_nodes = list(dg.select_nodes_by_layer(tdg, 'tiger', data=True))
     assert len(tdg) == len(tiger_node_ids) == 253
+
+
+def test_read_tiger_sentences():
+    """
+    read a TigerXML file one sentence at a time and check, if its nodes and
+    edges are the same as in the ``TigerSentenceGraph``s of its sentences.
+    """
+    tiger_file = NamedTemporaryFile(suffix='.xml', delete=False)
+    tiger_file.write(
+        '<?xml version="1.0" encoding="utf-8" standalone="yes"?>\n'
+        '<corpus id="ID_test">\n<body>\n{0}{1}</body>\n</corpus>\n'.format(
+            SENTENCE_WITH_SECEDGE, SENTENCE_WITHOUT_SECEDGE))
+    tiger_file.close()
+    try:
+        tdg = dg.read_tiger(tiger_file.name)
+    finally:
+        os.unlink(tiger_file.name)
+
+    assert tdg.corpus_id == 'ID_test'
+    assert tdg.sentences == ['s367_508', 's389_503']
+
+    sentence_graphs = [
+        TigerSentenceGraph(etree.fromstring(SENTENCE_WITH_SECEDGE)),
+        TigerSentenceGraph(etree.fromstring(SENTENCE_WITHOUT_SECEDGE))]
+    assert tdg.tokens == sentence_graphs[0].tokens + sentence_graphs[1].tokens
+    for tsg in sentence_graphs:
+        for node_id, node_attrs in tsg.nodes_iter(data=True):
+            assert tdg.node[node_id] == node_attrs
+        for source_id, target_id, key, edge_attrs in tsg.edges_iter(
+                data=True, keys=True):
+            assert tdg.edge[source_id][target_id][key] == edge_attrs
+        assert tdg.has_edge(tdg.root, tsg.root)
+    assert len(tdg) == 1 + sum(len(tsg) for tsg in sentence_graphs)
+
+    assert get_text(tdg, 's389_502') == \
+        u"Was man nicht durch Augenschein nachprüfen kann"
+
+
+def test_tiger_corpus(monkeypatch):
+    """
+    access single sentences of a TigerXML file via a byte offset index,
+    which is stored in a sidecar file.
+    """
+    temp_dir = mkdtemp()
+    tiger_filepath = os.path.join(temp_dir, 'corpus.xml')
+    with open(tiger_filepath, 'w') as tiger_file:
+        tiger_file.write(
+            '<?xml version="1.0" encoding="utf-8" standalone="yes"?>\n'
+            '<corpus id="ID_test">\n<body>\n{0}{1}</body>\n</corpus>\n'.format(
+                SENTENCE_WITH_SECEDGE, SENTENCE_WITHOUT_SECEDGE))
+    try:
+        corpus = TigerCorpus(tiger_filepath)
+        assert os.path.isfile(tiger_filepath+'.s.idx')
+        assert len(corpus) == 2
+        assert corpus.sentence_ids == ['s367', 's389']
+        assert 's389' in corpus
+
+        tsg = corpus['s389']
+        expected = TigerSentenceGraph(etree.fromstring(SENTENCE_WITHOUT_SECEDGE))
+        assert tsg.root == expected.root == 's389_503'
+        assert tsg.tokens == expected.tokens
+        assert tsg.nodes(data=True) == expected.nodes(data=True)
+        assert tsg.edges(data=True) == expected.edges(data=True)
+        assert corpus[0].root == 's367_508'
+        assert [sent.root for sent in corpus[:]] == ['s367_508', 's389_503']
+
+        # the stored index is reused ...
+        def build_index(self):
+            raise AssertionError("the index shouldn't be rebuilt")
+        with monkeypatch.context() as patch:
+            patch.setattr(ElementIndex, '_build', build_index)
+            assert TigerCorpus(tiger_filepath).sentence_ids == ['s367', 's389']
+
+        # ... unless the TigerXML file has changed (the 'id' attribute of
+        # the sentence is now its first attribute, like in the TIGER treebank)
+        with open(tiger_filepath, 'w') as tiger_file:
+            tiger_file.write(
+                '<?xml version="1.0" encoding="utf-8" standalone="yes"?>\n'
+                '<corpus id="ID_test">\n<body>\n{0}</body>\n</corpus>\n'.format(
+                    SENTENCE_WITHOUT_SECEDGE.replace(
+                        '<s xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"'
+                        ' id="s389"', '<s id="s389"')))
+        corpus = TigerCorpus(tiger_filepath)
+        assert corpus.sentence_ids == ['s389']
+        assert corpus['s389'].nodes(data=True) == expected.nodes(data=True)
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_read_tiger_in_parallel(monkeypatch):
+    """
+    parse the sentences of a TigerXML file in worker processes and check,
+    if the resulting document graph is the same as the one created in a
+    single process.
+    """
+    temp_dir = mkdtemp()
+    tiger_filepath = os.path.join(temp_dir, 'corpus.xml')
+    with open(tiger_filepath, 'w') as tiger_file:
+        tiger_file.write(
+            '<?xml version="1.0" encoding="utf-8" standalone="yes"?>\n'
+            '<corpus id="ID_test">\n<body>\n{0}{1}</body>\n</corpus>\n'.format(
+                SENTENCE_WITH_SECEDGE, SENTENCE_WITHOUT_SECEDGE))
+    try:
+        tdg = dg.read_tiger(tiger_filepath)
+        # each worker gets only one sentence at a time
+        monkeypatch.setattr(tiger, 'SENTENCE_CHUNKSIZE', 1)
+        parallel_tdg = dg.read_tiger(tiger_filepath, workers=2)
+    finally:
+        shutil.rmtree(temp_dir)
+
+    assert parallel_tdg.corpus_id == tdg.corpus_id == 'ID_test'
+    assert parallel_tdg.sentences == tdg.sentences
+    assert parallel_tdg.tokens == tdg.tokens
+    assert parallel_tdg.nodes(data=True) == tdg.nodes(data=True)
+    assert parallel_tdg.edges(data=True, keys=True) == \
+        tdg.edges(data=True, keys=True)
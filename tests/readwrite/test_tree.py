@@ -2,12 +2,15 @@
 # coding: utf-8
 # Author: Arne Neumann <discoursegraphs.programming@arne.cl>
 
+from copy import deepcopy
+
 from lxml import etree
+import pytest
 
 from discoursegraphs.readwrite.exportxml import ExportXMLDocumentGraph
 from discoursegraphs.readwrite.tree import (
-    get_child_nodes, horizontal_positions, node2bracket, sorted_bfs_edges,
-    sorted_bfs_successors, tree2bracket)
+    DominanceIndex, get_child_nodes, horizontal_positions, node2bracket,
+    sorted_bfs_edges, sorted_bfs_successors, tree2bracket)
 import discoursegraphs as dg
 
 
@@ -71,6 +74,36 @@ class TestTree(object):
         for parent_node in ('s1_1', 's1_2', 's1_3', 's1_4', 's1_5'):
             assert not set(get_child_nodes(self.docgraph, parent_node, data=True))
 
+    def test_dominance_index(self):
+        """The dominance relations of a (sub)tree can be indexed at once."""
+        index = DominanceIndex(self.docgraph, 's1_504')
+        assert index.root == 's1_504'
+        assert index.parents == {
+            's1_502': 's1_504', 's1_503': 's1_504', 's1_2': 's1_502',
+            's1_3': 's1_502', 's1_4': 's1_503',
+            # ancestors of the root node
+            's1_504': 's1_505', 's1_505': 's1', 's1': 'text_0'}
+        assert set(index.children['s1_504']) == {'s1_502', 's1_503'}
+        assert index.children['s1_4'] == []
+        assert 's1_501' not in index.children
+
+        index = DominanceIndex(self.docgraph)
+        assert index.root == 'text_0'
+        # the named entity node doesn't dominate / isn't dominated
+        assert set(index.parents) == set(self.docgraph) - {'text_0', 'ne_2'}
+        assert index.conflicts == set()
+
+        # a node with two parents is recorded, but only the first parent
+        # is used for traversing the tree
+        docgraph = deepcopy(self.docgraph)
+        docgraph.add_edge('s1_503', 's1_3', layers={'foo'},
+                          edge_type=dg.EdgeTypes.dominance_relation)
+        index = DominanceIndex(docgraph, 's1')
+        assert index.conflicts == {'s1_3'}
+        assert index.parents['s1_3'] in ('s1_502', 's1_503')
+        with pytest.raises(ValueError):
+            horizontal_positions(docgraph, 's1', index=index)
+
     def test_horizontal_positions(self):
         """Interpreting a graph as a tree, we can order the nodes on the x-axis."""
         x_positions = horizontal_positions(self.docgraph, sentence_root=None)
@@ -85,6 +118,19 @@ class TestTree(object):
         x_positions_s1 = horizontal_positions(self.docgraph, sentence_root='s1')
         assert x_positions_s1 == expected_positions
 
+    def test_horizontal_positions_merged_document(self):
+        """Nodes with several parents that don't dominate any syntax tokens
+        (e.g. in a merged PCC document) don't break the tree traversal.
+        """
+        docgraph = dg.corpora.pcc['maz-00001']
+        index = DominanceIndex(docgraph)
+        assert index.conflicts
+
+        x_positions = horizontal_positions(docgraph, index=index)
+        assert len(x_positions) == 36
+        assert x_positions['rst:rst:15_6'] == 9
+        assert x_positions['rst:rst:10_11'] == 154
+
     def test_sorted_bfs_edges(self):
         """Interpreting a graph as an ordered rooted tree, we find all 
         its edges in BFS order.
@@ -2,14 +2,20 @@
 # -*- coding: utf-8 -*-
 # Author: Arne Neumann <discoursegraphs.programming@arne.cl>
 
+from collections import defaultdict
 from copy import deepcopy
+import cPickle
 import os
+import pickle
+import sys
 
 from networkx import is_directed_acyclic_graph
 import pytest
 
 import discoursegraphs as dg
-from discoursegraphs.discoursegraph import create_token_mapping, get_kwic
+from discoursegraphs.discoursegraph import (
+    create_token_mapping, get_edge_annotation_layers, get_kwic,
+    get_node_annotation_layers)
 from discoursegraphs.corpora import pcc
 
 """
@@ -250,6 +256,62 @@ class TestDiscourseDocumentGraph(object):
         with pytest.raises(TypeError) as excinfo:
             self.docgraph.add_edges_from([(1, 2, 'bar')])
 
+    def test_add_nodes_bulk(self):
+        """add many nodes at once, validating each distinct set of layers"""
+        self.docgraph.add_nodes_bulk(
+            [(1, {'layers': {'token'}, 'word': 'hello'}),
+             (2, {'word': 'world'})])
+        assert self.docgraph.node[1] == {'layers': {'token'}, 'word': 'hello'}
+        assert self.docgraph.node[2] == \
+            {'layers': {'discoursegraph'}, 'word': 'world'}
+
+        # re-adding a node merges its layers and updates its attributes
+        self.docgraph.add_nodes_bulk([(1, {'layers': {'foo'}, 'word': 'hi'})])
+        assert self.docgraph.node[1] == \
+            {'layers': {'token', 'foo'}, 'word': 'hi'}
+
+        with pytest.raises(AssertionError) as excinfo:
+            self.docgraph.add_nodes_bulk([(3, {'layers': ['foo']})])
+        with pytest.raises(AssertionError) as excinfo:
+            self.docgraph.add_nodes_bulk([(4, {'layers': {'foo', 23}})])
+
+        # an invalid node isn't added (but the nodes before it are)
+        with pytest.raises(AssertionError) as excinfo:
+            self.docgraph.add_nodes_bulk(
+                [('x', {'layers': {'ok'}}), ('y', {'layers': {1, 2}})])
+        assert 'x' in self.docgraph
+        for node_id in (3, 4, 'y'):
+            assert node_id not in self.docgraph
+
+    def test_add_edges_bulk(self):
+        """add many edges at once, creating missing nodes on the fly"""
+        self.docgraph.add_edges_bulk(
+            [(1, 2, {'layers': {'int'}, 'weight': 23}),
+             (1, 2, {'layers': {'int'}, 'weight': 42}),
+             (2, 3, 5, {'weight': 1})])
+        assert self.docgraph.edges(data=True) == \
+            [(1, 2, {'layers': {'int'}, 'weight': 23}),
+             (1, 2, {'layers': {'int'}, 'weight': 42}),
+             (2, 3, {'layers': {'discoursegraph'}, 'weight': 1})]
+        assert self.docgraph.node[3] == {'layers': {'discoursegraph'}}
+        assert self.docgraph.edge[2][3].keys() == [5]
+
+        # update an existing edge: layers are merged, not overwritten
+        self.docgraph.add_edges_bulk([(1, 2, 0, {'layers': {'num'}})])
+        assert self.docgraph.edge[1][2][0] == \
+            {'layers': {'int', 'num'}, 'weight': 23}
+
+        with pytest.raises(AttributeError) as excinfo:
+            self.docgraph.add_edges_bulk([(1, 2)])
+        with pytest.raises(AssertionError) as excinfo:
+            self.docgraph.add_edges_bulk([(1, 2, {'layers': 'foo'})])
+        assert len(self.docgraph.edge[1][2]) == 2
+
+        # the source/target nodes of an invalid edge aren't created
+        with pytest.raises(AssertionError) as excinfo:
+            self.docgraph.add_edges_bulk([(5, 6, {'layers': {5}})])
+        assert 5 not in self.docgraph and 6 not in self.docgraph
+
     def test_add_layer(self):
         """add a layer to existing nodes or edges"""
         self.docgraph.add_node(1)
@@ -260,6 +322,35 @@ class TestDiscourseDocumentGraph(object):
         self.docgraph.add_layer((1, 2), 'fake')
         assert self.docgraph[1][2] == {0: {'layers': {'discoursegraph', 'fake'}}}
 
+    def test_shared_layers(self):
+        """elements with the same layers share one frozenset of layers"""
+        self.docgraph.add_node(1, layers={'foo', 'bar'})
+        self.docgraph.add_nodes_from([(2, {'layers': {'bar', 'foo'}})])
+        self.docgraph.add_edge(1, 2, layers={'foo', 'bar'})
+        layers = self.docgraph.node[1]['layers']
+        assert isinstance(layers, frozenset)
+        assert layers == {'foo', 'bar'}
+        assert self.docgraph.node[2]['layers'] is layers
+        assert self.docgraph[1][2][0]['layers'] is layers
+
+        self.docgraph.add_layer(1, 'baz')
+        assert self.docgraph.node[1]['layers'] == {'foo', 'bar', 'baz'}
+        assert self.docgraph.node[2]['layers'] is layers
+
+        foo_mask = self.docgraph.layer_mask('foo')
+        assert self.docgraph.layer_mask(layers) & foo_mask
+        assert self.docgraph.layer_mask({'foo', 'baz'}) & \
+            self.docgraph.layer_mask(self.docgraph.node[1]['layers'])
+        assert not self.docgraph.layer_mask(layers) & \
+            self.docgraph.layer_mask('baz')
+
+        # querying unknown layers doesn't assign any bits to them
+        num_of_bits = len(self.docgraph._layer_bits)
+        assert self.docgraph.layer_mask(['unknown', 'foo']) == foo_mask
+        assert list(dg.select_neighbors_by_layer(
+            self.docgraph, 1, 'unknown')) == []
+        assert len(self.docgraph._layer_bits) == num_of_bits
+
     def test_add_offsets_get_offsets(self):
         """annotate tokens with offsets and retrieve them."""
         # add a few tokens to the docgraph
@@ -283,6 +374,20 @@ class TestDiscourseDocumentGraph(object):
         self.docgraph.add_offsets()
         assert self.docgraph.node == nodes_dict
 
+        # character positions can be mapped back to tokens
+        assert self.docgraph.get_token_at_offset(0) == 0
+        assert self.docgraph.get_token_at_offset(2) == 0
+        assert self.docgraph.get_token_at_offset(3) is None
+        assert self.docgraph.get_token_at_offset(19) == 3
+        assert self.docgraph.get_token_at_offset(21) == 4
+        assert self.docgraph.get_token_at_offset(22) is None
+
+        # offsets are recomputed after the tokens have changed
+        self.docgraph.tokens.reverse()
+        assert self.docgraph.get_offsets(4) == (0, 1)
+        assert self.docgraph.get_offsets(0) == (19, 22)
+        assert self.docgraph.node[0][self.docgraph.ns+':onset'] == 19
+
     @staticmethod
     def test_get_phrases(self):
         """extract all VPs from a document"""
@@ -302,6 +407,23 @@ class TestDiscourseDocumentGraph(object):
         assert list(self.docgraph.get_tokens()) == [(0, 'dogs'), (1, 'bite')]
         assert list(self.docgraph.get_tokens(token_strings_only=True)) == ['dogs', 'bite']
 
+    def test_token_table(self):
+        """the token table is kept in sync with the tokens of the graph"""
+        add_tokens(self.docgraph, ['dogs', 'bite', 'cats'])
+        table = self.docgraph.token_table
+        assert table.strings == ['dogs', 'bite', 'cats']
+        assert list(table.onsets) == [0, 5, 10]
+        assert list(table.offsets) == [4, 9, 14]
+        assert table.text == dg.get_text(self.docgraph) == 'dogs bite cats'
+        assert dg.tokens2text(self.docgraph, [1, 2]) == 'bite cats'
+        assert dg.tokens2text(self.docgraph, [2, 0]) == 'cats dogs'
+
+        add_tokens(self.docgraph, ['.'])
+        assert self.docgraph.token_table.strings[-1] == '.'
+        self.docgraph.add_node(0, **{self.docgraph.ns+':token': 'Dogs'})
+        assert self.docgraph.get_token(0) == 'Dogs'
+        assert dg.get_text(self.docgraph) == 'Dogs bite cats .'
+
     def test_merge_graphs(self):
         """merge a very simple graph into an empty graph"""
         # create a simple graph with 3 tokens, all dominated by the root node
@@ -324,6 +446,29 @@ class TestDiscourseDocumentGraph(object):
         assert len(self.docgraph) == 4
         assert len(token_graph.edges()) == 3
 
+        # merge a graph with different token IDs into the merged graph
+        pos_graph = dg.DiscourseDocumentGraph(namespace='pos')
+        add_tokens(pos_graph, ['He', 'sleeps', '.'])
+        pos_graph.add_node('VP', layers={'pos:syntax'})
+        pos_graph.add_edge(pos_graph.root, 'VP')
+        pos_graph.add_edge('VP', pos_graph.tokens[1],
+                           edge_type=dg.EdgeTypes.spanning_relation)
+        self.docgraph.merge_graphs(pos_graph)
+
+        first, second, third = self.docgraph.tokens
+        assert self.docgraph.renamed_nodes[pos_graph.tokens[1]] == second
+        assert len(self.docgraph) == 5
+        assert pos_graph.root not in self.docgraph
+        assert self.docgraph.has_edge(self.docgraph.root, 'VP')
+        assert self.docgraph.has_edge('VP', second)
+        assert self.docgraph.node[second]['pos:token'] == 'sleeps'
+        assert dg.get_span(self.docgraph, 'VP') == [second]
+
+        mismatch_graph = dg.DiscourseDocumentGraph(namespace='mismatch')
+        add_tokens(mismatch_graph, ['He', 'slept', '.'])
+        with pytest.raises(ValueError):
+            self.docgraph.merge_graphs(mismatch_graph)
+
 
 def test_get_kwic():
     """keyword in context"""
@@ -361,6 +506,69 @@ def test_create_token_mapping():
     assert 'Ich bin [[kein]] Berliner .' in str(excinfo.value)
 
 
+def test_merge_many():
+    """merge several graphs into the first one (which has no tokens)"""
+    def make_layers():
+        layers = []
+        for namespace in ('first', 'second', 'third'):
+            docgraph = dg.DiscourseDocumentGraph(namespace=namespace)
+            add_tokens(docgraph, ['Ich', 'bin', 'ein', 'Berliner', '.'])
+            docgraph.add_node('NP', layers={namespace+':syntax'})
+            docgraph.add_edge(docgraph.root, 'NP')
+            docgraph.add_edge('NP', docgraph.tokens[3],
+                              edge_type=dg.EdgeTypes.spanning_relation)
+            layers.append(docgraph)
+        return [dg.DiscourseDocumentGraph()] + layers
+
+    pairwise = make_layers()
+    for docgraph in pairwise[1:]:
+        pairwise[0].merge_graphs(docgraph)
+
+    layers = make_layers()
+    merged = dg.merge_many(layers)
+    assert merged is layers[0]
+    assert merged.tokens == pairwise[0].tokens == layers[1].tokens
+    assert merged.nodes(data=True) == pairwise[0].nodes(data=True)
+    assert merged.edges(data=True) == pairwise[0].edges(data=True)
+    assert merged.merged_rootnodes == [docgraph.root for docgraph in layers[1:]]
+    assert dg.get_span(merged, 'NP') == [merged.tokens[3]]
+
+    # a tokenization mismatch doesn't change any of the graphs
+    layers = make_layers()
+    mismatch_graph = dg.DiscourseDocumentGraph(namespace='mismatch')
+    add_tokens(mismatch_graph, ['Ich', 'bin', 'kein', 'Berliner', '.'])
+    with pytest.raises(ValueError):
+        dg.merge_many(layers + [mismatch_graph])
+    assert len(layers[0]) == 1
+
+    with pytest.raises(ValueError):
+        dg.merge_many([])
+
+
+def test_merge_graphs_copies_attributes():
+    """changing a merged graph doesn't change the graph merged into it"""
+    first_graph = dg.DiscourseDocumentGraph(namespace='a')
+    add_tokens(first_graph, ['Ich', 'bin', 'ein', 'Berliner', '.'])
+    second_graph = dg.DiscourseDocumentGraph(namespace='b')
+    add_tokens(second_graph, ['Ich', 'bin', 'ein', 'Berliner', '.'])
+    second_graph.add_node('b_np', layers={'b:syntax'}, attr_dict={'cat': 'NP'})
+    second_graph.add_edge('b_np', second_graph.tokens[3], layers={'b:syntax'},
+                          edge_type=dg.EdgeTypes.spanning_relation)
+
+    first_graph.merge_graphs(second_graph)
+    first_graph.add_layer('b_np', 'a:extra')
+    first_graph.node['b_np']['cat'] = 'PP'
+    first_graph.add_edge('b_np', first_graph.tokens[3], key=0,
+                         layers={'a:extra'})
+
+    assert second_graph.node['b_np'] == {'cat': 'NP', 'layers': {'b:syntax'}}
+    assert list(dg.select_nodes_by_layer(second_graph, 'a:extra')) == []
+    assert list(dg.select_nodes_by_layer(second_graph, 'b:syntax')) == ['b_np']
+    edge_attrs = second_graph.edge['b_np'][second_graph.tokens[3]][0]
+    assert edge_attrs['layers'] == {'b:syntax'}
+    assert list(dg.select_edges_by(second_graph, layer='a:extra')) == []
+
+
 def test_is_continuous():
     """tests, if a discontinuous span of tokens is recognised as such.
 
@@ -385,6 +593,7 @@ def test_is_continuous():
     docgraph.add_edge('upper', '2', edge_type=dg.EdgeTypes.spanning_relation)
     docgraph.add_edge('upper', '3', edge_type=dg.EdgeTypes.spanning_relation)
     docgraph.add_edge('lower', '4', edge_type=dg.EdgeTypes.spanning_relation)
+    docgraph.add_node('empty')
     # determine order of the tokens
     docgraph.tokens = ['1', '2', '3', '4']
 
@@ -396,6 +605,9 @@ def test_is_continuous():
     assert dg.is_continuous(docgraph, '3')
     assert dg.is_continuous(docgraph, '4')
 
+    with pytest.raises(KeyError):
+        dg.is_continuous(docgraph, 'empty')
+
 
 def test_select_nodes_by_attribute():
     """Are node lists are correctly filtered based on their attribs/values?"""
@@ -518,6 +730,38 @@ def test_select_edges_by_attribute():
                dg.EdgeTypes.precedence_relation]))
     assert len(dominance_or_precendence) == 5
 
+    # non-indexed attributes are filtered in a single pass
+    for src, target in [(0, 1), (1, 2)]:
+        token_graph.add_edge(src, target, key=0, label='prec')
+    token_graph.add_edge(token_graph.root, 0, key=0, label='dom')
+    label_edges = list(dg.select_edges_by_attribute(
+        token_graph, attribute='label', value={'prec', 'dom'}))
+    assert sorted(label_edges) == sorted(
+        [(0, 1), (1, 2), (token_graph.root, 0)])
+
+
+def test_select_edges():
+    """select_edges accepts functions and (legacy) eval strings"""
+    sg1 = make_sentencegraph1()
+    is_syntax_edge = lambda edge_attribs: \
+        sg1.ns+':syntax' in edge_attribs['layers']
+    is_dominance = dg.edge_attribute_condition(
+        'edge_type', dg.EdgeTypes.dominance_relation)
+    syndom_edges = list(dg.select_edges(sg1, [is_syntax_edge, is_dominance]))
+    assert len(syndom_edges) == 6
+
+    eval_conditions = [
+        "'{}' in edge_attribs['layers']".format(sg1.ns+':syntax'),
+        "edge_attribs['edge_type'] == 'dominates'"]
+    assert list(dg.select_edges(sg1, eval_conditions)) == syndom_edges
+
+    spans_or_dominates = dg.edge_attribute_condition(
+        'edge_type', [dg.EdgeTypes.dominance_relation,
+                      dg.EdgeTypes.spanning_relation])
+    assert len(list(dg.select_edges(sg1, [spans_or_dominates]))) == 12
+    assert list(dg.select_edges(
+        sg1, [dg.edge_attribute_condition('foo')])) == []
+
 
 def test_select_edges_by():
     """test various combinations of edge filters (layer/edge type)"""
@@ -655,6 +899,124 @@ def test_get_span():
         assert dg.get_span(sg1, 'S')
 
 
+def test_span_cache():
+    """spans are cached and recomputed after the graph was changed"""
+    sg1 = make_sentencegraph1()
+    assert dg.get_spans(sg1, ['S', 'VP2', 2]) == \
+        [[0, 1, 3, 4, 5, 6], [4, 5, 6], [2]]
+    assert sg1._span_cache['SBAR'] == (3, 4, 5, 6)
+
+    # pointing relations don't change spans
+    sg1.add_edge('VP1', 'NP2', edge_type=dg.EdgeTypes.pointing_relation)
+    assert 'SBAR' in sg1._span_cache
+
+    sg1.add_edge('VP1', 7, edge_type=dg.EdgeTypes.spanning_relation)
+    assert dg.get_span(sg1, 'S') == [0, 1, 3, 4, 5, 6, 7]
+    sg1.remove_edge('SBAR', 'VP2')
+    assert dg.get_span(sg1, 'S') == [0, 1, 3, 7]
+    sg1.remove_node(3)
+    assert dg.get_spans(sg1, ['S', 'NP2']) == [[0, 1, 7], []]
+
+    # a node that dominates the same token twice spans it only once
+    sg1.add_edge('NP2', 0, edge_type=dg.EdgeTypes.spanning_relation)
+    assert dg.get_span(sg1, 'S') == [0, 1, 7]
+
+
+def test_token_positions():
+    """token positions are kept in sync with the tokens list"""
+    tokens = dg.TokenList(['t3', 't1'])
+    assert tokens.position('t1') == 1
+    tokens.append('t10')
+    tokens.extend(iter(['t2', 't20']))
+    tokens += ['t0']
+    assert tokens.positions == {
+        't3': 0, 't1': 1, 't10': 2, 't2': 3, 't20': 4, 't0': 5}
+    tokens.insert(0, 't100')
+    assert tokens.position('t3') == 1
+    del tokens[:2]
+    assert tokens.position('t1') == 0
+    assert sorted(['foo2', 't2', 'foo10', 't1'], key=tokens.sort_key) == \
+        ['t1', 't2', 'foo2', 'foo10']
+
+    for pickle_module in (pickle, cPickle):
+        for protocol in xrange(pickle.HIGHEST_PROTOCOL + 1):
+            unpickled = pickle_module.loads(
+                pickle_module.dumps(tokens, protocol))
+            assert isinstance(unpickled, dg.TokenList)
+            assert unpickled == tokens
+            assert unpickled.positions == tokens.positions
+
+    sg1 = make_sentencegraph1()
+    assert isinstance(sg1.tokens, dg.TokenList)
+    assert dg.get_span(sg1, 'VP2') == [4, 5, 6]
+    # spans are sorted by token position, not by node ID
+    sg1.tokens = [0, 1, 2, 3, 6, 5, 4, 7]
+    assert isinstance(sg1.tokens, dg.TokenList)
+    assert dg.get_span(sg1, 'VP2') == [6, 5, 4]
+    sg1.tokens.reverse()
+    assert dg.get_span(sg1, 'VP2') == [4, 5, 6]
+    assert dg.is_continuous(sg1, 'VP2')
+    assert not dg.is_continuous(sg1, 'S')
+
+
+def test_span_ranges():
+    """spans can be represented as token position ranges or bitmasks"""
+    sg1 = make_sentencegraph1()
+    assert dg.get_span_ranges(sg1, 'S') == [(0, 1), (3, 6)]
+    assert dg.get_span_ranges(sg1, 'VP2') == [(4, 6)]
+    assert dg.get_span_mask(sg1, 'S') == 0b1111011
+    assert dg.get_span_mask(sg1, 'VP2') == 0b1110000
+    assert dg.get_span_mask(sg1, 2) == 0b100
+
+    assert not dg.is_continuous(sg1, 'S')
+    assert dg.is_continuous(sg1, 'SBAR')
+    assert dg.spans_overlap(sg1, 'S', 'VP2')
+    assert not dg.spans_overlap(sg1, 'S', 2)
+    assert dg.span_contains(sg1, 'S', 'VP2')
+    assert not dg.span_contains(sg1, 'VP2', 'S')
+
+    # bitmasks are recomputed after the graph was changed
+    sg1.add_edge('S', 2, edge_type=dg.EdgeTypes.spanning_relation)
+    assert dg.get_span_mask(sg1, 'S') == 0b1111111
+    assert dg.is_continuous(sg1, 'S')
+    sg1.add_node('foo', layers={sg1.ns}, **{sg1.ns+':token': 'foo'})
+    with pytest.raises(KeyError):
+        dg.get_span_mask(sg1, 'foo')
+
+
+def test_span_masks_of_long_documents():
+    """
+    the cached bitmask of a span only grows with the length of the span,
+    not with its position in the document
+    """
+    docgraph = dg.DiscourseDocumentGraph()
+    token_ids = range(100000)
+    docgraph.add_nodes_bulk(
+        (token_id, {'layers': {docgraph.ns, docgraph.ns+':token'},
+                    docgraph.ns+':token': 't'})
+        for token_id in token_ids)
+    docgraph.tokens = token_ids
+    for node_id, first, last in (('early', 0, 2), ('late', 99990, 99992),
+                                 ('later', 99992, 99999)):
+        for token_id in range(first, last + 1):
+            docgraph.add_edge(node_id, token_id,
+                              edge_type=dg.EdgeTypes.spanning_relation)
+
+    assert dg.is_continuous(docgraph, 'late')
+    assert dg.spans_overlap(docgraph, 'late', 'later')
+    assert dg.spans_overlap(docgraph, 'later', 'late')
+    assert not dg.spans_overlap(docgraph, 'early', 'late')
+    assert not dg.span_contains(docgraph, 'late', 'later')
+    assert dg.span_contains(docgraph, 'later', 99995)
+    assert not dg.span_contains(docgraph, 99995, 'later')
+
+    assert docgraph._span_mask_cache['late'] == (99990, 0b111)
+    assert docgraph._span_mask_cache['later'] == (99992, 0b11111111)
+    for first_position, mask in docgraph._span_mask_cache.itervalues():
+        assert sys.getsizeof(mask) <= sys.getsizeof(2**64)
+    # the absolute bitmask is only built on demand
+    assert dg.get_span_mask(docgraph, 'late') == 0b111 << 99990
+
 def test_get_span_offsets():
     """test, if offsets can be retrieved from tokens, spans of tokens or
     dominating nodes.
@@ -746,3 +1108,188 @@ def test_select_neighbors_by_layer():
         sg1, 0, layer=sg1.ns+':token')) == [1] # via precedence
     assert list(dg.select_neighbors_by_layer(
         sg1, 3, layer=sg1.ns+':token')) == [0, 4] # 3->0 coref, 3->4 precedence
+
+
+def assert_layer_index_is_consistent(docgraph):
+    """compare the layer index of a docgraph to the layers of its elements"""
+    node_layers = defaultdict(set)
+    for node_id, node_attrs in docgraph.nodes_iter(data=True):
+        for layer in node_attrs['layers']:
+            node_layers[layer].add(node_id)
+    edge_layers = defaultdict(set)
+    edge_types = defaultdict(set)
+    for src, target, key, edge_attrs in docgraph.edges_iter(keys=True,
+                                                             data=True):
+        for layer in edge_attrs['layers']:
+            edge_layers[layer].add((src, target, key))
+        if 'edge_type' in edge_attrs:
+            edge_types[edge_attrs['edge_type']].add((src, target, key))
+
+    assert get_node_annotation_layers(docgraph) == set(node_layers)
+    assert get_edge_annotation_layers(docgraph) == set(edge_layers)
+    for layer, node_ids in node_layers.items():
+        assert set(dg.select_nodes_by_layer(docgraph, layer)) == node_ids
+    for layer, edges in edge_layers.items():
+        assert set(docgraph._edge_layer_index[layer]) == edges
+    assert set(docgraph._edge_type_index) == set(edge_types)
+    for edge_type, edges in edge_types.items():
+        assert set(docgraph._edge_type_index[edge_type]) == edges
+
+
+def test_layer_index():
+    """is the layer index kept in sync when nodes/edges/layers change?"""
+    sg1 = make_sentencegraph1()
+    assert_layer_index_is_consistent(sg1)
+    assert dg.get_top_level_layers(sg1) == {'discoursegraph'}
+
+    sg1.add_layer('S', 'foo:bar')
+    sg1.add_layer(('S', 'NP1'), 'foo:edge')
+    assert list(dg.select_nodes_by_layer(sg1, 'foo:bar')) == ['S']
+    assert dg.get_top_level_layers(sg1) == {'discoursegraph', 'foo'}
+    assert_layer_index_is_consistent(sg1)
+
+    sg1.remove_edge('S', 'NP1')
+    sg1.remove_node('SBAR')
+    sg1.remove_nodes_from([3, 'does not exist'])
+    assert 'foo:edge' not in get_edge_annotation_layers(sg1)
+    assert_layer_index_is_consistent(sg1)
+
+    sg1.remove_node('S')
+    assert 'foo:bar' not in dg.get_annotation_layers(sg1)
+    assert_layer_index_is_consistent(sg1)
+
+    # merging and relabeling keep the index in sync, too
+    pdg = pcc[DOC_ID]
+    assert_layer_index_is_consistent(pdg)
+
+
+def test_edge_type_index():
+    """is the edge type index kept in sync when edges change?"""
+    sg1 = make_sentencegraph1()
+    pointing = dg.EdgeTypes.pointing_relation
+    coref_layer = sg1.ns+':coreference'
+    # precedence relations are pointing relations, too
+    assert len(list(dg.select_edges_by(sg1, edge_type=pointing))) == 8
+    assert list(dg.select_edges_by(
+        sg1, layer=coref_layer, edge_type=pointing)) == [(3, 0)]
+
+    # changing the type of an existing edge updates the index
+    sg1.add_edge('S', 'NP1', key=0, layers={coref_layer}, edge_type=pointing)
+    assert_layer_index_is_consistent(sg1)
+    assert set(dg.select_edges_by(
+        sg1, layer=coref_layer, edge_type=pointing)) == {(3, 0), ('S', 'NP1')}
+    assert ('S', 'NP1') not in set(dg.select_edges_by(
+        sg1, edge_type=dg.EdgeTypes.dominance_relation))
+    assert list(dg.select_edges_by(sg1, layer='foo', edge_type=pointing)) == []
+
+    sg1.remove_node('NP1')
+    assert list(dg.select_edges_by(
+        sg1, layer=coref_layer, edge_type=pointing)) == [(3, 0)]
+    assert_layer_index_is_consistent(sg1)
+
+
+def test_get_pointing_chains():
+    """are pointing chains and clusters extracted correctly?"""
+    docgraph = dg.DiscourseDocumentGraph()
+    pointing = dg.EdgeTypes.pointing_relation
+    # 'e' has two antecedents (cf. Issue #40), 'x' and 'y' point to each other
+    for src, target in (('e', 'd'), ('d', 'a'), ('e', 'c'), ('c', 'a'),
+                        ('z', 'x'), ('x', 'y'), ('y', 'x'), ('f', 'g')):
+        docgraph.add_edge(src, target, layers={'coref'}, edge_type=pointing)
+
+    assert sorted(dg.get_pointing_chains(docgraph)) == [
+        ['e', 'c', 'a'], ['e', 'd', 'a'], ['f', 'g'], ['z', 'x', 'y']]
+    assert dg.get_pointing_chains(docgraph, layer='foo') == []
+    clusters = dg.get_pointing_chains(docgraph, clusters=True)
+    assert sorted(sorted(cluster) for cluster in clusters) == [
+        ['a', 'c', 'd', 'e'], ['f', 'g'], ['x', 'y', 'z']]
+
+    # a cycle that no other node points into starts at its first node (in
+    # natural sort order)
+    cycle = dg.DiscourseDocumentGraph()
+    for src, target in (('c', 'b'), ('b', 'c'), ('c', 'd')):
+        cycle.add_edge(src, target, layers={'coref'}, edge_type=pointing)
+    assert dg.get_pointing_chains(cycle) == [['b', 'c', 'd']]
+    assert dg.get_pointing_chains(cycle.freeze()) == [['b', 'c', 'd']]
+    assert [sorted(cluster) for cluster in
+            dg.get_pointing_chains(cycle, clusters=True)] == [['b', 'c', 'd']]
+
+
+def test_freeze():
+    """does a frozen graph answer queries like the graph it was made from?"""
+    sg1 = make_sentencegraph1()
+    frozen = sg1.freeze()
+    assert isinstance(frozen, dg.FrozenDocumentGraph)
+    assert len(frozen) == len(sg1) == 15
+    assert frozen.number_of_edges() == sg1.number_of_edges()
+    assert set(frozen.edges_iter()) == set(sg1.edges_iter())
+    assert sorted(frozen.successors('SBAR')) == ['NP2', 'VP2']
+    assert sorted(frozen.predecessors(0)) == sorted(sg1.predecessors(0))
+
+    syntax = sg1.ns+':syntax'
+    for layer in (None, syntax, [syntax, sg1.ns+':token'], 'foo'):
+        assert set(dg.select_nodes_by_layer(frozen, layer)) == \
+            set(dg.select_nodes_by_layer(sg1, layer))
+    assert dict(dg.select_nodes_by_layer(frozen, syntax, data=True)) == \
+        dict(dg.select_nodes_by_layer(sg1, syntax, data=True))
+
+    pointing = dg.EdgeTypes.pointing_relation
+    for layer, edge_type in ((None, None), (syntax, None), (None, pointing),
+                             (sg1.ns+':coreference', pointing),
+                             ('foo', pointing), (syntax, 'foo')):
+        assert sorted(dg.select_edges_by(frozen, layer, edge_type)) == \
+            sorted(dg.select_edges_by(sg1, layer, edge_type))
+    assert list(dg.select_edges_by(
+        frozen, sg1.ns+':coreference', pointing, data=True)) == [
+            (3, 0, {'layers': {sg1.ns+':coreference'},
+                    'edge_type': pointing})]
+
+    for node_id in sg1:
+        assert dg.get_span(frozen, node_id) == dg.get_span(sg1, node_id)
+    assert dg.get_pointing_chains(frozen) == dg.get_pointing_chains(sg1)
+
+    # the snapshot doesn't change with the graph it was made from
+    sg1.add_edge('S', 7, layers={syntax},
+                 edge_type=dg.EdgeTypes.spanning_relation)
+    assert dg.get_span(sg1, 'S') == [0, 1, 3, 4, 5, 6, 7]
+    assert dg.get_span(frozen, 'S') == [0, 1, 3, 4, 5, 6]
+
+    sg1.add_edge('NP1', 'S', layers={sg1.ns+':loop'},
+                 edge_type=dg.EdgeTypes.dominance_relation)
+    with pytest.raises(RuntimeError):
+        dg.get_span(sg1.freeze(), 'S')
+
+
+def test_freeze_many_edge_types():
+    """a frozen graph can store more edge types than fit into one byte"""
+    docgraph = dg.DiscourseDocumentGraph(namespace='x')
+    for i in xrange(300):
+        docgraph.add_edge('a', 'b', layers={'x'}, edge_type='type{}'.format(i))
+
+    frozen = docgraph.freeze()
+    assert len(frozen.edge_type_names) == 300
+    assert set(frozen.select_edges_by(edge_type='type299')) == {('a', 'b')}
+    assert set(frozen.edge_type_names) == {
+        attrs['edge_type'] for _, _, attrs in docgraph.edges_iter(data=True)}
+
+
+def test_freeze_unlisted_tokens():
+    """
+    a frozen graph returns the same spans as its graph, even if some token
+    nodes aren't in its tokens list
+    """
+    docgraph = dg.DiscourseDocumentGraph(namespace='x')
+    add_tokens(docgraph, ['a', 'b'])
+    for node_id in ('extra10', 'extra2'):
+        docgraph.add_node(node_id, layers={'x', 'x:token'},
+                          attr_dict={'x:token': node_id})
+    for target_id in (1, 'extra10', 'extra2', 0):
+        docgraph.add_edge('NP', target_id,
+                          edge_type=dg.EdgeTypes.spanning_relation)
+    docgraph.add_edge('S', 'NP', edge_type=dg.EdgeTypes.dominance_relation)
+    docgraph.add_edge('S', 'extra2', edge_type=dg.EdgeTypes.spanning_relation)
+
+    frozen = docgraph.freeze()
+    assert dg.get_span(docgraph, 'NP') == [0, 1, 'extra2', 'extra10']
+    for node_id in docgraph:
+        assert dg.get_span(frozen, node_id) == dg.get_span(docgraph, node_id)
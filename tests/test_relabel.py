@@ -137,9 +137,7 @@ def test_convert_to_integers_raise():
         H=convert_node_labels_to_integers(G, ordering="increasing age")
 
 
-@pytest.mark.xfail
 def test_relabel_nodes_copy():
-    """failed after switching to dg.relabel_nodes"""
     G = empty_graph()
     G.add_edges_from([('A','B'),('A','C'),('B','C'),('C','D')])
     mapping={'A':'aardvark','B':'bear','C':'cat','D':'dog'}
@@ -147,9 +145,7 @@ def test_relabel_nodes_copy():
     assert sorted(H.nodes()) == ['aardvark', 'bear', 'cat', 'dog']
 
 
-@pytest.mark.xfail
 def test_relabel_nodes_function():
-    """failed after switching to dg.relabel_nodes"""
     G = empty_graph()
     G.add_edges_from([('A','B'),('A','C'),('B','C'),('C','D')])
     # function mapping no longer encouraged but works
@@ -158,27 +154,21 @@ def test_relabel_nodes_function():
     H = relabel_nodes(G,mapping)
     assert sorted(H.nodes()) == [65, 66, 67, 68]
 
-@pytest.mark.xfail
 def test_relabel_nodes_graph():
-    """failed after switching to dg.relabel_nodes"""
     G = Graph([('A','B'),('A','C'),('B','C'),('C','D')])
     mapping = {'A':'aardvark','B':'bear','C':'cat','D':'dog'}
     H = relabel_nodes(G,mapping)
     assert sorted(H.nodes()) == ['aardvark', 'bear', 'cat', 'dog']
 
 
-@pytest.mark.xfail
 def test_relabel_nodes_digraph():
-    """failed after switching to dg.relabel_nodes"""
     G = DiGraph([('A','B'),('A','C'),('B','C'),('C','D')])
     mapping = {'A':'aardvark','B':'bear','C':'cat','D':'dog'}
     H = relabel_nodes(G,mapping,copy=False)
     assert sorted(H.nodes()) == ['aardvark', 'bear', 'cat', 'dog']
 
 
-@pytest.mark.xfail
 def test_relabel_nodes_multigraph():
-    """failed after switching to dg.relabel_nodes"""
     G = MultiGraph([('a','b'),('a','b')])
     mapping = {'a':'aardvark','b':'bear'}
     G = relabel_nodes(G,mapping,copy=False)
@@ -187,9 +177,7 @@ def test_relabel_nodes_multigraph():
                        [('aardvark', 'bear'), ('aardvark', 'bear')])
 
 
-@pytest.mark.xfail
 def test_relabel_nodes_multidigraph():
-    """failed after switching to dg.relabel_nodes"""
     G = MultiDiGraph([('a','b'),('a','b')])
     mapping = {'a':'aardvark','b':'bear'}
     G = relabel_nodes(G,mapping,copy=False)
@@ -197,9 +185,7 @@ def test_relabel_nodes_multidigraph():
     assert sorted(G.edges()) == [('aardvark', 'bear'), ('aardvark', 'bear')]
 
 
-@pytest.mark.xfail
 def test_relabel_isolated_nodes_to_same():
-    """failed after switching to dg.relabel_nodes"""
     G = Graph()
     G.add_nodes_from(range(4))
     mapping = {1:1}
@@ -235,3 +221,43 @@ def test_relabel_selfloop():
     G = nx.MultiDiGraph([(1, 1)])
     G = nx.relabel_nodes(G, {1: 0}, copy=False)
     assert sorted(G.nodes()) == [0]
+
+
+def test_relabel_circular():
+    """circular mappings can be applied in place"""
+    G = nx.MultiDiGraph([('a', 'b'), ('b', 'c'), ('c', 'a')])
+    G = relabel_nodes(G, {'a': 'b', 'b': 'c', 'c': 'a'}, copy=False)
+    assert sorted(G.edges()) == [('a', 'b'), ('b', 'c'), ('c', 'a')]
+    assert G.succ['b'].keys() == ['c'] and G.pred['b'].keys() == ['a']
+
+
+def test_relabel_merge():
+    """nodes which are mapped to the same label are merged"""
+    G = nx.MultiDiGraph()
+    G.add_node('a', layers={'x'}, pos='NN')
+    G.add_node('b', layers={'y'})
+    G.add_edge('a', 'c', layers={'x'})
+    G.add_edge('b', 'c', key=1, layers={'y'})
+    G = relabel_nodes(G, {'a': 'ab', 'b': 'ab'}, copy=False)
+    assert sorted(G.nodes()) == ['ab', 'c']
+    assert G.node['ab'] == {'layers': {'x', 'y'}, 'pos': 'NN'}
+    assert sorted(G.edges(keys=True)) == [('ab', 'c', 0), ('ab', 'c', 1)]
+
+
+def test_relabel_docgraph():
+    """the layer and edge type indices of a document graph are updated"""
+    import discoursegraphs as dg
+    docgraph = dg.DiscourseDocumentGraph(namespace='test')
+    docgraph.add_node('t1', layers={'test:token'})
+    docgraph.add_node('np', layers={'test:syntax'})
+    docgraph.add_edge('np', 't1', layers={'test:syntax'},
+                      edge_type=dg.EdgeTypes.spanning_relation)
+    assert dg.get_span(docgraph, 'np') == []  # fills the span cache
+    relabel_nodes(docgraph, {'t1': 'tok1', 'np': 't1'}, copy=False)
+    assert list(dg.select_nodes_by_layer(docgraph, 'test:token')) == ['tok1']
+    assert list(dg.select_nodes_by_layer(docgraph, 'test:syntax')) == ['t1']
+    assert list(dg.select_edges_by(
+        docgraph, edge_type=dg.EdgeTypes.spanning_relation)) == [('t1', 'tok1')]
+    docgraph.tokens = ['tok1']
+    docgraph.node['tok1']['test:token'] = 'word'
+    assert dg.get_span(docgraph, 't1') == ['tok1']
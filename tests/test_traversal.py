@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Author: Arne Neumann <discoursegraphs.programming@arne.cl>
+
+import pytest
+
+import discoursegraphs as dg
+from discoursegraphs.traversal import (
+    bfs, dfs_events, fold, iter_paths, postorder, preorder)
+
+"""
+This module contains some tests for the ``traversal`` module.
+"""
+
+TREE = {'S': ['NP', 'VP'], 'NP': ['a', 'b'], 'VP': ['c', 'PP'], 'PP': ['d']}
+DEPTH = 10000  # much deeper than Python's default recursion limit
+
+
+def children(node):
+    return TREE.get(node, [])
+
+
+def test_traversal_orders():
+    """are trees traversed in the expected order?"""
+    assert list(preorder('S', children)) == [
+        'S', 'NP', 'a', 'b', 'VP', 'c', 'PP', 'd']
+    assert list(postorder('S', children)) == [
+        'a', 'b', 'NP', 'c', 'd', 'PP', 'VP', 'S']
+    assert list(bfs('S', children)) == [
+        'S', 'NP', 'VP', 'a', 'b', 'c', 'PP', 'd']
+    assert list(dfs_events('NP', children)) == [
+        ('NP', True), ('a', True), ('a', False), ('b', True), ('b', False),
+        ('NP', False)]
+
+    # nodes don't need to be hashable
+    nested = ['S', ['NP', ['a']], ['VP']]
+    assert [node[0] for node in preorder(nested, lambda node: node[1:])] == [
+        'S', 'NP', 'a', 'VP']
+
+
+def test_fold():
+    """are results computed bottom-up and only once per node?"""
+    def bracket(node, child_strs):
+        return u"({0}{1})".format(node, u"".join(child_strs))
+
+    assert fold('S', children, bracket) == u"(S(NP(a)(b))(VP(c)(PP(d))))"
+
+    calls = []
+    dag = {'a': ['b', 'c'], 'b': ['d'], 'c': ['d']}
+    results = {}
+    assert fold('a', lambda node: dag.get(node, []),
+                lambda node, child_results: calls.append(node) or
+                1 + sum(child_results), results=results) == 5
+    assert sorted(calls) == ['a', 'b', 'c', 'd']
+    assert results == {'a': 5, 'b': 2, 'c': 2, 'd': 1}
+
+    with pytest.raises(RuntimeError):
+        fold('a', lambda node: {'a': ['b'], 'b': ['a']}[node],
+             lambda node, child_results: None)
+
+
+def test_iter_paths():
+    """are all maximal paths found and cycles cut?"""
+    graph = {'a': ['b', 'c'], 'b': ['d'], 'c': ['d', 'a'], 'd': []}
+    assert list(iter_paths('a', lambda node: graph[node])) == [
+        ['a', 'b', 'd'], ['a', 'c', 'd']]
+    assert list(iter_paths('d', lambda node: graph[node])) == []
+
+    graph = {'x': ['y'], 'y': ['x']}
+    assert list(iter_paths('x', lambda node: graph[node])) == [['x', 'y']]
+
+
+def test_deep_trees():
+    """deep trees don't exceed the recursion limit"""
+    chain = lambda node: [node+1] if node < DEPTH else []
+    assert len(list(preorder(0, chain))) == DEPTH+1
+    assert next(postorder(0, chain)) == DEPTH
+    assert fold(0, chain,
+                lambda node, child_depths: max(child_depths+[-1])+1) == DEPTH
+    assert [len(path) for path in iter_paths(0, chain)] == [DEPTH+1]
+
+    docgraph = dg.DiscourseDocumentGraph(root='root')
+    parent_id = 'root'
+    for i in xrange(DEPTH):
+        docgraph.add_edge(parent_id, i, layers={'deep'},
+                          edge_type=dg.EdgeTypes.dominance_relation)
+        parent_id = i
+    docgraph.node[parent_id]['discoursegraph:token'] = 'leaf'
+    docgraph.tokens = [parent_id]
+    assert dg.get_span(docgraph, 'root') == [parent_id]